@@ -12,6 +12,7 @@ from app.models.auth import RefreshToken
 from app.models.courses import Course
 from app.models.enrollments import Enrollment
 from app.models.users import User, Role
+from app.models.purge_jobs import PurgeJob
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
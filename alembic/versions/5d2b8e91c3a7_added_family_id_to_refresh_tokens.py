@@ -0,0 +1,33 @@
+"""added family_id to refresh_tokens
+
+Revision ID: 5d2b8e91c3a7
+Revises: a3c1e7f04d52
+Create Date: 2026-10-19 11:02:47.518093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2b8e91c3a7'
+down_revision: Union[str, Sequence[str], None] = 'a3c1e7f04d52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('refresh_tokens', sa.Column('family_id', sa.UUID(), nullable=True))
+    # existing tokens each start their own family
+    op.execute('UPDATE refresh_tokens SET family_id = id')
+    op.alter_column('refresh_tokens', 'family_id', nullable=False)
+    op.create_index('idx_auth_family_id', 'refresh_tokens', ['family_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_auth_family_id', table_name='refresh_tokens')
+    op.drop_column('refresh_tokens', 'family_id')
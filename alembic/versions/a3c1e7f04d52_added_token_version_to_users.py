@@ -0,0 +1,31 @@
+"""added token_version to users
+
+Revision ID: a3c1e7f04d52
+Revises: 36262dc848fe
+Create Date: 2026-10-19 10:12:31.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c1e7f04d52'
+down_revision: Union[str, Sequence[str], None] = '36262dc848fe'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'users',
+        sa.Column('token_version', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'token_version')
@@ -0,0 +1,153 @@
+"""partitioned refresh_tokens by expiry
+
+Revision ID: c81f4a6e2b90
+Revises: 5d2b8e91c3a7
+Create Date: 2026-10-19 12:26:05.731940
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c81f4a6e2b90'
+down_revision: Union[str, Sequence[str], None] = '5d2b8e91c3a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+token_status = postgresql.ENUM(
+    'VALID', 'USED', 'REVOKED', name='tokenstatus', create_type=False
+)
+
+
+def move_old_table() -> None:
+    op.drop_index('idx_auth_user_id', table_name='refresh_tokens')
+    op.drop_index('idx_auth_family_id', table_name='refresh_tokens')
+    op.execute('ALTER TABLE refresh_tokens RENAME TO refresh_tokens_old')
+    op.execute(
+        'ALTER TABLE refresh_tokens_old '
+        'RENAME CONSTRAINT refresh_tokens_pk TO refresh_tokens_old_pk'
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    move_old_table()
+
+    op.create_table(
+        'refresh_tokens',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('token', sa.LargeBinary(), nullable=False),
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('family_id', sa.UUID(), nullable=False),
+        sa.Column('status', token_status, nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('used_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('revoked_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(
+            ['user_id'], ['users.id'], name='tokens_user_id_fk', ondelete='CASCADE'
+        ),
+        sa.PrimaryKeyConstraint('id', 'expires_at', name='refresh_tokens_pk'),
+        postgresql_partition_by='RANGE (expires_at)',
+    )
+    op.create_index('idx_auth_user_id', 'refresh_tokens', ['user_id'], unique=False)
+    op.create_index('idx_auth_family_id', 'refresh_tokens', ['family_id'], unique=False)
+
+    op.execute('CREATE TABLE refresh_tokens_default PARTITION OF refresh_tokens DEFAULT')
+
+    # daily partitions covering the tokens still valid, the maintenance task
+    # keeps creating them ahead of time from here on
+    op.execute(
+        """
+        DO $$
+        DECLARE
+            day timestamptz;
+        BEGIN
+            FOR day IN
+                SELECT generate_series(
+                    date_trunc('day', now(), 'UTC'),
+                    date_trunc(
+                        'day',
+                        greatest(
+                            now(),
+                            (SELECT max(expires_at) FROM refresh_tokens_old)
+                        ),
+                        'UTC'
+                    ) + interval '3 days',
+                    interval '1 day'
+                )
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF refresh_tokens '
+                    'FOR VALUES FROM (%L) TO (%L)',
+                    'refresh_tokens_p' || to_char(day AT TIME ZONE 'UTC', 'YYYYMMDD'),
+                    day,
+                    day + interval '1 day'
+                );
+            END LOOP;
+        END $$;
+        """
+    )
+
+    # expired tokens are not copied, expiries are truncated to the second
+    # precision of the exp claim the lookups filter on
+    op.execute(
+        """
+        INSERT INTO refresh_tokens (
+            id, token, user_id, family_id, status,
+            created_at, expires_at, used_at, revoked_at
+        )
+        SELECT
+            id, decode(token, 'hex'), user_id, family_id, status,
+            created_at, date_trunc('second', expires_at), used_at, revoked_at
+        FROM refresh_tokens_old
+        WHERE expires_at > now()
+        """
+    )
+
+    op.drop_table('refresh_tokens_old')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    move_old_table()
+
+    op.create_table(
+        'refresh_tokens',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('token', sa.Text(), nullable=False),
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('family_id', sa.UUID(), nullable=False),
+        sa.Column('status', token_status, nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('used_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('revoked_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(
+            ['user_id'], ['users.id'], name='tokens_user_id_fk', ondelete='CASCADE'
+        ),
+        sa.PrimaryKeyConstraint('id', name='refresh_tokens_pk'),
+    )
+    op.create_index('idx_auth_user_id', 'refresh_tokens', ['user_id'], unique=False)
+    op.create_index('idx_auth_family_id', 'refresh_tokens', ['family_id'], unique=False)
+
+    op.execute(
+        """
+        INSERT INTO refresh_tokens (
+            id, token, user_id, family_id, status,
+            created_at, expires_at, used_at, revoked_at
+        )
+        SELECT
+            id, encode(token, 'hex'), user_id, family_id, status,
+            created_at, expires_at, used_at, revoked_at
+        FROM refresh_tokens_old
+        """
+    )
+
+    # dropping the parent drops its partitions
+    op.drop_table('refresh_tokens_old')
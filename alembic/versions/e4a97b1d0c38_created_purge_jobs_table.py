@@ -0,0 +1,47 @@
+"""created purge_jobs table
+
+Revision ID: e4a97b1d0c38
+Revises: c81f4a6e2b90
+Create Date: 2026-10-19 13:48:22.160375
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a97b1d0c38'
+down_revision: Union[str, Sequence[str], None] = 'c81f4a6e2b90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'purge_jobs',
+        sa.Column('name', sa.VARCHAR(length=50), nullable=False),
+        sa.Column('cutoff', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('deleted_rows', sa.Integer(), nullable=False),
+        sa.Column('batches', sa.Integer(), nullable=False),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('name', name='purge_jobs_pk'),
+    )
+    # the purge picks users past delete_at, this keeps it off a full scan
+    op.create_index(
+        'idx_users_delete_at',
+        'users',
+        ['delete_at'],
+        unique=False,
+        postgresql_where=sa.text('delete_at IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_users_delete_at', table_name='users')
+    op.drop_table('purge_jobs')
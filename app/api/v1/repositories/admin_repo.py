@@ -1,12 +1,68 @@
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc, Sequence
+from sqlalchemy import select, desc, Row, Sequence
+from sqlalchemy.orm import load_only, noload, selectinload
 
 
-from app.models.users import User
+from app.models.courses import Course
+from app.models.users import User, Role
 from app.models.enrollments import Enrollment
 
 
+# enrollment fields are read from the enrolled course
+ENROLLMENT_COURSE_COLUMNS: dict = {
+    "course_title": Course.title,
+    "course_code": Course.code,
+    "course_duration": Course.duration,
+}
+
+# columns selected for the columnar formats, keyed by the field they fill
+USER_ROW_COLUMNS: dict = {
+    "id": User.id,
+    "name": User.name,
+    "email": User.email,
+    "nationality": User.nationality,
+    "is_active": User.is_active,
+    "created_at": User.created_at,
+    "role": Role.name,
+}
+
+ENROLLMENT_ROW_COLUMNS: dict = {
+    **ENROLLMENT_COURSE_COLUMNS,
+    "created_at": Enrollment.created_at,
+}
+
+
+def user_field_options(fields: list[str]) -> tuple:
+    """loads only the requested user columns, the role only when asked for
+    and the courses never"""
+    columns: list = [getattr(User, field) for field in fields if field != "role"]
+    if "role" in fields:
+        columns.append(User.role_id)
+        role = selectinload(User.role).load_only(Role.name)
+    else:
+        role = noload(User.role)
+
+    return load_only(*columns), role, noload(User.courses)
+
+
+def enrollment_field_options(fields: list[str]) -> tuple:
+    """loads the enrolled course, with only the requested columns, when a
+    course field is asked for"""
+    columns: list = [
+        ENROLLMENT_COURSE_COLUMNS[field]
+        for field in fields
+        if field in ENROLLMENT_COURSE_COLUMNS
+    ]
+    if not columns:
+        return load_only(Enrollment.created_at), noload(Enrollment.course)
+
+    return (
+        load_only(Enrollment.created_at),
+        selectinload(Enrollment.course).load_only(*columns),
+    )
+
+
 class AdminRepo:
     async def get_all_students(
         self,
@@ -17,11 +73,15 @@ class AdminRepo:
         order: str | None,
         offset: int,
         limit: int,
+        fields: list[str] | None = None,
     ) -> Sequence[User]:
         sortable_fields: dict = {"created_at": User.created_at}
 
         stmt = select(User).where(User.role_id == role_id)
 
+        if fields is not None:
+            stmt = stmt.options(*user_field_options(fields))
+
         if q:
             stmt = stmt.where(User.name.ilike(q))
 
@@ -48,11 +108,15 @@ class AdminRepo:
         order: str | None,
         offset: int,
         limit: int,
+        fields: list[str] | None = None,
     ) -> Sequence[User]:
         sortable_fields: dict = {"created_at": User.created_at}
 
         stmt = select(User).where(User.role_id == role_id)
 
+        if fields is not None:
+            stmt = stmt.options(*user_field_options(fields))
+
         if q:
             stmt = stmt.where(User.name.ilike(q))
 
@@ -77,11 +141,15 @@ class AdminRepo:
         offset: int,
         limit: int,
         db: AsyncSession,
+        fields: list[str] | None = None,
     ) -> Sequence[Enrollment]:
         sortable_fields: dict = {"created_at": Enrollment.created_at}
 
         stmt = select(Enrollment)
 
+        if fields is not None:
+            stmt = stmt.options(*enrollment_field_options(fields))
+
         stmt = stmt.offset(offset).limit(limit)
 
         if sort:
@@ -105,11 +173,15 @@ class AdminRepo:
         offset: int,
         limit: int,
         db: AsyncSession,
+        fields: list[str] | None = None,
     ) -> Sequence[Enrollment]:
         sortable_fields: dict = {"created_at": Enrollment.created_at}
 
         stmt = select(Enrollment).where(Enrollment.course_id == course_id)
 
+        if fields is not None:
+            stmt = stmt.options(*enrollment_field_options(fields))
+
         stmt = stmt.offset(offset).limit(limit)
 
         if sort:
@@ -124,5 +196,83 @@ class AdminRepo:
 
         return enrollments
 
+    async def get_user_rows(
+        self,
+        db: AsyncSession,
+        role_id: UUID,
+        fields: list[str],
+        q: str | None,
+        sort: str | None,
+        order: str | None,
+        offset: int,
+        limit: int,
+    ) -> Sequence[Row]:
+        """users with the role as plain tuples of the requested columns"""
+        sortable_fields: dict = {"created_at": User.created_at}
+
+        stmt = (
+            select(*[USER_ROW_COLUMNS[field] for field in fields])
+            .select_from(User)
+            .where(User.role_id == role_id)
+        )
+
+        if "role" in fields:
+            stmt = stmt.join(Role, Role.id == User.role_id)
+
+        if q:
+            stmt = stmt.where(User.name.ilike(q))
+
+        stmt = stmt.offset(offset).limit(limit)
+
+        if sort:
+            sort = sortable_fields.get(sort, User.created_at)
+            if order == "desc":
+                stmt = stmt.order_by(desc(sort))
+            else:
+                stmt = stmt.order_by(sort)
+
+        res = await db.execute(stmt)
+        users: Sequence[Row] = res.all()
+
+        return users
+
+    async def get_enrollment_rows(
+        self,
+        course_id: UUID | None,
+        fields: list[str],
+        sort: str | None,
+        order: str | None,
+        offset: int,
+        limit: int,
+        db: AsyncSession,
+    ) -> Sequence[Row]:
+        """enrollments, of every course or of one, as plain tuples of the
+        requested columns"""
+        sortable_fields: dict = {"created_at": Enrollment.created_at}
+
+        stmt = select(*[ENROLLMENT_ROW_COLUMNS[field] for field in fields]).select_from(
+            Enrollment
+        )
+
+        if any(field in ENROLLMENT_COURSE_COLUMNS for field in fields):
+            stmt = stmt.join(Course, Course.id == Enrollment.course_id)
+
+        if course_id is not None:
+            stmt = stmt.where(Enrollment.course_id == course_id)
+
+        stmt = stmt.offset(offset).limit(limit)
+
+        if sort:
+            sort = sortable_fields.get(sort, Enrollment.created_at)
+            if order == "desc":
+                stmt = stmt.order_by(desc(sort))
+            else:
+                stmt = stmt.order_by(sort)
+
+        res = await db.execute(stmt)
+        enrollments: Sequence[Row] = res.all()
+
+        return enrollments
+
 
 admin_repo_v1 = AdminRepo()
@@ -2,18 +2,24 @@ from uuid import UUID
 from sqlalchemy.orm import Session
 from datetime import datetime, timezone
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, or_, text
+from sqlalchemy import Row, Sequence, select, update, insert, literal, and_, text
 
 
+from app.models.users import User
 from app.models.auth import RefreshToken
 from app.api.v1.schemas.auth import TokenStatus
 
 
 class AuthRepoV1:
     async def get_refresh_token(
-        self, token_id: UUID, db: AsyncSession
+        self, token_id: UUID, db: AsyncSession, expires_at: datetime | None = None
     ) -> RefreshToken | None:
         stmt = select(RefreshToken).where(RefreshToken.id == token_id)
+
+        # the expiry prunes the lookup to the partition holding the token
+        if expires_at is not None:
+            stmt = stmt.where(RefreshToken.expires_at == expires_at)
+
         res = await db.execute(stmt)
         refresh_token: RefreshToken | None = res.scalar()
         return refresh_token
@@ -23,16 +29,183 @@ class AuthRepoV1:
         await db.flush()
         await db.refresh(refresh_token)
 
-    def delete_refresh_tokens(self, db: Session):
-        stmt = delete(RefreshToken).where(
-            or_(
-                RefreshToken.status == TokenStatus.REVOKED,
-                RefreshToken.status == TokenStatus.USED,
-                RefreshToken.expires_at <= datetime.now(timezone.utc),
-            ),
+    async def rotate_refresh_token(
+        self,
+        token_id: UUID,
+        expires_at: datetime,
+        new_token: RefreshToken,
+        db: AsyncSession,
+    ) -> Row | None:
+        """marks the token used, stores its replacement and reads the user's
+        access token claims in a single statement
+
+        the status check in the UPDATE makes concurrent rotations of one token
+        serialize on its row lock, only the first one gets a row back"""
+        now: datetime = datetime.now(timezone.utc)
+
+        used = (
+            update(RefreshToken)
+            .where(
+                and_(
+                    RefreshToken.id == token_id,
+                    RefreshToken.expires_at == expires_at,
+                    RefreshToken.user_id == new_token.user_id,
+                    RefreshToken.status == TokenStatus.VALID,
+                    RefreshToken.expires_at > now,
+                )
+            )
+            .values(status=TokenStatus.USED, used_at=now)
+            .returning(RefreshToken.user_id, RefreshToken.family_id)
+            .cte("used")
+        )
+
+        claims = (
+            select(User.id, User.role_id, User.token_version, used.c.family_id)
+            .join(used, User.id == used.c.user_id)
+            .where(User.is_active.is_(True))
+            .cte("claims")
+        )
+
+        inserted = (
+            insert(RefreshToken)
+            .from_select(
+                [
+                    "id",
+                    "token",
+                    "user_id",
+                    "family_id",
+                    "status",
+                    "created_at",
+                    "expires_at",
+                ],
+                select(
+                    literal(new_token.id, RefreshToken.id.type),
+                    literal(new_token.token, RefreshToken.token.type),
+                    claims.c.id,
+                    # the replacement stays in the family of the rotated token
+                    claims.c.family_id,
+                    literal(TokenStatus.VALID, RefreshToken.status.type),
+                    literal(now, RefreshToken.created_at.type),
+                    literal(new_token.expires_at, RefreshToken.expires_at.type),
+                ),
+            )
+            .returning(RefreshToken.user_id)
+            .cte("inserted")
+        )
+
+        stmt = select(claims.c.role_id, claims.c.token_version).join(
+            inserted, inserted.c.user_id == claims.c.id
+        )
+        res = await db.execute(stmt)
+        claims_row: Row | None = res.first()
+        return claims_row
+
+    async def revoke_user_tokens(self, user_id: UUID, db: AsyncSession):
+        stmt = (
+            update(RefreshToken)
+            .where(
+                and_(
+                    RefreshToken.user_id == user_id,
+                    RefreshToken.status == TokenStatus.VALID,
+                )
+            )
+            .values(status=TokenStatus.REVOKED, revoked_at=datetime.now(timezone.utc))
+        )
+
+        await db.execute(stmt)
+
+    async def revoke_token_family(self, family_id: UUID, db: AsyncSession):
+        stmt = (
+            update(RefreshToken)
+            .where(
+                and_(
+                    RefreshToken.family_id == family_id,
+                    RefreshToken.status == TokenStatus.VALID,
+                )
+            )
+            .values(status=TokenStatus.REVOKED, revoked_at=datetime.now(timezone.utc))
         )
 
-        db.execute(stmt)
+        await db.execute(stmt)
+
+    def get_token_partitions(self, db: Session) -> Sequence[str]:
+        stmt = text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = 'refresh_tokens'::regclass"
+        )
+        res = db.execute(stmt)
+        partitions: Sequence[str] = res.scalars().all()
+        return partitions
+
+    def create_token_partition(
+        self, name: str, start: datetime, end: datetime, db: Session
+    ):
+        db.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF refresh_tokens "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            )
+        )
+
+    def default_partition_has_tokens(
+        self, start: datetime, end: datetime, db: Session
+    ) -> bool:
+        stmt = text(
+            "SELECT 1 FROM refresh_tokens_default"
+            " WHERE expires_at >= :start AND expires_at < :end LIMIT 1"
+        )
+        res = db.execute(stmt, {"start": start, "end": end})
+        return res.scalar() is not None
+
+    def detach_default_partition(self, db: Session):
+        db.execute(
+            text("ALTER TABLE refresh_tokens DETACH PARTITION refresh_tokens_default")
+        )
+
+    def attach_default_partition(self, db: Session):
+        db.execute(
+            text(
+                "ALTER TABLE refresh_tokens "
+                "ATTACH PARTITION refresh_tokens_default DEFAULT"
+            )
+        )
+
+    def move_default_partition_tokens(
+        self, name: str, start: datetime, end: datetime, db: Session
+    ) -> int:
+        """moves the rows of the detached default partition that belong to
+        the partition name, both tables have the columns of refresh_tokens"""
+        stmt = text(
+            "WITH moved AS ("
+            " DELETE FROM refresh_tokens_default"
+            " WHERE expires_at >= :start AND expires_at < :end"
+            " RETURNING *"
+            f") INSERT INTO {name} SELECT * FROM moved"
+        )
+        res = db.execute(stmt, {"start": start, "end": end})
+        return res.rowcount
+
+    def drop_token_partition(self, name: str, db: Session):
+        db.execute(text(f"DROP TABLE IF EXISTS {name}"))
+
+    def delete_default_partition_tokens(
+        self, cutoff: datetime, batch_size: int, db: Session
+    ) -> int:
+        """the default partition only fills up if partitions were not created
+        in time, its expired rows are deleted in batches"""
+        stmt = text(
+            "WITH batch AS ("
+            " SELECT id, expires_at FROM refresh_tokens_default"
+            " WHERE expires_at <= :cutoff"
+            " LIMIT :batch_size FOR UPDATE SKIP LOCKED"
+            ") "
+            "DELETE FROM refresh_tokens_default USING batch "
+            "WHERE refresh_tokens_default.id = batch.id "
+            "AND refresh_tokens_default.expires_at = batch.expires_at"
+        )
+        res = db.execute(stmt, {"cutoff": cutoff, "batch_size": batch_size})
+        return res.rowcount
 
 
 auth_repo_v1 = AuthRepoV1()
@@ -1,8 +1,10 @@
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc, Sequence
+from sqlalchemy.orm import load_only, noload, selectinload
 
 
+from app.models.users import User
 from app.models.courses import Course
 
 
@@ -16,6 +18,7 @@ class CourseRepoV1:
         is_active: bool,
         offset: int,
         limit: int,
+        fields: list[str] | None = None,
     ) -> Sequence[Course]:
         sortable_fields: dict = {
             "created_at": Course.created_at,
@@ -24,6 +27,22 @@ class CourseRepoV1:
 
         stmt = select(Course)
 
+        if fields is not None:
+            # only the requested columns are selected, the instructor is
+            # loaded only when asked for
+            columns: list = [
+                getattr(Course, field) for field in fields if field != "instructor"
+            ]
+            if "instructor" in fields:
+                columns.append(Course.instructor_id)
+                instructor = selectinload(Course.instructor).options(
+                    load_only(User.name), noload(User.role), noload(User.courses)
+                )
+            else:
+                instructor = noload(Course.instructor)
+
+            stmt = stmt.options(load_only(*columns), instructor)
+
         if is_active is not None:
             if not isinstance(is_active, bool):
                 is_active: bool = True
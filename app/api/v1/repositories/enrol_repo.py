@@ -20,10 +20,15 @@ class EnrolRepoV1:
         enrollment: Enrollment | None = res.scalar()
         return enrollment
     
-    async def create_enrollment(self, user: User, course: Course, db: AsyncSession):
-        user.courses.append(course)
+    async def create_enrollment(
+        self, user: User, course: Course, db: AsyncSession
+    ) -> Enrollment:
+        # the row is inserted directly, going through user.courses loads the
+        # enrolled courses and refreshing the user loads them again
+        enrollment: Enrollment = Enrollment(user_id=user.id, course_id=course.id)
+        db.add(enrollment)
         await db.flush()
-        await db.refresh(user)
+        return enrollment
 
     async def delete_enrollment(self, enrollment: Enrollment, db: AsyncSession):
         await db.delete(enrollment)
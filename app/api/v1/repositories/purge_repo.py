@@ -0,0 +1,69 @@
+from sqlalchemy.orm import Session
+from datetime import datetime, timezone
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy import select, update
+
+
+from app.models.purge_jobs import PurgeJob
+
+
+class PurgeRepoV1:
+    def start_job(self, name: str, cutoff: datetime, db: Session) -> PurgeJob:
+        """starts the job or resumes it when its last run did not finish"""
+        now: datetime = datetime.now(timezone.utc)
+
+        stmt = insert(PurgeJob).values(
+            name=name,
+            cutoff=cutoff,
+            deleted_rows=0,
+            batches=0,
+            started_at=now,
+            updated_at=now,
+        )
+        # a finished job restarts with a new cutoff, a running one is kept
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[PurgeJob.name],
+            set_={
+                "cutoff": stmt.excluded.cutoff,
+                "deleted_rows": 0,
+                "batches": 0,
+                "started_at": now,
+                "updated_at": now,
+                "finished_at": None,
+            },
+            where=PurgeJob.finished_at.isnot(None),
+        )
+        db.execute(stmt)
+
+        stmt = (
+            select(PurgeJob)
+            .where(PurgeJob.name == name)
+            .execution_options(populate_existing=True)
+        )
+        res = db.execute(stmt)
+        job: PurgeJob = res.scalar_one()
+        return job
+
+    def record_batch(self, name: str, deleted_rows: int, db: Session):
+        stmt = (
+            update(PurgeJob)
+            .where(PurgeJob.name == name)
+            .values(
+                deleted_rows=PurgeJob.deleted_rows + deleted_rows,
+                batches=PurgeJob.batches + 1,
+                updated_at=datetime.now(timezone.utc),
+            )
+        )
+        db.execute(stmt)
+
+    def finish_job(self, name: str, db: Session):
+        now: datetime = datetime.now(timezone.utc)
+        stmt = (
+            update(PurgeJob)
+            .where(PurgeJob.name == name)
+            .values(finished_at=now, updated_at=now)
+        )
+        db.execute(stmt)
+
+
+purge_repo_v1 = PurgeRepoV1()
@@ -2,7 +2,7 @@ from uuid import UUID
 from sqlalchemy.orm import Session
 from datetime import datetime, timezone
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, desc, Sequence, delete
+from sqlalchemy import Row, select, and_, desc, Sequence, delete, update, exists, func
 
 
 from app.models.courses import Course
@@ -50,6 +50,12 @@ class UserRepoV1:
         role: Role | None = res.scalar()
         return role
 
+    async def get_roles(self, db: AsyncSession) -> Sequence[Role]:
+        stmt = select(Role)
+        res = await db.execute(stmt)
+        roles: Sequence[Role] = res.scalars().all()
+        return roles
+
     async def get_user_courses(
         self,
         user_id: UUID,
@@ -96,17 +102,97 @@ class UserRepoV1:
         await db.flush()
         await db.refresh(role)
 
+    async def bump_token_version(self, user_id: UUID, db: AsyncSession):
+        stmt = (
+            update(User)
+            .where(User.id == user_id)
+            .values(token_version=User.token_version + 1)
+        )
+        await db.execute(stmt)
+
     async def delete_user(self, user: User, db: AsyncSession):
         """delete user permanently"""
         await db.delete(user)
         await db.flush()
 
-    def delete_users(self, db: Session):
-        """method for background task to delete users from db"""
+    def delete_users(self, cutoff: datetime, batch_size: int, db: Session) -> Row:
+        """deletes one batch of users whose deletion date passed the cutoff
+
+        SKIP LOCKED lets parallel workers take disjoint batches, the removed
+        enrollments are deleted in the same statement so the enrolled course
+        counters are fixed up without reading them back"""
+        batch = (
+            select(User.id)
+            .where(
+                and_(
+                    User.delete_at <= cutoff,
+                    # instructors are skipped until their courses are reassigned
+                    ~exists().where(Course.instructor_id == User.id),
+                )
+            )
+            .order_by(User.delete_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .cte("batch")
+        )
+
+        removed = (
+            delete(Enrollment)
+            .where(Enrollment.user_id.in_(select(batch.c.id)))
+            .returning(Enrollment.course_id)
+            .cte("removed")
+        )
+
+        counts = (
+            select(removed.c.course_id, func.count().label("total"))
+            .group_by(removed.c.course_id)
+            .cte("counts")
+        )
+
+        # courses are locked in id order so parallel batches cannot deadlock
+        locked = (
+            select(Course.id)
+            .where(Course.id.in_(select(counts.c.course_id)))
+            .order_by(Course.id)
+            .with_for_update()
+            .cte("locked")
+        )
+
+        fixed = (
+            update(Course)
+            .where(
+                and_(
+                    Course.id == counts.c.course_id,
+                    Course.id.in_(select(locked.c.id)),
+                )
+            )
+            .values(
+                total_students=func.greatest(
+                    Course.total_students - counts.c.total, 0
+                )
+            )
+            .returning(Course.id)
+            .cte("fixed")
+        )
 
-        stmt = delete(User).where(User.delete_at <= datetime.now(timezone.utc))
+        deleted = (
+            delete(User)
+            .where(User.id.in_(select(batch.c.id)))
+            .returning(User.id)
+            .cte("deleted")
+        )
 
-        db.execute(stmt)
+        stmt = select(
+            select(func.count()).select_from(deleted).scalar_subquery().label("users"),
+            select(func.count())
+            .select_from(removed)
+            .scalar_subquery()
+            .label("enrollments"),
+            select(func.count()).select_from(fixed).scalar_subquery().label("courses"),
+        )
+        res = db.execute(stmt)
+        deleted_rows: Row = res.one()
+        return deleted_rows
 
 
 user_repo_v1 = UserRepoV1()
@@ -3,21 +3,31 @@ from fastapi.requests import Request
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.users import User
+from app.core.deadlines import deadline
+from app.core.columnar import (
+    COLUMNAR_RESPONSES,
+    ColumnarResponse,
+    choose_format,
+)
+from app.api.v1.schemas.auth import PrincipalV1
+from app.core.instrumentation import InstrumentedRoute
 from app.dependencies import get_db, required_roles
 from app.api.v1.services.admin_service import admin_service_v1
 from app.api.v1.schemas.enrollments import EnrollmentResponseV1
 from app.api.v1.schemas.users import UserRole, UserResponseV1, UserReadV1
 
 
-admin_router_v1 = APIRouter()
+admin_router_v1 = APIRouter(route_class=InstrumentedRoute)
 
 
 @admin_router_v1.get(
     "/admin/students/",
     status_code=200,
     response_model=UserResponseV1,
+    response_model_exclude_unset=True,
+    responses=COLUMNAR_RESPONSES,
     description="Get all students on platform",
+    dependencies=[Depends(deadline(5.0))],
 )
 async def get_all_students(
     request: Request,
@@ -28,12 +38,29 @@ async def get_all_students(
     ),
     sort: str = Query(default=None, description="Sort students by created_at"),
     order: str = Query(default=None, description="Sort in asc or desc"),
-    curr_user: User = Depends(required_roles([UserRole.ADMIN])),
+    fields: str = Query(default=None, description="Comma separated fields to return"),
+    curr_user: PrincipalV1 = Depends(required_roles([UserRole.ADMIN])),
     db: AsyncSession = Depends(get_db),
 ):
     refresh_token: str = request.cookies.get("refresh_token")
+    columnar: str | None = choose_format(request.headers.get("accept", ""))
+    if columnar is not None:
+        columns, rows = await admin_service_v1.get_user_rows(
+            curr_user,
+            UserRole.STUDENT,
+            refresh_token,
+            db,
+            q,
+            sort,
+            order,
+            page,
+            limit,
+            fields,
+        )
+        return ColumnarResponse(columns, rows, media_type=columnar)
+
     students: list[UserReadV1] = await admin_service_v1.get_all_students(
-        curr_user, refresh_token, db, q, sort, order, page, limit
+        curr_user, refresh_token, db, q, sort, order, page, limit, fields
     )
     return UserResponseV1(message="Students retrieved successfully", data=students)
 
@@ -42,7 +69,10 @@ async def get_all_students(
     "/admin/instructors/",
     status_code=200,
     response_model=UserResponseV1,
+    response_model_exclude_unset=True,
+    responses=COLUMNAR_RESPONSES,
     description="Get all instructors on platform",
+    dependencies=[Depends(deadline(5.0))],
 )
 async def get_all_instructors(
     request: Request,
@@ -55,12 +85,29 @@ async def get_all_instructors(
     ),
     sort: str = Query(default=None, description="Sort instructors by created_at"),
     order: str = Query(default=None, description="Sort in asc or desc"),
-    curr_user: User = Depends(required_roles([UserRole.ADMIN])),
+    fields: str = Query(default=None, description="Comma separated fields to return"),
+    curr_user: PrincipalV1 = Depends(required_roles([UserRole.ADMIN])),
     db: AsyncSession = Depends(get_db),
 ):
     refresh_token: str = request.cookies.get("refresh_token")
+    columnar: str | None = choose_format(request.headers.get("accept", ""))
+    if columnar is not None:
+        columns, rows = await admin_service_v1.get_user_rows(
+            curr_user,
+            UserRole.INSTRUCTOR,
+            refresh_token,
+            db,
+            q,
+            sort,
+            order,
+            page,
+            limit,
+            fields,
+        )
+        return ColumnarResponse(columns, rows, media_type=columnar)
+
     instructors: list[UserReadV1] = await admin_service_v1.get_all_instructors(
-        curr_user, refresh_token, db, q, sort, order, page, limit
+        curr_user, refresh_token, db, q, sort, order, page, limit, fields
     )
     return UserResponseV1(
         message="Instructors retrieved successfully", data=instructors
@@ -71,7 +118,10 @@ async def get_all_instructors(
     "/admin/enrollments/",
     status_code=200,
     response_model=EnrollmentResponseV1,
+    response_model_exclude_unset=True,
+    responses=COLUMNAR_RESPONSES,
     description="Get all enrollments on platform",
+    dependencies=[Depends(deadline(5.0))],
 )
 async def get_all_enrollments(
     request: Request,
@@ -81,12 +131,20 @@ async def get_all_enrollments(
     ),
     sort: str = Query(default=None, description="Sort enrollments by created_at"),
     order: str = Query(default=None, description="Sort in asc or desc"),
-    curr_user: User = Depends(required_roles([UserRole.ADMIN])),
+    fields: str = Query(default=None, description="Comma separated fields to return"),
+    curr_user: PrincipalV1 = Depends(required_roles([UserRole.ADMIN])),
     db: AsyncSession = Depends(get_db),
 ):
     refresh_token: str = request.cookies.get("refresh_token")
+    columnar: str | None = choose_format(request.headers.get("accept", ""))
+    if columnar is not None:
+        columns, rows = await admin_service_v1.get_enrollment_rows(
+            curr_user, None, refresh_token, db, sort, order, page, limit, fields
+        )
+        return ColumnarResponse(columns, rows, media_type=columnar)
+
     enrollments: list[UserReadV1] = await admin_service_v1.get_all_enrollments(
-        curr_user, refresh_token, db, sort, order, page, limit
+        curr_user, refresh_token, db, sort, order, page, limit, fields
     )
     return EnrollmentResponseV1(
         message="Enrollments retrieved successfully", data=enrollments
@@ -97,7 +155,10 @@ async def get_all_enrollments(
     "/admin/courses/{course_id}/enrollments/",
     status_code=200,
     response_model=EnrollmentResponseV1,
+    response_model_exclude_unset=True,
+    responses=COLUMNAR_RESPONSES,
     description="Get all enrollments on platform",
+    dependencies=[Depends(deadline(5.0))],
 )
 async def get_course_enrollments(
     course_id: UUID,
@@ -108,12 +169,20 @@ async def get_course_enrollments(
     ),
     sort: str = Query(default=None, description="Sort enrollments by created_at"),
     order: str = Query(default=None, description="Sort in asc or desc"),
-    curr_user: User = Depends(required_roles([UserRole.ADMIN])),
+    fields: str = Query(default=None, description="Comma separated fields to return"),
+    curr_user: PrincipalV1 = Depends(required_roles([UserRole.ADMIN])),
     db: AsyncSession = Depends(get_db),
 ):
     refresh_token: str = request.cookies.get("refresh_token")
+    columnar: str | None = choose_format(request.headers.get("accept", ""))
+    if columnar is not None:
+        columns, rows = await admin_service_v1.get_enrollment_rows(
+            curr_user, course_id, refresh_token, db, sort, order, page, limit, fields
+        )
+        return ColumnarResponse(columns, rows, media_type=columnar)
+
     enrollments: list[UserReadV1] = await admin_service_v1.get_course_enrollments(
-        curr_user, course_id, refresh_token, db, sort, order, page, limit
+        curr_user, course_id, refresh_token, db, sort, order, page, limit, fields
     )
     return EnrollmentResponseV1(
         message="Enrollments retrieved successfully", data=enrollments
@@ -129,7 +198,7 @@ async def get_course_enrollments(
 async def assign_admin_role(
     user_id: UUID,
     request: Request,
-    curr_user: User = Depends(required_roles([UserRole.ADMIN])),
+    curr_user: PrincipalV1 = Depends(required_roles([UserRole.ADMIN])),
     db: AsyncSession = Depends(get_db),
 ):
     refresh_token: str = request.cookies.get("refresh_token")
@@ -148,7 +217,7 @@ async def assign_admin_role(
 async def assign_instructor_role(
     user_id: UUID,
     request: Request,
-    curr_user: User = Depends(required_roles([UserRole.ADMIN])),
+    curr_user: PrincipalV1 = Depends(required_roles([UserRole.ADMIN])),
     db: AsyncSession = Depends(get_db),
 ):
     refresh_token: str = request.cookies.get("refresh_token")
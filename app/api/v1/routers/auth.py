@@ -8,13 +8,14 @@ from fastapi.security import OAuth2PasswordRequestForm
 from app.limiter import limiter
 from app.models.users import User
 from app.core.config import settings
-from app.api.v1.schemas.auth import TokenV1
-from app.dependencies import get_db, get_current_user
+from app.api.v1.schemas.auth import TokenV1, PrincipalV1
+from app.core.instrumentation import InstrumentedRoute
+from app.dependencies import get_db, get_current_user, get_current_principal
 from app.api.v1.services.auth_service import auth_service_v1
 from app.api.v1.schemas.users import UserResponseV1, UserCreateV1, UserReadV1
 
 
-auth_router_v1 = APIRouter()
+auth_router_v1 = APIRouter(route_class=InstrumentedRoute)
 
 
 @auth_router_v1.post(
@@ -141,7 +142,7 @@ async def reactivate_account(
 @limiter.limit("3/5minutes")
 async def logout_user(
     request: Request,
-    curr_user: User = Depends(get_current_user),
+    curr_user: PrincipalV1 = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     refresh_token: str = request.cookies.get("refresh_token")
@@ -149,6 +150,23 @@ async def logout_user(
     return UserResponseV1(message="User logout successfully")
 
 
+@auth_router_v1.patch(
+    "/auth/logout-all/",
+    status_code=200,
+    response_model=UserResponseV1,
+    description="Logout from all devices",
+)
+@limiter.limit("3/5minutes")
+async def logout_all_devices(
+    request: Request,
+    curr_user: PrincipalV1 = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    refresh_token: str = request.cookies.get("refresh_token")
+    await auth_service_v1.logout_all(curr_user, refresh_token, db)
+    return UserResponseV1(message="User logout from all devices successfully")
+
+
 @auth_router_v1.delete(
     "/auth/deactivate/",
     status_code=204,
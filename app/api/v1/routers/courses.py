@@ -3,10 +3,12 @@ from fastapi.requests import Request
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.users import User
+from app.core.deadlines import deadline
 from app.api.v1.schemas.users import UserRole
+from app.api.v1.schemas.auth import PrincipalV1
+from app.core.instrumentation import InstrumentedRoute
 from app.api.v1.services.course_service import course_service_v1
-from app.dependencies import get_db, get_current_user, required_roles
+from app.dependencies import get_db, get_current_principal, required_roles
 from app.api.v1.schemas.courses import (
     CourseCreateV1,
     CourseUpdateV1,
@@ -15,14 +17,16 @@ from app.api.v1.schemas.courses import (
 )
 
 
-course_router_v1 = APIRouter()
+course_router_v1 = APIRouter(route_class=InstrumentedRoute)
 
 
 @course_router_v1.get(
     "/courses/",
     status_code=200,
     response_model=CourseResponseV1,
+    response_model_exclude_unset=True,
     description="Get all courses or search for a course by title",
+    dependencies=[Depends(deadline(3.0))],
 )
 async def get_all_courses(
     request: Request,
@@ -34,12 +38,15 @@ async def get_all_courses(
         default=None, description="Sort courses by created_at and duration"
     ),
     order: str = Query(default=None, description="Sort in asc or desc"),
-    _=Depends(get_current_user),
+    fields: str = Query(
+        default=None, description="Comma separated course fields to return"
+    ),
+    _=Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     refresh_token: str = request.cookies.get("refresh_token")
     user_courses: list[CourseReadV1] = await course_service_v1.get_courses(
-        refresh_token, db, q, sort, order, is_active, page, limit
+        refresh_token, db, q, sort, order, is_active, page, limit, fields
     )
     return CourseResponseV1(message="Courses retrieved successfully", data=user_courses)
 
@@ -53,7 +60,7 @@ async def get_all_courses(
 async def get_course_by_id(
     course_id: UUID,
     request: Request,
-    _=Depends(get_current_user),
+    _=Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     refresh_token: str = request.cookies.get("refresh_token")
@@ -72,7 +79,7 @@ async def get_course_by_id(
 async def create_course(
     request: Request,
     course_create: CourseCreateV1,
-    curr_user: User = Depends(required_roles([UserRole.ADMIN])),
+    curr_user: PrincipalV1 = Depends(required_roles([UserRole.ADMIN])),
     db: AsyncSession = Depends(get_db),
 ):
     refresh_token: str = request.cookies.get("refresh_token")
@@ -92,7 +99,7 @@ async def update_course(
     course_id: UUID,
     request: Request,
     course_update: CourseUpdateV1,
-    curr_user: User = Depends(required_roles([UserRole.ADMIN])),
+    curr_user: PrincipalV1 = Depends(required_roles([UserRole.ADMIN])),
     db: AsyncSession = Depends(get_db),
 ):
     refresh_token: str = request.cookies.get("refresh_token")
@@ -110,7 +117,7 @@ async def update_course(
 async def deactivate_course(
     course_id: UUID,
     request: Request,
-    curr_user: User = Depends(required_roles([UserRole.ADMIN])),
+    curr_user: PrincipalV1 = Depends(required_roles([UserRole.ADMIN])),
     db: AsyncSession = Depends(get_db),
 ):
     refresh_token: str = request.cookies.get("refresh_token")
@@ -126,7 +133,7 @@ async def deactivate_course(
 async def reactivate_course(
     course_id: UUID,
     request: Request,
-    curr_user: User = Depends(required_roles([UserRole.ADMIN])),
+    curr_user: PrincipalV1 = Depends(required_roles([UserRole.ADMIN])),
     db: AsyncSession = Depends(get_db),
 ):
     refresh_token: str = request.cookies.get("refresh_token")
@@ -142,7 +149,7 @@ async def reactivate_course(
 async def delete_course(
     course_id: UUID,
     request: Request,
-    curr_user: User = Depends(required_roles([UserRole.ADMIN])),
+    curr_user: PrincipalV1 = Depends(required_roles([UserRole.ADMIN])),
     db: AsyncSession = Depends(get_db),
 ):
     refresh_token: str = request.cookies.get("refresh_token")
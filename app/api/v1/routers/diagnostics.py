@@ -0,0 +1,144 @@
+from fastapi import APIRouter, Depends, Query
+
+
+from app.models.users import User
+from app.dependencies import required_roles
+from app.api.v1.schemas.users import UserRole
+from app.core.instrumentation import InstrumentedRoute
+from app.api.v1.schemas.diagnostics import (
+    MemoryReadV1,
+    ErrorStatsReadV1,
+    SlowQueryReadV1,
+    MemoryResponseV1,
+    SessionStatsReadV1,
+    SlowQueryResponseV1,
+    ErrorStatsResponseV1,
+    SessionStatsResponseV1,
+)
+from app.api.v1.services.diagnostics_service import diagnostics_service_v1
+
+
+diagnostics_router_v1 = APIRouter(route_class=InstrumentedRoute)
+
+
+@diagnostics_router_v1.get(
+    "/admin/diagnostics/slow-queries/",
+    status_code=200,
+    response_model=SlowQueryResponseV1,
+    description="Get the slowest queries by total time, with their plans",
+)
+async def get_slow_queries(
+    limit: int = Query(
+        default=20, ge=1, le=1000, description="Set number of queries to view"
+    ),
+    curr_user: User = Depends(required_roles([UserRole.ADMIN], with_user=True)),
+):
+    slow_queries: list[SlowQueryReadV1] = (
+        await diagnostics_service_v1.get_slow_queries(curr_user, limit)
+    )
+    return SlowQueryResponseV1(
+        message="Slow queries retrieved successfully", data=slow_queries
+    )
+
+
+@diagnostics_router_v1.post(
+    "/admin/diagnostics/memory/start/",
+    status_code=200,
+    response_model=MemoryResponseV1,
+    description="Start tracing allocations and take a baseline snapshot",
+)
+async def start_memory_tracing(
+    # the range tracemalloc.start accepts
+    frames: int = Query(
+        default=10, ge=1, le=65535, description="Frames kept per allocation"
+    ),
+    curr_user: User = Depends(required_roles([UserRole.ADMIN], with_user=True)),
+):
+    memory: MemoryReadV1 = await diagnostics_service_v1.start_memory_tracing(
+        curr_user, frames
+    )
+    return MemoryResponseV1(message="Memory tracing started", data=memory)
+
+
+@diagnostics_router_v1.post(
+    "/admin/diagnostics/memory/stop/",
+    status_code=200,
+    response_model=MemoryResponseV1,
+    description="Stop tracing allocations",
+)
+async def stop_memory_tracing(
+    curr_user: User = Depends(required_roles([UserRole.ADMIN], with_user=True)),
+):
+    memory: MemoryReadV1 = await diagnostics_service_v1.stop_memory_tracing(curr_user)
+    return MemoryResponseV1(message="Memory tracing stopped", data=memory)
+
+
+@diagnostics_router_v1.get(
+    "/admin/diagnostics/memory/top/",
+    status_code=200,
+    response_model=MemoryResponseV1,
+    description="Get the allocation sites holding the most memory",
+)
+async def get_memory_top(
+    limit: int = Query(
+        default=20, ge=1, le=1000, description="Set number of sites to view"
+    ),
+    curr_user: User = Depends(required_roles([UserRole.ADMIN], with_user=True)),
+):
+    memory: MemoryReadV1 = await diagnostics_service_v1.get_memory_top(curr_user, limit)
+    return MemoryResponseV1(message="Memory top retrieved successfully", data=memory)
+
+
+@diagnostics_router_v1.get(
+    "/admin/diagnostics/memory/diff/",
+    status_code=200,
+    response_model=MemoryResponseV1,
+    description="Get the allocation sites that grew the most since the baseline",
+)
+async def get_memory_diff(
+    limit: int = Query(
+        default=20, ge=1, le=1000, description="Set number of sites to view"
+    ),
+    reset: bool = Query(
+        default=False, description="Use the current snapshot as the new baseline"
+    ),
+    curr_user: User = Depends(required_roles([UserRole.ADMIN], with_user=True)),
+):
+    memory: MemoryReadV1 = await diagnostics_service_v1.get_memory_diff(
+        curr_user, limit, reset
+    )
+    return MemoryResponseV1(message="Memory diff retrieved successfully", data=memory)
+
+
+@diagnostics_router_v1.get(
+    "/admin/diagnostics/memory/sessions/",
+    status_code=200,
+    response_model=SessionStatsResponseV1,
+    description="Get the objects left in the session identity map per route",
+)
+async def get_session_stats(
+    curr_user: User = Depends(required_roles([UserRole.ADMIN], with_user=True)),
+):
+    session_stats: list[SessionStatsReadV1] = (
+        await diagnostics_service_v1.get_session_stats(curr_user)
+    )
+    return SessionStatsResponseV1(
+        message="Session stats retrieved successfully", data=session_stats
+    )
+
+
+@diagnostics_router_v1.get(
+    "/admin/diagnostics/errors/",
+    status_code=200,
+    response_model=ErrorStatsResponseV1,
+    description="Get the handled errors per type and the faults reported",
+)
+async def get_error_stats(
+    curr_user: User = Depends(required_roles([UserRole.ADMIN], with_user=True)),
+):
+    error_stats: ErrorStatsReadV1 = await diagnostics_service_v1.get_error_stats(
+        curr_user
+    )
+    return ErrorStatsResponseV1(
+        message="Error stats retrieved successfully", data=error_stats
+    )
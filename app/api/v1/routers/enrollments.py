@@ -5,12 +5,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.users import User
 from app.api.v1.schemas.users import UserRole
+from app.api.v1.schemas.auth import PrincipalV1
+from app.core.instrumentation import InstrumentedRoute
 from app.dependencies import get_db, required_roles
 from app.api.v1.services.enrol_service import enrol_service_v1
 from app.api.v1.schemas.enrollments import EnrollmentResponseV1, EnrollmentReadV1
 
 
-enrollments_router_v1 = APIRouter()
+enrollments_router_v1 = APIRouter(route_class=InstrumentedRoute)
 
 
 @enrollments_router_v1.post(
@@ -22,7 +24,7 @@ enrollments_router_v1 = APIRouter()
 async def create_enrollment(
     course_id: UUID,
     request: Request,
-    curr_user: User = Depends(required_roles([UserRole.STUDENT])),
+    curr_user: User = Depends(required_roles([UserRole.STUDENT], with_user=True)),
     db: AsyncSession = Depends(get_db),
 ):
     refresh_token: str = request.cookies.get("refresh_token")
@@ -42,7 +44,7 @@ async def create_enrollment(
 async def delete_enrollment(
     course_id: UUID,
     request: Request,
-    curr_user: User = Depends(required_roles([UserRole.STUDENT])),
+    curr_user: PrincipalV1 = Depends(required_roles([UserRole.STUDENT])),
     db: AsyncSession = Depends(get_db),
 ):
     refresh_token: str = request.cookies.get("refresh_token")
@@ -4,14 +4,15 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
-from app.models.users import User
+from app.api.v1.schemas.auth import PrincipalV1
+from app.core.instrumentation import InstrumentedRoute
 from app.dependencies import get_db, required_roles
 from app.api.v1.schemas.courses import CourseReadV1, CourseResponseV1
 from app.api.v1.services.instructor_service import instructor_service_v1
 from app.api.v1.schemas.users import UserRole, UserResponseV1, UserReadV1
 
 
-instructor_router_v1 = APIRouter()
+instructor_router_v1 = APIRouter(route_class=InstrumentedRoute)
 
 
 @instructor_router_v1.get(
@@ -28,7 +29,7 @@ async def get_instructor_courses(
         default=None, description="Sort courses by created_at and duration"
     ),
     order: str = Query(default=None, description="Sort in asc or desc"),
-    curr_user: User = Depends(required_roles([UserRole.INSTRUCTOR])),
+    curr_user: PrincipalV1 = Depends(required_roles([UserRole.INSTRUCTOR])),
     db: AsyncSession = Depends(get_db),
 ):
 
@@ -54,7 +55,7 @@ async def get_course_students(
         default=None, description="Sort courses by created_at and duration"
     ),
     order: str = Query(default=None, description="Sort in asc or desc"),
-    curr_user: User = Depends(required_roles([UserRole.INSTRUCTOR])),
+    curr_user: PrincipalV1 = Depends(required_roles([UserRole.INSTRUCTOR])),
     db: AsyncSession = Depends(get_db),
 ):
     refresh_token: str = request.cookies.get("refresh_token")
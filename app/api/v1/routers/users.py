@@ -3,13 +3,15 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.users import User
-from app.dependencies import get_db, get_current_user
+from app.api.v1.schemas.auth import PrincipalV1
+from app.core.instrumentation import InstrumentedRoute
+from app.dependencies import get_db, get_current_user, get_current_principal
 from app.api.v1.services.user_service import user_service_v1
 from app.api.v1.schemas.courses import CourseReadV1, CourseResponseV1
 from app.api.v1.schemas.users import UserResponseV1, UserUpdateV1, UserReadV1
 
 
-user_router_v1 = APIRouter()
+user_router_v1 = APIRouter(route_class=InstrumentedRoute)
 
 
 @user_router_v1.get(
@@ -46,7 +48,7 @@ async def get_user_courses(
         default=None, description="Sort courses by created_at and duration"
     ),
     order: str = Query(default=None, description="Sort in asc or desc"),
-    curr_user: User = Depends(get_current_user),
+    curr_user: PrincipalV1 = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     refresh_token: str = request.cookies.get("refresh_token")
@@ -1,8 +1,12 @@
 import enum
 from uuid import UUID
+from typing import Optional
 from pydantic import BaseModel
 
 
+from app.api.v1.schemas.users import UserRole
+
+
 class TokenStatus(str, enum.Enum):
     VALID: str = "valid"
     REVOKED: str = "revoked"
@@ -11,6 +15,16 @@ class TokenStatus(str, enum.Enum):
 
 class TokenDataV1(BaseModel):
     id: UUID
+    role: Optional[UserRole] = None
+    version: int = 0
+
+
+class PrincipalV1(BaseModel):
+    """the authenticated user as described by the access token claims"""
+
+    id: UUID
+    role: UserRole
+    version: int
 
 
 class TokenV1(BaseModel):
@@ -44,5 +44,22 @@ class CourseUpdateV1(BaseModel):
     duration: Optional[int] = None
 
 
+class CoursePartialV1(BaseModel):
+    """a course trimmed to the fields asked for with fields="""
+
+    id: Optional[UUID] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
+    code: Optional[str] = None
+    capacity: Optional[int] = None
+    duration: Optional[int] = None
+    is_active: Optional[bool] = None
+    total_students: Optional[int] = None
+    created_at: Optional[datetime] = None
+    instructor: Optional[str] = None
+
+
 class CourseResponseV1(ResponseBase):
-    data: Optional[CourseReadV1 | list[CourseReadV1]] = None
+    data: Optional[
+        CourseReadV1 | list[CourseReadV1] | list[CoursePartialV1]
+    ] = None
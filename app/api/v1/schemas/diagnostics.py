@@ -0,0 +1,68 @@
+from typing import Optional
+from pydantic import BaseModel
+
+
+class ResponseBase(BaseModel):
+    message: str
+
+
+class SlowQueryReadV1(BaseModel):
+    statement: str
+    origin: Optional[str] = None
+    params: list[str] | dict
+    calls: int
+    total_ms: float
+    mean_ms: float
+    max_ms: float
+    last_seen: str
+    plan: Optional[list[str]] = None
+
+
+class SlowQueryResponseV1(ResponseBase):
+    data: list[SlowQueryReadV1]
+
+
+class MemoryUsageReadV1(BaseModel):
+    tracing: bool
+    frames: int
+    current_kib: float
+    peak_kib: float
+
+
+class AllocationSiteReadV1(BaseModel):
+    location: str
+    size_kib: float
+    count: int
+    size_diff_kib: Optional[float] = None
+    count_diff: Optional[int] = None
+
+
+class MemoryReadV1(BaseModel):
+    usage: MemoryUsageReadV1
+    allocations: list[AllocationSiteReadV1] = []
+
+
+class MemoryResponseV1(ResponseBase):
+    data: MemoryReadV1
+
+
+class SessionStatsReadV1(BaseModel):
+    route: str
+    requests: int
+    mean_objects: float
+    max_objects: int
+    models: dict[str, int]
+
+
+class SessionStatsResponseV1(ResponseBase):
+    data: list[SessionStatsReadV1]
+
+
+class ErrorStatsReadV1(BaseModel):
+    handled: dict[str, int]
+    reported: dict[str, int]
+    suppressed: dict[str, int]
+
+
+class ErrorStatsResponseV1(ResponseBase):
+    data: ErrorStatsReadV1
@@ -18,5 +18,16 @@ class EnrollmentReadV1(EnrollmentBaseV1):
     pass
 
 
+class EnrollmentPartialV1(BaseModel):
+    """an enrollment trimmed to the fields asked for with fields="""
+
+    course_title: Optional[str] = None
+    course_code: Optional[str] = None
+    course_duration: Optional[int] = None
+    created_at: Optional[datetime] = None
+
+
 class EnrollmentResponseV1(ResponseBase):
-    data: Optional[EnrollmentReadV1 | list[EnrollmentReadV1]] = None
+    data: Optional[
+        EnrollmentReadV1 | list[EnrollmentReadV1] | list[EnrollmentPartialV1]
+    ] = None
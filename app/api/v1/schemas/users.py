@@ -60,5 +60,17 @@ class UserReadV1(UserReadBaseV1):
     role: UserRole
 
 
+class UserPartialV1(BaseModel):
+    """a user trimmed to the fields asked for with fields="""
+
+    id: Optional[UUID] = None
+    name: Optional[str] = None
+    email: Optional[EmailStr] = None
+    nationality: Optional[str] = None
+    is_active: Optional[bool] = None
+    created_at: Optional[datetime] = None
+    role: Optional[UserRole] = None
+
+
 class UserResponseV1(ResponseBase):
-    data: Optional[UserReadV1 | list[UserReadV1]] = None
+    data: Optional[UserReadV1 | list[UserReadV1] | list[UserPartialV1]] = None
@@ -1,17 +1,27 @@
-import sentry_sdk
+import logging
 from uuid import UUID
-from sqlalchemy import Sequence
-import sentry_sdk.logger as sentry_logger
+from sqlalchemy import Row, Sequence
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
-from app.models.users import User, Role
+from app.models.users import User
+from app.models.enrollments import Enrollment
+from app.core.fieldsets import parse_fields
 from app.core.security import validate_refresh_token
-from app.api.v1.schemas.enrollments import EnrollmentReadV1
+from app.api.v1.schemas.auth import PrincipalV1
+from app.api.v1.schemas.enrollments import EnrollmentReadV1, EnrollmentPartialV1
 from app.api.v1.services.user_service import user_service_v1
+from app.api.v1.services.role_registry import role_registry_v1
+from app.api.v1.repositories.auth_repo import auth_repo_v1
 from app.api.v1.repositories.admin_repo import admin_repo_v1
-from app.api.v1.schemas.users import UserReadV1, UserReadBaseV1, UserRole
+from app.api.v1.schemas.users import (
+    UserRole,
+    UserReadV1,
+    UserPartialV1,
+    UserReadBaseV1,
+)
 from app.core.exceptions import (
+    error_reporter,
     ServerError,
     StudentsNotFoundError,
     InstructorsNotFoundError,
@@ -19,10 +29,45 @@ from app.core.exceptions import (
 )
 
 
+logger: logging.Logger = logging.getLogger(__name__)
+
+# enrollment fields are read from the enrolled course
+ENROLLMENT_COURSE_ATTRIBUTES: dict = {
+    "course_title": "title",
+    "course_code": "code",
+    "course_duration": "duration",
+}
+
+
+def user_partial(user: User, fields: list[str]) -> UserPartialV1:
+    # unrequested columns were not loaded and must not be read
+    user_read: UserPartialV1 = UserPartialV1(
+        **{field: getattr(user, field) for field in fields if field != "role"}
+    )
+    if "role" in fields:
+        user_read.role = user.role.name
+
+    return user_read
+
+
+def enrollment_partial(
+    enrollment: Enrollment, fields: list[str]
+) -> EnrollmentPartialV1:
+    enrol_read: EnrollmentPartialV1 = EnrollmentPartialV1()
+    for field in fields:
+        if field in ENROLLMENT_COURSE_ATTRIBUTES:
+            value = getattr(enrollment.course, ENROLLMENT_COURSE_ATTRIBUTES[field])
+        else:
+            value = getattr(enrollment, field)
+        setattr(enrol_read, field, value)
+
+    return enrol_read
+
+
 class AdminServiceV1:
     async def get_all_students(
         self,
-        curr_user: User,
+        curr_user: PrincipalV1,
         refresh_token: str,
         db: AsyncSession,
         q: str | None,
@@ -30,9 +75,12 @@ class AdminServiceV1:
         order: str | None,
         page: int = 1,
         limit: int = 15,
-    ) -> list[UserReadV1]:
+        fields: str | None = None,
+    ) -> list[UserReadV1] | list[UserPartialV1]:
         _ = await validate_refresh_token(refresh_token, db)
 
+        requested: list[str] | None = parse_fields(fields, UserPartialV1)
+
         # prevent negative or float numbers
         if page < 1 or not isinstance(page, int):
             page: int = 1
@@ -43,18 +91,21 @@ class AdminServiceV1:
         offset: int = (page * limit) - limit
 
         try:
-            user_role: Role = await user_service_v1.get_role(UserRole.STUDENT, db)
+            role_id: UUID = await role_registry_v1.get_role_id(UserRole.STUDENT, db)
 
             students_db: Sequence[User] = await admin_repo_v1.get_all_students(
-                db, user_role.id, q, sort, order, offset, limit
+                db, role_id, q, sort, order, offset, limit, requested
             )
 
             if not students_db:
-                sentry_logger.error("Students not found")
                 raise StudentsNotFoundError()
 
-            students: list[UserReadV1] = []
+            students: list[UserReadV1] | list[UserPartialV1] = []
             for student in students_db:
+                if requested is not None:
+                    students.append(user_partial(student, requested))
+                    continue
+
                 user_read: UserReadV1 = UserReadV1(
                     **UserReadBaseV1.model_validate(student).model_dump(),
                     role=student.role.name
@@ -62,27 +113,25 @@ class AdminServiceV1:
 
                 students.append(user_read)
 
-            sentry_logger.info(
-                "Students retrieved from database by admin {id}", id=curr_user.id
-            )
+            logger.info("Students retrieved from database by admin %s", curr_user.id)
             return students
 
         except Exception as e:
             if isinstance(e, StudentsNotFoundError):
                 raise StudentsNotFoundError()
 
-            sentry_sdk.capture_exception(e)
+            error_reporter.capture(e)
 
             error_message = (
                 "Internal server error occured while retrieving"
                 "students from database"
             )
-            sentry_logger.error(error_message)
+            logger.error(error_message)
             raise ServerError() from e
 
     async def get_all_instructors(
         self,
-        curr_user: User,
+        curr_user: PrincipalV1,
         refresh_token: str,
         db: AsyncSession,
         q: str | None,
@@ -90,9 +139,12 @@ class AdminServiceV1:
         order: str | None,
         page: int = 1,
         limit: int = 15,
-    ) -> list[UserReadV1]:
+        fields: str | None = None,
+    ) -> list[UserReadV1] | list[UserPartialV1]:
         _ = await validate_refresh_token(refresh_token, db)
 
+        requested: list[str] | None = parse_fields(fields, UserPartialV1)
+
         # prevent negative or float numbers
         if page < 1 or not isinstance(page, int):
             page: int = 1
@@ -103,18 +155,21 @@ class AdminServiceV1:
         offset: int = (page * limit) - limit
 
         try:
-            user_role: Role = await user_service_v1.get_role(UserRole.INSTRUCTOR, db)
+            role_id: UUID = await role_registry_v1.get_role_id(UserRole.INSTRUCTOR, db)
 
             instructors_db: Sequence[User] = await admin_repo_v1.get_all_instructors(
-                db, user_role.id, q, sort, order, offset, limit
+                db, role_id, q, sort, order, offset, limit, requested
             )
 
             if not instructors_db:
-                sentry_logger.error("Instructors not found")
                 raise InstructorsNotFoundError()
 
-            instructors: list[UserReadV1] = []
+            instructors: list[UserReadV1] | list[UserPartialV1] = []
             for instructor in instructors_db:
+                if requested is not None:
+                    instructors.append(user_partial(instructor, requested))
+                    continue
+
                 user_read: UserReadV1 = UserReadV1(
                     **UserReadBaseV1.model_validate(instructor).model_dump(),
                     role=instructor.role.name
@@ -122,36 +177,37 @@ class AdminServiceV1:
 
                 instructors.append(user_read)
 
-            sentry_logger.info(
-                "Instructors retrieved from database by admin {id}", id=curr_user.id
-            )
+            logger.info("Instructors retrieved from database by admin %s", curr_user.id)
             return instructors
 
         except Exception as e:
             if isinstance(e, InstructorsNotFoundError):
                 raise InstructorsNotFoundError()
 
-            sentry_sdk.capture_exception(e)
+            error_reporter.capture(e)
 
             error_message = (
                 "Internal server error occured while retrieving"
                 "instructors from database"
             )
-            sentry_logger.error(error_message)
+            logger.error(error_message)
             raise ServerError() from e
 
     async def get_all_enrollments(
         self,
-        curr_user: User,
+        curr_user: PrincipalV1,
         refresh_token: str,
         db: AsyncSession,
         sort: str | None,
         order: str | None,
         page: int = 1,
         limit: int = 15,
-    ) -> list[EnrollmentReadV1]:
+        fields: str | None = None,
+    ) -> list[EnrollmentReadV1] | list[EnrollmentPartialV1]:
         _ = await validate_refresh_token(refresh_token, db)
 
+        requested: list[str] | None = parse_fields(fields, EnrollmentPartialV1)
+
         # prevent negative or float numbers
         if page < 1 or not isinstance(page, int):
             page: int = 1
@@ -163,43 +219,45 @@ class AdminServiceV1:
 
         try:
             enrollments_db: Sequence[User] = await admin_repo_v1.get_all_enrollments(
-                sort, order, offset, limit, db
+                sort, order, offset, limit, db, requested
             )
 
             if not enrollments_db:
-                sentry_logger.error("Enrollments not found")
                 raise EnrollmentsNotFoundError()
 
-            enrollments: list[EnrollmentReadV1] = []
+            enrollments: list[EnrollmentReadV1] | list[EnrollmentPartialV1] = []
             for enrollment in enrollments_db:
-                enrol_read = EnrollmentReadV1(
-                    course_title=enrollment.course.title,
-                    course_code=enrollment.course.code,
-                    course_duration=enrollment.course.duration,
-                    created_at=enrollment.created_at,
-                )
+                if requested is not None:
+                    enrol_read = enrollment_partial(enrollment, requested)
+                else:
+                    enrol_read = EnrollmentReadV1(
+                        course_title=enrollment.course.title,
+                        course_code=enrollment.course.code,
+                        course_duration=enrollment.course.duration,
+                        created_at=enrollment.created_at,
+                    )
 
                 enrollments.append(enrol_read)
 
-                error_message = "Enrollments retrieved from database by admin {id}"
-                sentry_logger.info(error_message, id=curr_user.id)
+                error_message = "Enrollments retrieved from database by admin %s"
+                logger.info(error_message, curr_user.id)
             return enrollments
         except Exception as e:
             if isinstance(e, EnrollmentsNotFoundError):
                 raise EnrollmentsNotFoundError()
 
-            sentry_sdk.capture_exception(e)
+            error_reporter.capture(e)
 
             error_message = (
                 "Internal server error occured while retrieving"
                 "Enrollments from database"
             )
-            sentry_logger.error(error_message)
+            logger.error(error_message)
             raise ServerError() from e
 
     async def get_course_enrollments(
         self,
-        curr_user: User,
+        curr_user: PrincipalV1,
         course_id: UUID,
         refresh_token: str,
         db: AsyncSession,
@@ -207,9 +265,12 @@ class AdminServiceV1:
         order: str | None,
         page: int = 1,
         limit: int = 15,
-    ) -> list[EnrollmentReadV1]:
+        fields: str | None = None,
+    ) -> list[EnrollmentReadV1] | list[EnrollmentPartialV1]:
         _ = await validate_refresh_token(refresh_token, db)
 
+        requested: list[str] | None = parse_fields(fields, EnrollmentPartialV1)
+
         # prevent negative or float numbers
         if page < 1 or not isinstance(page, int):
             page: int = 1
@@ -221,117 +282,247 @@ class AdminServiceV1:
 
         try:
             enrollments_db: Sequence[User] = await admin_repo_v1.get_course_enrollments(
-                course_id, sort, order, offset, limit, db
+                course_id, sort, order, offset, limit, db, requested
             )
 
             if not enrollments_db:
-                sentry_logger.error(
-                    "Enrollments not found for course {id}", id=course_id
-                )
                 raise EnrollmentsNotFoundError()
 
-            enrollments: list[EnrollmentReadV1] = []
+            enrollments: list[EnrollmentReadV1] | list[EnrollmentPartialV1] = []
             for enrollment in enrollments_db:
-                enrol_read = EnrollmentReadV1(
-                    course_title=enrollment.course.title,
-                    course_code=enrollment.course.code,
-                    course_duration=enrollment.course.duration,
-                    created_at=enrollment.created_at,
-                )
+                if requested is not None:
+                    enrol_read = enrollment_partial(enrollment, requested)
+                else:
+                    enrol_read = EnrollmentReadV1(
+                        course_title=enrollment.course.title,
+                        course_code=enrollment.course.code,
+                        course_duration=enrollment.course.duration,
+                        created_at=enrollment.created_at,
+                    )
 
                 enrollments.append(enrol_read)
 
                 error_message = (
-                    "Course {course_id} enrollments retrieved from database"
-                    "by admin {admin_id}"
-                )
-                sentry_logger.info(
-                    error_message, course_id=course_id, admin_id=curr_user.id
+                    "Course %s enrollments retrieved from database"
+                    "by admin %s"
                 )
+                logger.info(error_message, course_id, curr_user.id)
             return enrollments
         except Exception as e:
             if isinstance(e, EnrollmentsNotFoundError):
                 raise EnrollmentsNotFoundError()
 
-            sentry_sdk.capture_exception(e)
+            error_reporter.capture(e)
 
             error_message = (
                 "Internal server error occured while retrieving"
-                "Course {id} enrollments from database"
+                "Course %s enrollments from database"
             )
-            sentry_logger.error(error_message, id=course_id)
+            logger.error(error_message, course_id)
+            raise ServerError() from e
+
+    async def get_user_rows(
+        self,
+        curr_user: PrincipalV1,
+        role: UserRole,
+        refresh_token: str,
+        db: AsyncSession,
+        q: str | None,
+        sort: str | None,
+        order: str | None,
+        page: int = 1,
+        limit: int = 15,
+        fields: str | None = None,
+    ) -> tuple[list[str], Sequence[Row]]:
+        """students or instructors as columns and row tuples for the columnar
+        formats, no model is built per row"""
+        _ = await validate_refresh_token(refresh_token, db)
+
+        columns: list[str] = parse_fields(fields, UserPartialV1) or list(
+            UserPartialV1.model_fields
+        )
+        not_found_error: type[Exception] = (
+            StudentsNotFoundError
+            if role == UserRole.STUDENT
+            else InstructorsNotFoundError
+        )
+
+        # prevent negative or float numbers
+        if page < 1 or not isinstance(page, int):
+            page: int = 1
+
+        if limit < 1 or not isinstance(limit, int):
+            limit: int = 15
+
+        offset: int = (page * limit) - limit
+
+        try:
+            role_id: UUID = await role_registry_v1.get_role_id(role, db)
+
+            rows: Sequence[Row] = await admin_repo_v1.get_user_rows(
+                db, role_id, columns, q, sort, order, offset, limit
+            )
+
+            if not rows:
+                raise not_found_error()
+
+            logger.info(
+                "%s rows retrieved from database by admin %s", role.value, curr_user.id
+            )
+            return columns, rows
+
+        except Exception as e:
+            if isinstance(e, not_found_error):
+                raise not_found_error()
+
+            error_reporter.capture(e)
+
+            error_message = (
+                "Internal server error occured while retrieving "
+                "%s rows from database"
+            )
+            logger.error(error_message, role.value)
+            raise ServerError() from e
+
+    async def get_enrollment_rows(
+        self,
+        curr_user: PrincipalV1,
+        course_id: UUID | None,
+        refresh_token: str,
+        db: AsyncSession,
+        sort: str | None,
+        order: str | None,
+        page: int = 1,
+        limit: int = 15,
+        fields: str | None = None,
+    ) -> tuple[list[str], Sequence[Row]]:
+        """enrollments, of every course or of one, as columns and row tuples
+        for the columnar formats"""
+        _ = await validate_refresh_token(refresh_token, db)
+
+        columns: list[str] = parse_fields(fields, EnrollmentPartialV1) or list(
+            EnrollmentPartialV1.model_fields
+        )
+
+        # prevent negative or float numbers
+        if page < 1 or not isinstance(page, int):
+            page: int = 1
+
+        if limit < 1 or not isinstance(limit, int):
+            limit: int = 15
+
+        offset: int = (page * limit) - limit
+
+        try:
+            rows: Sequence[Row] = await admin_repo_v1.get_enrollment_rows(
+                course_id, columns, sort, order, offset, limit, db
+            )
+
+            if not rows:
+                raise EnrollmentsNotFoundError()
+
+            logger.info(
+                "Enrollment rows retrieved from database by admin %s", curr_user.id
+            )
+            return columns, rows
+
+        except Exception as e:
+            if isinstance(e, EnrollmentsNotFoundError):
+                raise EnrollmentsNotFoundError()
+
+            error_reporter.capture(e)
+
+            error_message = (
+                "Internal server error occured while retrieving "
+                "enrollment rows from database"
+            )
+            logger.error(error_message)
             raise ServerError() from e
 
     async def assign_admin_role(
-        self, curr_user: User, user_id: UUID, refresh_token: str, db: AsyncSession
+        self,
+        curr_user: PrincipalV1,
+        user_id: UUID,
+        refresh_token: str,
+        db: AsyncSession,
     ) -> UserReadV1:
         _ = await validate_refresh_token(refresh_token, db)
 
         user: User = await user_service_v1.get_user_by_id(user_id, db)
 
-        user_role: Role = await user_service_v1.get_role(UserRole.ADMIN, db)
+        role_id: UUID = await role_registry_v1.get_role_id(UserRole.ADMIN, db)
 
         try:
-            user.role_id = user_role.id
+            user.role_id = role_id
+            # access tokens carry the role as a claim, bumping the version
+            # rejects the ones already issued with the old role
+            user.token_version += 1
 
             await user_service_v1.add_user(user, db)
+            await auth_repo_v1.revoke_user_tokens(user_id, db)
 
-            sentry_logger.info(
-                "User {user_id} role updated to admin by admin {admin_id}",
-                user_id=user_id, admin_id=curr_user.id
+            logger.info(
+                "User %s role updated to admin by admin %s", user_id, curr_user.id
             )
 
             user_read: UserReadV1 = UserReadV1(
                     **UserReadBaseV1.model_validate(user).model_dump(),
-                    role=user_role.name
+                    role=UserRole.ADMIN
             )
 
             await db.commit()
             return user_read
         except Exception as e:
-            sentry_sdk.capture_exception(e)
+            error_reporter.capture(e)
 
             error_message = (
                 "Internal server error occured while assigning admin role"
-                "to user {user_id} by admin {admin_id}"
+                "to user %s by admin %s"
             )
-            sentry_logger.error(error_message, user_id=user_id, admin_id=curr_user.id)
+            logger.error(error_message, user_id, curr_user.id)
             raise ServerError() from e
 
     async def assign_instructor_role(
-        self, curr_user: User, user_id: UUID, refresh_token: str, db: AsyncSession
+        self,
+        curr_user: PrincipalV1,
+        user_id: UUID,
+        refresh_token: str,
+        db: AsyncSession,
     ) -> UserReadV1:
         _ = await validate_refresh_token(refresh_token, db)
 
         user: User = await user_service_v1.get_user_by_id(user_id, db)
 
-        user_role: Role = await user_service_v1.get_role(UserRole.INSTRUCTOR, db)
+        role_id: UUID = await role_registry_v1.get_role_id(UserRole.INSTRUCTOR, db)
 
         try:
-            user.role_id = user_role.id
+            user.role_id = role_id
+            # access tokens carry the role as a claim, bumping the version
+            # rejects the ones already issued with the old role
+            user.token_version += 1
 
             await user_service_v1.add_user(user, db)
+            await auth_repo_v1.revoke_user_tokens(user_id, db)
 
-            sentry_logger.info(
-                "User {user_id} role updated to instructor by admin {admin_id}",
-                user_id=user_id, admin_id=curr_user.id
+            logger.info(
+                "User %s role updated to instructor by admin %s", user_id, curr_user.id
             )
 
             user_read: UserReadV1 = UserReadV1(
                     **UserReadBaseV1.model_validate(user).model_dump(),
-                    role=user_role.name
+                    role=UserRole.INSTRUCTOR
             )
 
             await db.commit()
             return user_read
         except Exception as e:
-            sentry_sdk.capture_exception(e)
+            error_reporter.capture(e)
 
             error_message = (
                 "Internal server error occured while assigning instructor role"
-                "to user {user_id} by admin {admin_id}"
+                "to user %s by admin %s"
             )
-            sentry_logger.error(error_message, user_id=user_id, admin_id=curr_user.id)
+            logger.error(error_message, user_id, curr_user.id)
             raise ServerError() from e
 
 
@@ -1,36 +1,46 @@
-import sentry_sdk
+import logging
 from uuid import UUID
+from sqlalchemy import Row, Sequence, text
 from sqlalchemy.orm import Session
-import sentry_sdk.logger as sentry_logger
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timezone, timedelta
 
 
+from app.core.config import settings
 from app.models.users import Role, User
 from app.models.auth import RefreshToken
 from app.api.v1.repositories.auth_repo import auth_repo_v1
-from app.api.v1.schemas.auth import TokenDataV1, TokenStatus
+from app.api.v1.schemas.auth import TokenDataV1, TokenStatus, PrincipalV1
 from app.api.v1.services.user_service import user_service_v1
+from app.api.v1.services.purge_service import purge_service_v1
+from app.api.v1.services.role_registry import role_registry_v1
 from app.api.v1.schemas.users import UserCreateV1, UserRole, UserReadBaseV1, UserReadV1
 from app.core.exceptions import (
+    error_reporter,
     UserExistsError,
     ServerError,
     CredentialError,
     UserNotFoundError,
+    AuthenticationError,
 )
 from app.core.security import (
+    hash_token,
+    decode_token,
     hash_password,
     verify_password,
     prepare_tokens,
+    create_access_token,
+    create_refresh_token,
     validate_refresh_token,
 )
 
 
-class AuthServiceV1:
-    async def get_tokens(self, user_id: UUID, db: AsyncSession) -> tuple[str]:
-        token_data: TokenDataV1 = TokenDataV1(id=user_id)
+logger: logging.Logger = logging.getLogger(__name__)
+
 
-        auth_token_data: dict = await prepare_tokens(user_id, token_data)
+class AuthServiceV1:
+    async def get_tokens(self, token_data: TokenDataV1, db: AsyncSession) -> tuple[str]:
+        auth_token_data: dict = await prepare_tokens(token_data.id, token_data)
 
         refresh_token_db: str = auth_token_data.get("refresh_token_db")
         await auth_repo_v1.add_token(refresh_token_db, db)
@@ -49,6 +59,9 @@ class AuthServiceV1:
             refresh_token.status = TokenStatus.REVOKED
 
     async def create_roles(self, roles: list[UserRole], db: AsyncSession):
+        # the registry is reloaded on its next lookup to pick up new role ids
+        role_registry_v1.clear()
+
         for role in roles:
             user_role: Role = await user_service_v1.get_role(role, db)
 
@@ -57,13 +70,13 @@ class AuthServiceV1:
                     role_db: Role = Role(name=role)
                     await user_service_v1.add_role(role_db, db)
                     await db.commit()
-                    sentry_logger.info("Role {name} created", name=role.value)
+                    logger.info("Role %s created", role.value)
                 except Exception as e:
                     await db.rollback()
-                    sentry_sdk.capture_exception(e)
-                    sentry_logger.error(
-                        "Internal server error occured while creating {name} role",
-                        name=role.value,
+                    error_reporter.capture(e)
+                    logger.error(
+                        "Internal server error occured while creating %s role",
+                        role.value,
                     )
                     raise ServerError() from e
 
@@ -71,34 +84,30 @@ class AuthServiceV1:
         user: User = await user_service_v1.get_user_by_email(admin_create.email, db)
 
         if not user:
-            user_role: Role = await user_service_v1.get_role(UserRole.ADMIN, db)
+            role_id: UUID = await role_registry_v1.get_role_id(UserRole.ADMIN, db)
             hashed_password: str = await hash_password(admin_create.password)
 
             admin_in_db: User = User(
                 **admin_create.model_dump(exclude={"password"}),
                 hashed_password=hashed_password,
-                role_id=user_role.id,
+                role_id=role_id,
             )
 
             try:
                 await user_service_v1.add_user(admin_in_db, db)
 
-                sentry_logger.info(
-                    "Admin {id} account created successfully", id=admin_in_db.id
-                )
+                logger.info("Admin %s account created successfully", admin_in_db.id)
 
                 user_read: UserReadV1 = UserReadV1(
                     **UserReadBaseV1.model_validate(admin_in_db).model_dump(),
-                    role=user_role.name
+                    role=UserRole.ADMIN
                 )
                 await db.commit()
                 return user_read
             except Exception as e:
                 await db.rollback()
-                sentry_sdk.capture_exception(e)
-                sentry_logger.error(
-                    "Internal server error occured while creating admin"
-                )
+                error_reporter.capture(e)
+                logger.error("Internal server error occured while creating admin")
                 raise ServerError() from e
 
     async def sign_up(self, user_create: UserCreateV1, db: AsyncSession) -> UserReadV1:
@@ -106,92 +115,119 @@ class AuthServiceV1:
         user: User = await user_service_v1.get_user_by_email(user_create.email, db)
 
         if user:
-            sentry_logger.error(
-                "User attempted to create an account with an existing email {email}",
-                email=user.email,
-            )
             raise UserExistsError()
 
-        user_role: Role = await user_service_v1.get_role(UserRole.STUDENT, db)
+        role_id: UUID = await role_registry_v1.get_role_id(UserRole.STUDENT, db)
         hashed_password: str = await hash_password(user_create.password)
 
         user_in_db: User = User(
             **user_create.model_dump(exclude={"password"}),
             hashed_password=hashed_password,
-            role_id=user_role.id,
+            role_id=role_id,
         )
 
         try:
             await user_service_v1.add_user(user_in_db, db)
 
-            sentry_logger.info(
-                "User {id} account created successfully", id=user_in_db.id
-            )
+            logger.info("User %s account created successfully", user_in_db.id)
 
             user_read: UserReadV1 = UserReadV1(
                 **UserReadBaseV1.model_validate(user_in_db).model_dump(),
-                role=user_role.name
+                role=UserRole.STUDENT
             )
             await db.commit()
             return user_read
         except Exception as e:
             await db.rollback()
-            sentry_sdk.capture_exception(e)
-            sentry_logger.error("Internal server error occured while creating a user")
+            error_reporter.capture(e)
+            logger.error("Internal server error occured while creating a user")
             raise ServerError() from e
 
     async def sign_in(self, email: str, password: str, db: AsyncSession) -> tuple[str]:
         user: User = await user_service_v1.get_user_by_email(email, db)
 
         if not user or not await verify_password(password, user.hashed_password):
-            sentry_logger.error(
-                "Invalid credentials provided for user {email}", email=email
-            )
             raise CredentialError()
 
+        role: UserRole = await role_registry_v1.get_role_name(user.role_id, db)
+        token_data: TokenDataV1 = TokenDataV1(
+            id=user.id, role=role, version=user.token_version
+        )
+
         try:
-            auth_tokens: tuple[str] = await self.get_tokens(user.id, db)
+            auth_tokens: tuple[str] = await self.get_tokens(token_data, db)
 
-            sentry_logger.info("User {id} signed in", id=user.id)
+            logger.info("User %s signed in", user.id)
 
             await db.commit()
             return auth_tokens
         except Exception as e:
             print("HERE")
             await db.rollback()
-            sentry_sdk.capture_exception(e)
-            sentry_logger.error(
-                "Internal server error occured while user {id} attempted to sign in",
-                id=user.id,
+            error_reporter.capture(e)
+            logger.error(
+                "Internal server error occured while user %s attempted to sign in",
+                user.id,
             )
             raise ServerError() from e
 
     async def create_new_token(
         self, refresh_token: str, db: AsyncSession
     ) -> tuple[str]:
-        refresh_token: RefreshToken = await validate_refresh_token(refresh_token, db)
-
-        try:
-            await self.inavlidate_token(refresh_token, TokenStatus.USED, db)
+        payload: dict | None = None
+        if refresh_token is not None:
+            payload = await decode_token(
+                refresh_token, settings.REFRESH_TOKEN_SECRET_KEY
+            )
 
-            refresh_token.used_at = datetime.now(timezone.utc)
-            await auth_repo_v1.add_token(refresh_token, db)
+        if payload is None:
+            raise AuthenticationError()
 
-            user_id: UUID = refresh_token.user_id
-            auth_tokens: tuple[str] = await self.get_tokens(user_id, db)
+        # the replacement is signed before the round trip so the rotation,
+        # the insert and the claims lookup go out as one statement
+        token_data: TokenDataV1 = TokenDataV1(id=payload.get("sub"))
+        new_refresh_token, token_id, token_exp = await create_refresh_token(
+            token_data
+        )
 
-            sentry_logger.info("Access token created")
+        refresh_token_db: RefreshToken = RefreshToken(
+            id=token_id,
+            token=await hash_token(new_refresh_token),
+            user_id=token_data.id,
+            expires_at=token_exp,
+        )
 
-            await db.commit()
-            return auth_tokens
+        try:
+            claims: Row | None = await auth_repo_v1.rotate_refresh_token(
+                payload.get("jti"),
+                datetime.fromtimestamp(payload.get("exp"), timezone.utc),
+                refresh_token_db,
+                db,
+            )
         except Exception as e:
             await db.rollback()
-            sentry_sdk.capture_exception(e)
-            sentry_logger.error(
+            error_reporter.capture(e)
+            logger.error(
                 "Internal server error occured while creating new access token"
             )
             raise ServerError() from e
 
+        if not claims:
+            # revokes the token family when a used token is presented again
+            _ = await validate_refresh_token(refresh_token, db)
+
+            # the token is expired or the user was deactivated
+            raise AuthenticationError()
+
+        # claims are read again so a role change shows up in the new access token
+        token_data.role = await role_registry_v1.get_role_name(claims.role_id, db)
+        token_data.version = claims.token_version
+        access_token: str = await create_access_token(token_data)
+
+        await db.commit()
+        logger.info("Access token created")
+        return access_token, new_refresh_token
+
     async def update_password(
         self,
         refresh_token: str,
@@ -203,16 +239,13 @@ class AuthServiceV1:
         _ = await validate_refresh_token(refresh_token, db)
 
         if not await verify_password(curr_password, curr_user.hashed_password):
-            sentry_logger.error(
-                "User {id} provided an invalid password", id=curr_user.id
-            )
             raise CredentialError()
 
         try:
             curr_user.hashed_password = await hash_password(new_password)
             await user_service_v1.add_user(curr_user, db)
 
-            sentry_logger.info("User {id} password updated", id=curr_user.id)
+            logger.info("User %s password updated", curr_user.id)
 
             user_read: UserReadV1 = UserReadV1(
                 **UserReadBaseV1.model_validate(curr_user).model_dump(),
@@ -223,10 +256,10 @@ class AuthServiceV1:
             return user_read
         except Exception as e:
             await db.rollback()
-            sentry_sdk.capture_exception(e)
-            sentry_logger.error(
-                "Internal server error occured while updating user {id} password",
-                id=curr_user.id,
+            error_reporter.capture(e)
+            logger.error(
+                "Internal server error occured while updating user %s password",
+                curr_user.id,
             )
             raise ServerError() from e
 
@@ -239,14 +272,13 @@ class AuthServiceV1:
         user: User = await user_service_v1.get_user_by_email(email, db)
 
         if not user:
-            sentry_logger.error("User not found with email {email}", email=email)
             raise UserNotFoundError()
 
         try:
             user.hashed_password = await hash_password(new_password)
             await user_service_v1.add_user(user, db)
 
-            sentry_logger.info("User {id} password reset completed", id=user.id)
+            logger.info("User %s password reset completed", user.id)
 
             user_read: UserReadV1 = UserReadV1(
                 **UserReadBaseV1.model_validate(user).model_dump(),
@@ -257,15 +289,15 @@ class AuthServiceV1:
             return user_read
         except Exception as e:
             await db.rollback()
-            sentry_sdk.capture_exception(e)
-            sentry_logger.error(
-                "Internal server error occured while resetting user {id} password",
-                id=user.id,
+            error_reporter.capture(e)
+            logger.error(
+                "Internal server error occured while resetting user %s password",
+                user.id,
             )
             raise ServerError() from e
 
     async def logout(
-        self, curr_user: User, refresh_token: str, db: AsyncSession
+        self, curr_user: PrincipalV1, refresh_token: str, db: AsyncSession
     ):
         refresh_token: RefreshToken = await validate_refresh_token(refresh_token, db)
 
@@ -274,14 +306,37 @@ class AuthServiceV1:
             refresh_token.revoked_at = datetime.now(timezone.utc)
 
             await auth_repo_v1.add_token(refresh_token, db)
-            sentry_logger.info("User {id} logout", id=curr_user.id)
+            logger.info("User %s logout", curr_user.id)
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            error_reporter.capture(e)
+            logger.error(
+                "Internal server error occured while user %s attempted to logout",
+                curr_user.id,
+            )
+            raise ServerError() from e
+
+    async def logout_all(
+        self, curr_user: PrincipalV1, refresh_token: str, db: AsyncSession
+    ):
+        _ = await validate_refresh_token(refresh_token, db)
+
+        try:
+            # one statement revokes the valid token of every family (device)
+            await auth_repo_v1.revoke_user_tokens(curr_user.id, db)
+            # and access tokens issued before are rejected by the user routes
+            await user_service_v1.bump_token_version(curr_user.id, db)
+
+            logger.info("User %s logout from all devices", curr_user.id)
             await db.commit()
         except Exception as e:
             await db.rollback()
-            sentry_sdk.capture_exception(e)
-            sentry_logger.error(
-                "Internal server error occured while user {id} attempted to logout",
-                id=curr_user.id,
+            error_reporter.capture(e)
+            logger.error(
+                "Internal server error occured while user %s attempted to logout"
+                " from all devices",
+                curr_user.id,
             )
             raise ServerError() from e
 
@@ -291,9 +346,6 @@ class AuthServiceV1:
         user: User = await user_service_v1.get_deactivated_user(email, db)
 
         if not user or not await verify_password(password, user.hashed_password):
-            sentry_logger.error(
-                "Invalid credentials provided for user with email {email}", email=email
-            )
             raise CredentialError()
 
         try:
@@ -301,7 +353,7 @@ class AuthServiceV1:
             user.delete_at = None
 
             await user_service_v1.add_user(user, db)
-            sentry_logger.info("User {id} account reactivated", id=user.id)
+            logger.info("User %s account reactivated", user.id)
 
             user_read: UserReadV1 = UserReadV1(
                 **UserReadBaseV1.model_validate(user).model_dump(),
@@ -312,10 +364,10 @@ class AuthServiceV1:
             return user_read
         except Exception as e:
             await db.rollback()
-            sentry_sdk.capture_exception(e)
-            sentry_logger.error(
-                "Internal server error occured while reactivating user {id} account",
-                id=user.id,
+            error_reporter.capture(e)
+            logger.error(
+                "Internal server error occured while reactivating user %s account",
+                user.id,
             )
             raise ServerError() from e
 
@@ -325,10 +377,6 @@ class AuthServiceV1:
         refresh_token: RefreshToken = await validate_refresh_token(refresh_token, db)
 
         if not await verify_password(password, curr_user.hashed_password):
-            sentry_logger.error(
-                "Invalid credentials provided for user {id}",
-                id=curr_user.id,
-            )
             raise CredentialError()
 
         try:
@@ -341,14 +389,14 @@ class AuthServiceV1:
             curr_user.delete_at = datetime.now(timezone.utc) + timedelta(days=30)
             await user_service_v1.add_user(curr_user, db)
 
-            sentry_logger.info("User {id} account reactivated", id=curr_user.id)
+            logger.info("User %s account reactivated", curr_user.id)
             await db.commit()
         except Exception as e:
             await db.rollback()
-            sentry_sdk.capture_exception(e)
-            sentry_logger.error(
-                "Internal server error occured while deactivating user {id} account",
-                id=curr_user.id,
+            error_reporter.capture(e)
+            logger.error(
+                "Internal server error occured while deactivating user %s account",
+                curr_user.id,
             )
             raise ServerError() from e
 
@@ -358,9 +406,6 @@ class AuthServiceV1:
         refresh_token: RefreshToken = await validate_refresh_token(refresh_token, db)
 
         if not await verify_password(password, curr_user.hashed_password):
-            sentry_logger.error(
-                "Invalid credentials provided for user {id}", id=curr_user.id
-            )
             raise CredentialError()
 
         try:
@@ -372,27 +417,98 @@ class AuthServiceV1:
             user_id = curr_user.id
             await user_service_v1.delete_user(curr_user, db)
 
-            sentry_logger.info("User {id} account deleted", id=user_id)
+            logger.info("User %s account deleted", user_id)
             await db.commit()
         except Exception as e:
             await db.rollback()
-            sentry_sdk.capture_exception(e)
-            sentry_logger.error(
-                "Internal server error occured while deleting user {id} account",
-                id=user_id,
+            error_reporter.capture(e)
+            logger.error(
+                "Internal server error occured while deleting user %s account", user_id
             )
             raise ServerError() from e
         
-    def delete_refresh_tokens(self, db: Session):
+    def create_token_partition(self, name: str, start: datetime, db: Session):
+        """creates the partition of the day starting at start
+
+        tokens issued while the maintenance task was down land in the default
+        partition and postgres refuses a partition for a range the default
+        still holds rows of, they are moved out of it first. A day that still
+        fails is rolled back to its savepoint and retried on the next run"""
+        end: datetime = start + timedelta(days=1)
+
+        try:
+            with db.begin_nested():
+                if not auth_repo_v1.default_partition_has_tokens(start, end, db):
+                    auth_repo_v1.create_token_partition(name, start, end, db)
+                    return
+
+                auth_repo_v1.detach_default_partition(db)
+                auth_repo_v1.create_token_partition(name, start, end, db)
+                moved: int = auth_repo_v1.move_default_partition_tokens(
+                    name, start, end, db
+                )
+                auth_repo_v1.attach_default_partition(db)
+
+            logger.info(
+                "%s refresh tokens moved from the default partition to %s", moved, name
+            )
+        except Exception as e:
+            error_reporter.capture(e)
+            logger.error("Refresh token partition %s could not be created", name)
+
+    def manage_token_partitions(self, db: Session):
+        """creates the daily refresh_tokens partitions ahead of time and drops
+        the ones whose tokens have all expired"""
+        today: datetime = datetime.now(timezone.utc).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        days_ahead: int = (
+            settings.REFRESH_TOKEN_EXPIRE_TIME + settings.REFRESH_TOKEN_PARTITIONS_AHEAD
+        )
+
         try:
-            auth_repo_v1.delete_refresh_tokens(db)
-            sentry_logger.info('Refresh tokens deleted')
+            # partition ddl locks the parent table, waiting behind a long
+            # transaction would block every token lookup queued after it
+            db.execute(text("SET LOCAL lock_timeout = '5s'"))
+
+            partitions: Sequence[str] = auth_repo_v1.get_token_partitions(db)
+
+            for offset in range(days_ahead + 1):
+                start: datetime = today + timedelta(days=offset)
+                name: str = f"refresh_tokens_p{start:%Y%m%d}"
+                if name not in partitions:
+                    self.create_token_partition(name, start, db)
+
+            for name in auth_repo_v1.get_token_partitions(db):
+                if not name.startswith("refresh_tokens_p"):
+                    continue
+
+                start: datetime = datetime.strptime(
+                    name.removeprefix("refresh_tokens_p"), "%Y%m%d"
+                ).replace(tzinfo=timezone.utc)
+
+                # every token in the partition expired before today
+                if start + timedelta(days=1) <= today:
+                    auth_repo_v1.drop_token_partition(name, db)
+                    logger.info("Refresh token partition %s dropped", name)
+
             db.commit()
+            logger.info("Refresh token partitions updated")
         except Exception as e:
             db.rollback()
-            sentry_sdk.capture_exception(e)
-            sentry_logger.error('Internal server error while deleting refresh tokens')
+            error_reporter.capture(e)
+            logger.error(
+                "Internal server error while updating refresh token partitions"
+            )
             raise ServerError() from e
 
+        # expired tokens that landed in the default partition
+        purge_service_v1.run(
+            "delete_default_partition_tokens",
+            auth_repo_v1.delete_default_partition_tokens,
+            datetime.now(timezone.utc),
+            db,
+        )
+
 
 auth_service_v1 = AuthServiceV1()
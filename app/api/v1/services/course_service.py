@@ -1,23 +1,26 @@
-import sentry_sdk
+import logging
 from uuid import UUID
 from sqlalchemy import Sequence
-import sentry_sdk.logger as sentry_logger
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
 from app.models.courses import Course
-from app.models.users import User, Role
 from app.api.v1.schemas.users import UserRole
+from app.core.fieldsets import parse_fields
 from app.core.security import validate_refresh_token
+from app.api.v1.schemas.auth import PrincipalV1
 from app.api.v1.services.user_service import user_service_v1
+from app.api.v1.services.role_registry import role_registry_v1
 from app.api.v1.repositories.course_repo import course_repo_v1
 from app.api.v1.schemas.courses import (
     CourseCreateV1,
     CourseReadV1,
     CourseUpdateV1,
     CourseReadBaseV1,
+    CoursePartialV1,
 )
 from app.core.exceptions import (
+    error_reporter,
     ServerError,
     CourseExistsError,
     CourseNotFoundError,
@@ -26,6 +29,9 @@ from app.core.exceptions import (
 )
 
 
+logger: logging.Logger = logging.getLogger(__name__)
+
+
 class CourseServiceV1:
     async def get_courses(
         self,
@@ -37,10 +43,15 @@ class CourseServiceV1:
         is_active: bool | None,
         page: int = 1,
         limit: int = 15,
-    ) -> list[CourseReadV1]:
-        """to view only active courses, the is_active parameter is set to True"""
+        fields: str | None = None,
+    ) -> list[CourseReadV1] | list[CoursePartialV1]:
+        """to view only active courses, the is_active parameter is set to True
+
+        with fields only the requested fields are selected and returned"""
         _ = await validate_refresh_token(refresh_token, db)
 
+        requested: list[str] | None = parse_fields(fields, CoursePartialV1)
+
         # prevent negative or float numbers
         if page < 1 or not isinstance(page, int):
             page: int = 1
@@ -52,32 +63,43 @@ class CourseServiceV1:
 
         try:
             courses_db: Sequence[Course] = await course_repo_v1.get_courses(
-                db, q, sort, order, is_active, offset, limit
+                db, q, sort, order, is_active, offset, limit, requested
             )
 
             if not courses_db:
-                sentry_logger.error("Courses not found")
                 raise CoursesNotFoundError()
 
-            user_courses: list[CourseReadV1] = []
+            user_courses: list[CourseReadV1] | list[CoursePartialV1] = []
             for course_db in courses_db:
                 """a pagination has been applied which limits the number of courses
                 to select, reducing the number of courses to iterate over"""
-                course_read = CourseReadV1(
-                    **CourseReadBaseV1.model_validate(course_db).model_dump(),
-                    instructor=course_db.instructor.name
-                )
+                if requested is not None:
+                    # unrequested columns were not loaded and must not be read
+                    course_read = CoursePartialV1(
+                        **{
+                            field: getattr(course_db, field)
+                            for field in requested
+                            if field != "instructor"
+                        }
+                    )
+                    if "instructor" in requested:
+                        course_read.instructor = course_db.instructor.name
+                else:
+                    course_read = CourseReadV1(
+                        **CourseReadBaseV1.model_validate(course_db).model_dump(),
+                        instructor=course_db.instructor.name
+                    )
 
                 user_courses.append(course_read)
 
-            sentry_logger.info("Courses retrieved from database")
+            logger.info("Courses retrieved from database")
             return user_courses
         except Exception as e:
             if isinstance(e, CoursesNotFoundError):
                 raise CoursesNotFoundError()
 
-            sentry_sdk.capture_exception(e)
-            sentry_logger.error(
+            error_reporter.capture(e)
+            logger.error(
                 "Internal server error occured while retrieving courses from database"
             )
             raise ServerError() from e
@@ -91,7 +113,6 @@ class CourseServiceV1:
             course: Course | None = await course_repo_v1.get_course_by_id(course_id, db)
 
             if not course:
-                sentry_logger.error("Course not found with the id {id}", id=course_id)
                 raise CourseNotFoundError()
 
             course_read: CourseReadV1 = CourseReadV1(
@@ -99,16 +120,16 @@ class CourseServiceV1:
                 instructor=course.instructor.name
             )
 
-            sentry_logger.info("Course {id} retrieved from database", id=course_id)
+            logger.info("Course %s retrieved from database", course_id)
             return course_read
         except Exception as e:
             if isinstance(e, CourseNotFoundError):
                 raise CourseNotFoundError()
 
-            sentry_sdk.capture_exception(e)
-            sentry_logger.error(
-                "Internal server error occured while retrieving course {id} from database",
-                id=course_id,
+            error_reporter.capture(e)
+            logger.error(
+                "Internal server error occured while retrieving course %s from database",
+                course_id,
             )
             raise ServerError() from e
 
@@ -122,7 +143,7 @@ class CourseServiceV1:
 
     async def create_course(
         self,
-        curr_user: User,
+        curr_user: PrincipalV1,
         course_create: CourseCreateV1,
         refresh_token: str,
         db: AsyncSession,
@@ -134,21 +155,15 @@ class CourseServiceV1:
         )
 
         if course_with_code:
-            sentry_logger.error(
-                "User {id} attempted to create an existing course", id=curr_user.id
-            )
             raise CourseExistsError()
         
-        user_role: Role = await user_service_v1.get_role(UserRole.INSTRUCTOR, db)
+        role_id: UUID = await role_registry_v1.get_role_id(UserRole.INSTRUCTOR, db)
 
         instructor_id: UUID | None = await user_service_v1.get_instructor_id(
-            course_create.instructor, user_role.id, db
+            course_create.instructor, role_id, db
         )
 
         if not instructor_id:
-            sentry_logger.error(
-                "Instructor for course {name} does not exists", db=course_create.title
-            )
             raise InstructorNotFoundError()
 
         try:
@@ -160,7 +175,7 @@ class CourseServiceV1:
 
             await course_repo_v1.add_course(course_db, db)
 
-            sentry_logger.info("Course created by admin {id}", id=curr_user.id)
+            logger.info("Course created by admin %s", curr_user.id)
 
             course_read: CourseReadV1 = CourseReadV1(
                 **CourseReadBaseV1.model_validate(course_db).model_dump(),
@@ -171,16 +186,15 @@ class CourseServiceV1:
             return course_read
         except Exception as e:
             await db.rollback()
-            sentry_sdk.capture_exception(e)
-            sentry_logger.error(
-                "Internal server error occured while creating course {id}",
-                id=course_id,
+            error_reporter.capture(e)
+            logger.error(
+                "Internal server error occured while creating course %s", course_id
             )
             raise ServerError() from e
 
     async def update_course(
         self,
-        curr_user: User,
+        curr_user: PrincipalV1,
         course_id: UUID,
         course_update: CourseUpdateV1,
         refresh_token: str,
@@ -191,7 +205,6 @@ class CourseServiceV1:
         course: Course | None = await course_repo_v1.get_course_by_id(course_id, db)
 
         if not course:
-            sentry_logger.error("Course not found with the id {id}", id=course_id)
             raise CourseNotFoundError()
 
         if course_update.code:
@@ -200,23 +213,16 @@ class CourseServiceV1:
             )
 
             if course_with_code:
-                sentry_logger.error(
-                    "User {id} attempted to create an existing course", id=curr_user.id
-                )
                 raise CourseExistsError()
 
         if course_update.instructor:
-            user_role: Role = await user_service_v1.get_role(UserRole.INSTRUCTOR, db)
+            role_id: UUID = await role_registry_v1.get_role_id(UserRole.INSTRUCTOR, db)
 
             instructor_id: UUID | None = await user_service_v1.get_instructor_id(
-                course_update.instructor, user_role.id, db
+                course_update.instructor, role_id, db
             )
 
             if not instructor_id:
-                sentry_logger.error(
-                    "Instructor for course {name} does not exists",
-                    db=course_update.title,
-                )
                 raise InstructorNotFoundError()
 
         course_update_dict: dict = course_update.model_dump(exclude_unset=True)
@@ -231,31 +237,29 @@ class CourseServiceV1:
                 **CourseReadBaseV1.model_validate(course).model_dump(),
                 instructor=course.instructor.name
             )
-            sentry_logger.info(
-                "Course {course_id} updated by admin {admin_id}",
-                course_id=course_id,
-                admin_id=curr_user.id,
-            )
+            logger.info("Course %s updated by admin %s", course_id, curr_user.id)
             await db.commit()
             return course_read
         except Exception as e:
             await db.rollback()
-            sentry_sdk.capture_exception(e)
-            sentry_logger.error(
-                "Internal server error occured while updating course {id}",
-                id=course_id,
+            error_reporter.capture(e)
+            logger.error(
+                "Internal server error occured while updating course %s", course_id
             )
             raise ServerError() from e
 
     async def reactivate_course(
-        self, curr_user: User, course_id: UUID, refresh_token: str, db: AsyncSession
+        self,
+        curr_user: PrincipalV1,
+        course_id: UUID,
+        refresh_token: str,
+        db: AsyncSession,
     ) -> CourseReadV1:
         _ = await validate_refresh_token(refresh_token, db)
 
         course: Course | None = await course_repo_v1.get_course_by_id(course_id, db)
 
         if not course:
-            sentry_logger.error("Course not found with the id {id}", id=course_id)
             raise CourseNotFoundError()
 
         try:
@@ -266,76 +270,67 @@ class CourseServiceV1:
                 **CourseReadBaseV1.model_validate(course).model_dump(),
                 instructor=course.instructor.name
             )
-            sentry_logger.info(
-                "Course {course_id} reactivated by admin {admin_id}",
-                course_id=course_id,
-                admin_id=curr_user.id,
-            )
+            logger.info("Course %s reactivated by admin %s", course_id, curr_user.id)
             await db.commit()
             return course_read
         except Exception as e:
             await db.rollback()
-            sentry_sdk.capture_exception(e)
-            sentry_logger.error(
-                "Internal server error occured while reactivating course {id}",
-                id=course_id,
+            error_reporter.capture(e)
+            logger.error(
+                "Internal server error occured while reactivating course %s", course_id
             )
             raise ServerError() from e
 
     async def deactivate_course(
-        self, curr_user: User, course_id: UUID, refresh_token: str, db: AsyncSession
+        self,
+        curr_user: PrincipalV1,
+        course_id: UUID,
+        refresh_token: str,
+        db: AsyncSession,
     ):
         _ = await validate_refresh_token(refresh_token, db)
 
         course: Course | None = await course_repo_v1.get_course_by_id(course_id, db)
 
         if not course:
-            sentry_logger.error("Course not found with the id {id}", id=course_id)
             raise CourseNotFoundError()
 
         try:
             course.is_active = False
             await course_repo_v1.add_course(course, db)
-            sentry_logger.info(
-                "Course {course_id} deactivated by admin {admin_id}",
-                course_id=course_id,
-                admin_id=curr_user.id,
-            )
+            logger.info("Course %s deactivated by admin %s", course_id, curr_user.id)
             await db.commit()
         except Exception as e:
             await db.rollback()
-            sentry_sdk.capture_exception(e)
-            sentry_logger.error(
-                "Internal server error occured while deactivating course {id}",
-                id=course_id,
+            error_reporter.capture(e)
+            logger.error(
+                "Internal server error occured while deactivating course %s", course_id
             )
             raise ServerError() from e
 
     async def delete_course(
-        self, curr_user: User, course_id: UUID, refresh_token: str, db: AsyncSession
+        self,
+        curr_user: PrincipalV1,
+        course_id: UUID,
+        refresh_token: str,
+        db: AsyncSession,
     ):
         _ = await validate_refresh_token(refresh_token, db)
 
         course: Course | None = await course_repo_v1.get_course_by_id(course_id, db)
 
         if not course:
-            sentry_logger.error("Course not found with the id {id}", id=course_id)
             raise CourseNotFoundError()
 
         try:
             await course_repo_v1.delete_course(course, db)
-            sentry_logger.info(
-                "Course {course_id} deleted by admin {admin_id}",
-                course_id=course_id,
-                admin_id=curr_user.id,
-            )
+            logger.info("Course %s deleted by admin %s", course_id, curr_user.id)
             await db.commit()
         except Exception as e:
             await db.rollback()
-            sentry_sdk.capture_exception(e)
-            sentry_logger.error(
-                "Internal server error occured while deleting course {id}",
-                id=course_id,
+            error_reporter.capture(e)
+            logger.error(
+                "Internal server error occured while deleting course %s", course_id
             )
             raise ServerError() from e
 
@@ -0,0 +1,79 @@
+import logging
+from starlette.concurrency import run_in_threadpool
+
+
+from app.models.users import User
+from app.core.slow_queries import slow_query_log
+from app.core.exceptions import MemoryTracingError, error_reporter
+from app.core.memory import memory_tracker, identity_map_stats
+from app.api.v1.schemas.diagnostics import (
+    MemoryReadV1,
+    ErrorStatsReadV1,
+    SlowQueryReadV1,
+    SessionStatsReadV1,
+)
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class DiagnosticsServiceV1:
+    async def get_slow_queries(
+        self, curr_user: User, limit: int
+    ) -> list[SlowQueryReadV1]:
+        # the log files are read off the event loop
+        slow_queries: list[dict] = await run_in_threadpool(
+            slow_query_log.summarize, limit
+        )
+
+        logger.info("Slow queries retrieved by admin %s", curr_user.id)
+        return [SlowQueryReadV1(**query) for query in slow_queries]
+
+    async def start_memory_tracing(self, curr_user: User, frames: int) -> MemoryReadV1:
+        # the baseline snapshot walks every traced block, off the event loop
+        await run_in_threadpool(memory_tracker.start, frames)
+        identity_map_stats.clear()
+
+        logger.info("Memory tracing started by admin %s", curr_user.id)
+        return MemoryReadV1(usage=memory_tracker.usage())
+
+    async def stop_memory_tracing(self, curr_user: User) -> MemoryReadV1:
+        self.check_tracing()
+        usage: dict = memory_tracker.usage()
+        memory_tracker.stop()
+
+        logger.info("Memory tracing stopped by admin %s", curr_user.id)
+        return MemoryReadV1(usage=usage)
+
+    async def get_memory_top(self, curr_user: User, limit: int) -> MemoryReadV1:
+        self.check_tracing()
+        allocations: list[dict] = await run_in_threadpool(memory_tracker.top, limit)
+
+        logger.info("Memory top retrieved by admin %s", curr_user.id)
+        return MemoryReadV1(usage=memory_tracker.usage(), allocations=allocations)
+
+    async def get_memory_diff(
+        self, curr_user: User, limit: int, reset: bool
+    ) -> MemoryReadV1:
+        self.check_tracing()
+        allocations: list[dict] = await run_in_threadpool(
+            memory_tracker.diff, limit, reset
+        )
+
+        logger.info("Memory diff retrieved by admin %s", curr_user.id)
+        return MemoryReadV1(usage=memory_tracker.usage(), allocations=allocations)
+
+    async def get_session_stats(self, curr_user: User) -> list[SessionStatsReadV1]:
+        logger.info("Session stats retrieved by admin %s", curr_user.id)
+        return [SessionStatsReadV1(**stats) for stats in identity_map_stats.summarize()]
+
+    async def get_error_stats(self, curr_user: User) -> ErrorStatsReadV1:
+        logger.info("Error stats retrieved by admin %s", curr_user.id)
+        return ErrorStatsReadV1(**error_reporter.stats())
+
+    def check_tracing(self):
+        if not memory_tracker.tracing or memory_tracker.baseline is None:
+            raise MemoryTracingError()
+
+
+diagnostics_service_v1 = DiagnosticsServiceV1()
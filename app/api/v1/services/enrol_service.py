@@ -1,6 +1,5 @@
-import sentry_sdk
+import logging
 from uuid import UUID
-import sentry_sdk.logger as sentry_logger
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
@@ -8,10 +7,12 @@ from app.models.users import User
 from app.models.courses import Course
 from app.models.enrollments import Enrollment
 from app.core.security import validate_refresh_token
+from app.api.v1.schemas.auth import PrincipalV1
 from app.api.v1.schemas.enrollments import EnrollmentReadV1
 from app.api.v1.repositories.enrol_repo import enrol_repo_v1
 from app.api.v1.services.course_service import course_service_v1
 from app.core.exceptions import (
+    error_reporter,
     ServerError,
     EnrollmentError,
     CourseNotFoundError,
@@ -20,6 +21,9 @@ from app.core.exceptions import (
 )
 
 
+logger: logging.Logger = logging.getLogger(__name__)
+
+
 class EnrolServiceV1:
     async def create_enrollment(
         self, curr_user: User, course_id: UUID, refresh_token: str, db: AsyncSession
@@ -29,11 +33,9 @@ class EnrolServiceV1:
         course: Course | None = await course_service_v1.get_course(course_id, db)
 
         if not course:
-            sentry_logger.error("Course not found with the id {id}", id=course_id)
             raise CourseNotFoundError()
 
         if course.capacity == course.total_students or course.is_active is False:
-            sentry_logger.error("Course {id} is full", id=course_id)
             raise EnrollmentError()
 
         enrol_db: Enrollment | None = await enrol_repo_v1.get_enrollment(
@@ -41,25 +43,18 @@ class EnrolServiceV1:
         )
 
         if enrol_db:
-            sentry_logger.error(
-                "User {user_id} already enrolled for course {course_id}",
-                user_id=curr_user.id,
-                course_id=course_id,
-            )
             raise EnrollmentExistsError()
 
         try:
-            await enrol_repo_v1.create_enrollment(curr_user, course, db)
+            enrol_db: Enrollment = await enrol_repo_v1.create_enrollment(
+                curr_user, course, db
+            )
 
             course.total_students += 1
 
             # update course with the new total students
             await course_service_v1.add_course(course, db)
 
-            enrol_db: Enrollment | None = await enrol_repo_v1.get_enrollment(
-                curr_user.id, course_id, db
-            )
-
             enrol_read: EnrollmentReadV1 = EnrollmentReadV1(
                 course_title=course.title,
                 course_code=course.code,
@@ -67,38 +62,33 @@ class EnrolServiceV1:
                 created_at=enrol_db.created_at,
             )
 
-            sentry_logger.info(
-                "User {user_id} enrolled for course {course_id}",
-                user_id=curr_user.id,
-                course_id=course_id,
-            )
+            logger.info("User %s enrolled for course %s", curr_user.id, course_id)
             await db.commit()
             return enrol_read
         except Exception as e:
             await db.rollback()
-            sentry_sdk.capture_exception(e)
+            error_reporter.capture(e)
 
             error_message = (
                 "Internal server error occured while enrolling user"
-                "{user_id} for course {course_id}"
+                "%s for course %s"
             )
 
-            sentry_logger.error(
-                error_message,
-                user_id=curr_user.id,
-                course_id=course_id,
-            )
+            logger.error(error_message, curr_user.id, course_id)
             raise ServerError() from e
 
     async def delete_enrollment(
-        self, curr_user: User, course_id: UUID, refresh_token: str, db: AsyncSession
+        self,
+        curr_user: PrincipalV1,
+        course_id: UUID,
+        refresh_token: str,
+        db: AsyncSession,
     ):
         _ = await validate_refresh_token(refresh_token, db)
 
         course: Course | None = await course_service_v1.get_course(course_id, db)
 
         if not course:
-            sentry_logger.error("Course not found with the id {id}", id=course_id)
             raise CourseNotFoundError()
 
         enrol_db: Enrollment | None = await enrol_repo_v1.get_enrollment(
@@ -106,11 +96,6 @@ class EnrolServiceV1:
         )
 
         if not enrol_db:
-            sentry_logger.error(
-                "User {user_id} enrollment not found for course {course_id}",
-                user_id=curr_user.id,
-                course_id=course_id,
-            )
             raise EnrollmentNotFoundError()
 
         try:
@@ -118,18 +103,14 @@ class EnrolServiceV1:
             await db.commit()
         except Exception as e:
             await db.rollback()
-            sentry_sdk.capture_exception(e)
+            error_reporter.capture(e)
 
             error_message = (
                 "Internal server error occured while deleting"
-                "user {user_id} enrollment for course {course_id}"
+                "user %s enrollment for course %s"
             )
 
-            sentry_logger.error(
-                error_message,
-                user_id=curr_user.id,
-                course_id=course_id,
-            )
+            logger.error(error_message, curr_user.id, course_id)
             raise ServerError() from e
 
 
@@ -1,27 +1,31 @@
-import sentry_sdk
+import logging
 from uuid import UUID
 from sqlalchemy import Sequence
-import sentry_sdk.logger as sentry_logger
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
 from app.models.users import User
 from app.models.courses import Course
 from app.core.security import validate_refresh_token
+from app.api.v1.schemas.auth import PrincipalV1
 from app.api.v1.schemas.users import UserReadV1, UserReadBaseV1
 from app.api.v1.schemas.courses import CourseReadV1, CourseReadBaseV1
 from app.api.v1.repositories.instructor_repo import instructor_repo_v1
 from app.core.exceptions import (
+    error_reporter,
     ServerError,
     UsersNotFoundError,
     CoursesNotFoundError,
 )
 
 
+logger: logging.Logger = logging.getLogger(__name__)
+
+
 class InstructorService:
     async def get_instructor_courses(
         self,
-        curr_user: User,
+        curr_user: PrincipalV1,
         refresh_token: str,
         db: AsyncSession,
         sort: str | None,
@@ -48,9 +52,6 @@ class InstructorService:
             )
 
             if not courses_db:
-                sentry_logger.error(
-                    "Instructor {id} courses not found", id=curr_user.id
-                )
                 raise CoursesNotFoundError()
 
             user_courses: list[CourseReadV1] = []
@@ -64,30 +65,25 @@ class InstructorService:
 
                 user_courses.append(course_read)
 
-            sentry_logger.info(
-                "Instructor {id} courses retrieved from database", id=curr_user.id
-            )
+            logger.info("Instructor %s courses retrieved from database", curr_user.id)
             return user_courses
         except Exception as e:
             if isinstance(e, CoursesNotFoundError):
                 raise CoursesNotFoundError()
 
-            sentry_sdk.capture_exception(e)
+            error_reporter.capture(e)
 
             error_message = (
-                "Internal server error occured while retrieving instructor {id}"
+                "Internal server error occured while retrieving instructor %s"
                 "courses from database"
             )
 
-            sentry_logger.error(
-                error_message,
-                id=curr_user.id,
-            )
+            logger.error(error_message, curr_user.id)
             raise ServerError() from e
 
     async def get_course_students(
         self,
-        curr_user: User,
+        curr_user: PrincipalV1,
         course_id: UUID,
         refresh_token: str,
         db: AsyncSession,
@@ -115,7 +111,6 @@ class InstructorService:
             )
 
             if not course_students_db:
-                sentry_logger.error("Students not found for course {id}", id=course_id)
                 raise UsersNotFoundError()
             
             course_students: list[UserReadV1] = []
@@ -127,23 +122,20 @@ class InstructorService:
 
                 course_students.append(user_read)
             
-            sentry_logger.info("Course {id} students retrieved from database", id=course_id)
+            logger.info("Course %s students retrieved from database", course_id)
             return course_students
         except Exception as e:
             if isinstance(e, UsersNotFoundError):
                 raise UsersNotFoundError()
 
-            sentry_sdk.capture_exception(e)
+            error_reporter.capture(e)
 
             error_message = (
-                "Internal server error occured while retrieving course {id}"
+                "Internal server error occured while retrieving course %s"
                 "students from database"
             )
 
-            sentry_logger.error(
-                error_message,
-                id=course_id,
-            )
+            logger.error(error_message, course_id)
             raise ServerError() from e
 
 
@@ -0,0 +1,89 @@
+import time
+import logging
+from typing import Callable
+from sqlalchemy.orm import Session
+from datetime import datetime
+
+
+from app.core.config import settings
+from app.models.purge_jobs import PurgeJob
+from app.core.exceptions import ServerError, error_reporter
+from app.api.v1.repositories.purge_repo import purge_repo_v1
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class PurgeServiceV1:
+    def run(
+        self,
+        name: str,
+        delete_batch: Callable[[datetime, int, Session], int],
+        cutoff: datetime,
+        db: Session,
+    ) -> int:
+        """deletes rows in batches, each in its own short transaction
+
+        the job row is a checkpoint so a run stopped by PURGE_MAX_BATCHES or a
+        worker crash is resumed with the same cutoff. Several workers can run
+        the same job at once since delete_batch skips rows locked by others"""
+        try:
+            job: PurgeJob = purge_repo_v1.start_job(name, cutoff, db)
+            cutoff = job.cutoff
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            error_reporter.capture(e)
+            logger.error("Internal server error while starting %s", name)
+            raise ServerError() from e
+
+        deleted_rows: int = 0
+
+        for batch in range(1, settings.PURGE_MAX_BATCHES + 1):
+            start: float = time.monotonic()
+
+            try:
+                batch_rows: int = delete_batch(cutoff, settings.PURGE_BATCH_SIZE, db)
+
+                if batch_rows:
+                    purge_repo_v1.record_batch(name, batch_rows, db)
+                else:
+                    purge_repo_v1.finish_job(name, db)
+
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                error_reporter.capture(e)
+                logger.error(
+                    "Internal server error while running batch %s of %s", batch, name
+                )
+                raise ServerError() from e
+
+            if not batch_rows:
+                logger.info("%s finished, %s rows deleted", name, deleted_rows)
+                break
+
+            elapsed: float = time.monotonic() - start
+            deleted_rows += batch_rows
+
+            logger.info(
+                "%s batch %s deleted %s rows in %sms (%s so far)",
+                name,
+                batch,
+                batch_rows,
+                round(elapsed * 1000),
+                deleted_rows,
+            )
+
+            # backpressure, slower batches mean a busier database so the pause
+            # grows with them and the purge never holds more than its duty cycle
+            time.sleep(self.pause(elapsed))
+
+        return deleted_rows
+
+    def pause(self, elapsed: float) -> float:
+        duty_cycle: float = min(max(settings.PURGE_DUTY_CYCLE, 0.01), 1.0)
+        return max(settings.PURGE_BATCH_SLEEP, elapsed * (1 / duty_cycle - 1))
+
+
+purge_service_v1 = PurgeServiceV1()
@@ -0,0 +1,77 @@
+import asyncio
+import logging
+from uuid import UUID
+from typing import Mapping
+from sqlalchemy import Sequence
+from types import MappingProxyType
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+from app.models.users import Role
+from app.core.exceptions import ServerError
+from app.api.v1.schemas.users import UserRole
+from app.api.v1.repositories.user_repo import user_repo_v1
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class RoleRegistryV1:
+    """in-process name <-> id mapping of the roles table
+
+    roles never change after seeding so the table is read once at startup,
+    a lookup miss refreshes the mapping in case roles were seeded afterwards"""
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self._ids: Mapping[UserRole, UUID] = MappingProxyType({})
+        self._names: Mapping[UUID, UserRole] = MappingProxyType({})
+
+    async def load(self, db: AsyncSession):
+        roles: Sequence[Role] = await user_repo_v1.get_roles(db)
+
+        # new mappings are swapped in whole so readers never see a partial one
+        self._ids = MappingProxyType({role.name: role.id for role in roles})
+        self._names = MappingProxyType({role.id: role.name for role in roles})
+        logger.info("Role registry loaded with %s roles", len(roles))
+
+    async def refresh(self, db: AsyncSession, loaded: Mapping):
+        async with self._lock:
+            # another request may have refreshed while this one waited
+            if self._ids is loaded:
+                await self.load(db)
+
+    def clear(self):
+        self._ids = MappingProxyType({})
+        self._names = MappingProxyType({})
+
+    async def get_role_id(self, role: UserRole, db: AsyncSession) -> UUID:
+        ids: Mapping[UserRole, UUID] = self._ids
+        role_id: UUID | None = ids.get(role)
+
+        if role_id is None:
+            await self.refresh(db, ids)
+            role_id = self._ids.get(role)
+
+        if role_id is None:
+            logger.error("Role %s not found in database", role.value)
+            raise ServerError()
+
+        return role_id
+
+    async def get_role_name(self, role_id: UUID, db: AsyncSession) -> UserRole:
+        ids: Mapping[UserRole, UUID] = self._ids
+        role_name: UserRole | None = self._names.get(role_id)
+
+        if role_name is None:
+            await self.refresh(db, ids)
+            role_name = self._names.get(role_id)
+
+        if role_name is None:
+            logger.error("Role %s not found in database", role_id)
+            raise ServerError()
+
+        return role_name
+
+
+role_registry_v1 = RoleRegistryV1()
@@ -1,18 +1,21 @@
-import sentry_sdk
+import logging
 from uuid import UUID
 from sqlalchemy.orm import Session
+from datetime import datetime, timezone
 from sqlalchemy import Row, Sequence
-import sentry_sdk.logger as sentry_logger
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
 from app.models.courses import Course
 from app.models.users import User, Role
+from app.api.v1.schemas.auth import PrincipalV1
 from app.core.security import validate_refresh_token
 from app.api.v1.repositories.user_repo import user_repo_v1
+from app.api.v1.services.purge_service import purge_service_v1
 from app.api.v1.schemas.courses import CourseReadV1, CourseReadBaseV1
 from app.api.v1.schemas.users import UserReadBaseV1, UserReadV1, UserUpdateV1, UserRole
 from app.core.exceptions import (
+    error_reporter,
     ServerError,
     CoursesNotFoundError,
     UserNotFoundError,
@@ -20,6 +23,9 @@ from app.core.exceptions import (
 )
 
 
+logger: logging.Logger = logging.getLogger(__name__)
+
+
 class UserServiceV1:
     async def add_user(self, user: User, db: AsyncSession):
         """a method for other services to make use of"""
@@ -52,7 +58,6 @@ class UserServiceV1:
         user: User | None = await user_repo_v1.get_user_by_id(user_id, db)
 
         if not user:
-            sentry_logger.error("User {id} not found in database", id=user_id)
             raise UserNotFoundError()
 
         return user
@@ -69,7 +74,7 @@ class UserServiceV1:
 
     async def get_user_courses(
         self,
-        curr_user: User,
+        curr_user: PrincipalV1,
         refresh_token: str,
         db: AsyncSession,
         sort: str | None,
@@ -94,7 +99,6 @@ class UserServiceV1:
             )
 
             if not courses_db:
-                sentry_logger.error("Courses not found for user {id}", id=curr_user.id)
                 raise CoursesNotFoundError()
 
             user_courses: list[CourseReadV1] = []
@@ -108,18 +112,16 @@ class UserServiceV1:
 
                 user_courses.append(course_read)
 
-            sentry_logger.info(
-                "User {id} courses retrieved from database", id=curr_user.id
-            )
+            logger.info("User %s courses retrieved from database", curr_user.id)
             return user_courses
         except Exception as e:
             if isinstance(e, CoursesNotFoundError):
                 raise CoursesNotFoundError()
 
-            sentry_sdk.capture_exception(e)
-            sentry_logger.error(
-                "Internal server error occured while retrieving user {id} courses",
-                id=curr_user.id,
+            error_reporter.capture(e)
+            logger.error(
+                "Internal server error occured while retrieving user %s courses",
+                curr_user.id,
             )
             raise ServerError() from e
 
@@ -138,10 +140,6 @@ class UserServiceV1:
             user: User = await user_service_v1.get_user_by_email(user_update.email, db)
 
             if user:
-                sentry_logger.error(
-                    "User attempted to update account with an existing email {email}",
-                    email=user.email,
-                )
                 raise UserExistsError()
 
         for k, v in user_update_dict.items():
@@ -150,7 +148,7 @@ class UserServiceV1:
         try:
             await user_repo_v1.add_user(curr_user, db)
 
-            sentry_logger.info("User {id} account updated", id=curr_user.id)
+            logger.info("User %s account updated", curr_user.id)
 
             user_read: UserReadV1 = UserReadV1(
                 **UserReadBaseV1.model_validate(curr_user).model_dump(),
@@ -160,29 +158,38 @@ class UserServiceV1:
             return user_read
         except Exception as e:
             await db.rollback()
-            sentry_sdk.capture_exception(e)
-            sentry_logger.error(
-                "Internal server error occured while updating user {id} account details",
-                id=curr_user.id,
+            error_reporter.capture(e)
+            logger.error(
+                "Internal server error occured while updating user %s account details",
+                curr_user.id,
             )
             raise ServerError() from e
 
+    async def bump_token_version(self, user_id: UUID, db: AsyncSession):
+        """makes every access token issued to the user stale"""
+        await user_repo_v1.bump_token_version(user_id, db)
+
     async def delete_user(self, user: User, db: AsyncSession):
         await user_repo_v1.delete_user(user, db)
 
-    def delete_user_accounts(self, db: Session):
+    def delete_user_accounts(self, db: Session) -> int:
         """deletes user accounts 30 days after deactivation"""
-        try:
-            user_repo_v1.delete_users(db)
-            sentry_logger.info("User accounts deleted permanently")
-            db.commit()
-        except Exception as e:
-            db.rollback()
-            sentry_sdk.capture_exception(e)
-            sentry_logger.error(
-                "Internal server error while deleting user accounts permanently"
-            )
-            raise ServerError() from e
+
+        def delete_batch(cutoff: datetime, batch_size: int, db: Session) -> int:
+            deleted: Row = user_repo_v1.delete_users(cutoff, batch_size, db)
+
+            if deleted.enrollments:
+                logger.info(
+                    "%s enrollments removed, %s course counters" " updated",
+                    deleted.enrollments,
+                    deleted.courses,
+                )
+
+            return deleted.users
+
+        return purge_service_v1.run(
+            "delete_users", delete_batch, datetime.now(timezone.utc), db
+        )
 
 
 user_service_v1 = UserServiceV1()
@@ -0,0 +1,164 @@
+import enum
+from datetime import datetime, timezone
+from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+from app.core.config import settings
+
+
+class RouteClass(str, enum.Enum):
+    AUTH = "auth"
+    HEALTH = "health"
+    ADMIN = "admin"
+    DEFAULT = "default"
+
+
+class AdmissionController:
+    """tracks in-flight requests per route class and the number of requests
+    waiting on the db pool so that requests can be rejected before they queue"""
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        max_pool_waiters: int,
+        retry_after: int,
+        reserved_slots: dict[str, int] | None = None,
+        class_limits: dict[str, int] | None = None,
+        enabled: bool = True,
+    ):
+        self.enabled: bool = enabled
+        self.retry_after: int = retry_after
+        self.max_in_flight: int = max_in_flight
+        self.max_pool_waiters: int = max_pool_waiters
+
+        self.reserved_slots: dict[RouteClass, int] = {
+            RouteClass(k): v for k, v in (reserved_slots or {}).items()
+        }
+        self.class_limits: dict[RouteClass, int] = {
+            RouteClass(k): v for k, v in (class_limits or {}).items()
+        }
+
+        # slots left for every route class once the reserved slots are set aside
+        self.shared_slots: int = max(
+            max_in_flight - sum(self.reserved_slots.values()), 0
+        )
+
+        self.pool_waiters: int = 0
+        self.in_flight: dict[RouteClass, int] = {rc: 0 for rc in RouteClass}
+        self.rejected: dict[RouteClass, int] = {rc: 0 for rc in RouteClass}
+
+    def classify(self, path: str) -> RouteClass:
+        prefix: str = settings.API_PREFIX
+
+        if path.startswith(f"{prefix}/health/"):
+            return RouteClass.HEALTH
+        if path.startswith(f"{prefix}/auth/"):
+            return RouteClass.AUTH
+        if path.startswith(f"{prefix}/admin/"):
+            return RouteClass.ADMIN
+        return RouteClass.DEFAULT
+
+    def shared_in_use(self) -> int:
+        return sum(
+            max(count - self.reserved_slots.get(rc, 0), 0)
+            for rc, count in self.in_flight.items()
+        )
+
+    def try_acquire(self, route_class: RouteClass) -> bool:
+        in_flight: int = self.in_flight[route_class]
+        reserved: int = self.reserved_slots.get(route_class, 0)
+        class_limit: int | None = self.class_limits.get(route_class)
+
+        if class_limit is not None and in_flight >= class_limit:
+            return self._reject(route_class)
+
+        if in_flight < reserved:
+            self.in_flight[route_class] += 1
+            return True
+
+        # requests without a reservation are shed once the pool queue is too deep
+        if reserved == 0 and self.pool_waiters >= self.max_pool_waiters:
+            return self._reject(route_class)
+
+        if self.shared_in_use() >= self.shared_slots:
+            return self._reject(route_class)
+
+        self.in_flight[route_class] += 1
+        return True
+
+    def release(self, route_class: RouteClass):
+        self.in_flight[route_class] -= 1
+
+    def _reject(self, route_class: RouteClass) -> bool:
+        self.rejected[route_class] += 1
+        return False
+
+    @asynccontextmanager
+    async def pool_wait(self):
+        """wraps a connection checkout to keep count of requests queued on the pool"""
+        self.pool_waiters += 1
+        try:
+            yield
+        finally:
+            self.pool_waiters -= 1
+
+    def snapshot(self) -> dict:
+        return {
+            "pool_waiters": self.pool_waiters,
+            "shared_in_use": self.shared_in_use(),
+            "in_flight": {rc.value: n for rc, n in self.in_flight.items()},
+            "rejected": {rc.value: n for rc, n in self.rejected.items()},
+        }
+
+
+def overload_response(retry_after: int) -> JSONResponse:
+    content: dict = {
+        "error": "Service unavailable",
+        "message": "Server is currently overloaded",
+        "resolution": f"Retry the request after {retry_after} seconds",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+    return JSONResponse(
+        content=content, status_code=503, headers={"Retry-After": str(retry_after)}
+    )
+
+
+class AdmissionMiddleware:
+    """rejects requests early with a 503 when their route class is over budget"""
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController | None = None):
+        self.app = app
+        self.controller = controller or admission_controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self.controller.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        route_class: RouteClass = self.controller.classify(scope["path"])
+
+        if not self.controller.try_acquire(route_class):
+            response: JSONResponse = overload_response(self.controller.retry_after)
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(route_class)
+
+
+def load_admission_controller() -> AdmissionController:
+    return AdmissionController(
+        max_in_flight=settings.ADMISSION_MAX_IN_FLIGHT,
+        max_pool_waiters=settings.ADMISSION_MAX_POOL_WAITERS,
+        retry_after=settings.ADMISSION_RETRY_AFTER,
+        reserved_slots=settings.ADMISSION_RESERVED_SLOTS,
+        class_limits=settings.ADMISSION_CLASS_LIMITS,
+        enabled=settings.ADMISSION_CONTROL_ENABLED,
+    )
+
+
+admission_controller = load_admission_controller()
@@ -0,0 +1,92 @@
+import enum
+import orjson
+from datetime import datetime
+from collections.abc import Sequence
+from fastapi.responses import Response
+
+try:
+    import msgpack
+except ImportError:
+    # msgpack is optional, without it only columnar json is offered
+    msgpack = None
+
+
+COLUMNAR_JSON: str = "application/vnd.enrollment.columnar+json"
+COLUMNAR_MSGPACK: str = "application/vnd.enrollment.columnar+msgpack"
+
+# preferred first when a client accepts several with the same weight
+FORMATS: tuple[str, ...] = (
+    (COLUMNAR_MSGPACK, COLUMNAR_JSON) if msgpack is not None else (COLUMNAR_JSON,)
+)
+
+# documents the extra media types of a list route in the openapi schema
+COLUMNAR_RESPONSES: dict = {200: {"content": {COLUMNAR_JSON: {}, COLUMNAR_MSGPACK: {}}}}
+
+
+def choose_format(accept: str) -> str | None:
+    """the columnar media type with the highest q value in Accept, None when
+    the client prefers (or only accepts) the default json response
+
+    wildcards never select a columnar format, it has to be asked for"""
+    weights: dict[str, float] = {}
+
+    for part in accept.lower().split(","):
+        media_type, _, params = part.strip().partition(";")
+        quality: float = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        weights[media_type.strip()] = quality
+
+    best: str | None = None
+    best_quality: float = weights.get("application/json", 0.0)
+    for media_type in FORMATS:
+        quality: float = weights.get(media_type, 0.0)
+        if quality > 0.0 and quality >= best_quality:
+            best, best_quality = media_type, quality
+
+    return best
+
+
+def encode_value(value):
+    # asyncpg uuids have no json type, uuids, datetimes and enums have no
+    # msgpack type
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        # Z like orjson with OPT_UTC_Z and the default json responses
+        text: str = value.isoformat()
+        return f"{text[:-6]}Z" if text.endswith("+00:00") else text
+    return str(value)
+
+
+class ColumnarResponse(Response):
+    """rows sent as {"columns": [...], "rows": [[...], ...]}, every key is
+    written once instead of once per row and the rows are the tuples returned
+    by the database, no model is built per row"""
+
+    media_type = COLUMNAR_JSON
+
+    def __init__(
+        self,
+        columns: list[str],
+        rows: Sequence[Sequence],
+        media_type: str = COLUMNAR_JSON,
+        status_code: int = 200,
+    ):
+        super().__init__(
+            content={"columns": columns, "rows": [tuple(row) for row in rows]},
+            status_code=status_code,
+            headers={"Vary": "Accept"},
+            media_type=media_type,
+        )
+
+    def render(self, content: dict) -> bytes:
+        if self.media_type == COLUMNAR_MSGPACK:
+            return msgpack.packb(content, default=encode_value)
+        # UTC datetimes end in Z in every format, like the default responses
+        return orjson.dumps(content, default=encode_value, option=orjson.OPT_UTC_Z)
@@ -0,0 +1,240 @@
+import gzip
+import zlib
+import hashlib
+from collections import OrderedDict
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+from app.core.config import settings
+from app.core.instrumentation import timed_phase
+
+try:
+    import brotli
+except ImportError:
+    # brotli is optional, clients asking for it get gzip instead
+    brotli = None
+
+
+# preferred first when a client accepts several with the same weight
+ENCODINGS: tuple[str, ...] = ("br", "gzip") if brotli is not None else ("gzip",)
+
+COMPRESSIBLE_TYPES: tuple[str, ...] = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+)
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """the supported encoding with the highest q value in Accept-Encoding"""
+    weights: dict[str, float] = {}
+
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality: float = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                continue
+        weights[name.strip()] = quality
+
+    best: str | None = None
+    best_quality: float = 0.0
+    for encoding in ENCODINGS:
+        quality: float = weights.get(encoding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+
+    return best
+
+
+def is_compressible(content_type: str) -> bool:
+    return content_type.startswith(COMPRESSIBLE_TYPES) or "+json" in content_type
+
+
+def compress(encoding: str, body: bytes) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    # mtime=0 so the same body always compresses to the same bytes
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+class StreamCompressor:
+    """compresses a streamed body chunk by chunk, each chunk is flushed so the
+    client can decode it as it arrives"""
+
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(
+                quality=settings.COMPRESSION_BROTLI_QUALITY
+            )
+            self._zlib = None
+        else:
+            self._brotli = None
+            # wbits 31 writes the gzip header and trailer
+            self._zlib = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, wbits=31)
+
+    def chunk(self, data: bytes) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+
+class CompressedBodyCache:
+    """bounded LRU of compressed bodies keyed by the encoding and a digest of
+    the uncompressed body
+
+    the same catalog page is sent to every student, hashing a body is much
+    cheaper than compressing it again"""
+
+    def __init__(self, max_size: int, max_bytes: int):
+        self.max_size: int = max_size
+        self.max_bytes: int = max_bytes
+        self._entries: OrderedDict[tuple[str, bytes], bytes] = OrderedDict()
+        self._bytes: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @staticmethod
+    def digest(body: bytes) -> bytes:
+        return hashlib.blake2b(body, digest_size=16).digest()
+
+    def get_or_compress(self, encoding: str, body: bytes) -> bytes:
+        if self.max_size < 1:
+            return compress(encoding, body)
+
+        key: tuple[str, bytes] = (encoding, self.digest(body))
+        compressed: bytes | None = self._entries.get(key)
+
+        if compressed is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return compressed
+
+        self.misses += 1
+        compressed = compress(encoding, body)
+        self._store(key, compressed)
+        return compressed
+
+    def _store(self, key: tuple[str, bytes], compressed: bytes):
+        if len(compressed) > self.max_bytes:
+            return
+
+        self._entries[key] = compressed
+        self._bytes += len(compressed)
+
+        while len(self._entries) > self.max_size or self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def load_compressed_body_cache() -> CompressedBodyCache:
+    return CompressedBodyCache(
+        settings.COMPRESSION_CACHE_SIZE, settings.COMPRESSION_CACHE_MAX_BYTES
+    )
+
+
+compressed_body_cache = load_compressed_body_cache()
+
+
+class CompressionMiddleware:
+    """compresses json and text responses of at least COMPRESSION_MINIMUM_SIZE
+    bytes with the best encoding the client accepts (br when brotli is
+    installed, gzip otherwise). Complete bodies go through the compressed
+    body cache, streamed bodies are compressed as they are sent"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not settings.COMPRESSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        encoding: str | None = choose_encoding(
+            Headers(scope=scope).get("accept-encoding", "")
+        )
+        if encoding is None or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        await self.app(scope, receive, CompressingSender(send, encoding).send)
+
+
+class CompressingSender:
+    def __init__(self, send: Send, encoding: str):
+        self._send = send
+        self.encoding = encoding
+        self.start: Message | None = None
+        self.compressor: StreamCompressor | None = None
+        self.passthrough: bool = False
+
+    async def send(self, message: Message):
+        if message["type"] == "http.response.start":
+            headers: Headers = Headers(raw=message["headers"])
+            self.passthrough = "content-encoding" in headers or not is_compressible(
+                headers.get("content-type", "")
+            )
+            if self.passthrough:
+                await self._send(message)
+            else:
+                # held until the first body chunk tells whether to compress
+                self.start = message
+            return
+
+        if self.passthrough or message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body: bytes = message.get("body", b"")
+        more_body: bool = message.get("more_body", False)
+
+        if self.start is not None:
+            start: Message = self.start
+            self.start = None
+            headers: MutableHeaders = MutableHeaders(scope=start)
+            headers.add_vary_header("Accept-Encoding")
+
+            if not more_body:
+                if len(body) >= settings.COMPRESSION_MINIMUM_SIZE:
+                    with timed_phase("compress"):
+                        body = compressed_body_cache.get_or_compress(
+                            self.encoding, body
+                        )
+                    headers["Content-Encoding"] = self.encoding
+                    headers["Content-Length"] = str(len(body))
+
+                await self._send(start)
+                await self._send({"type": "http.response.body", "body": body})
+                return
+
+            self.compressor = StreamCompressor(self.encoding)
+            headers["Content-Encoding"] = self.encoding
+            del headers["Content-Length"]
+            await self._send(start)
+
+        with timed_phase("compress"):
+            data: bytes = self.compressor.chunk(body)
+            if not more_body:
+                data += self.compressor.finish()
+
+        await self._send(
+            {"type": "http.response.body", "body": data, "more_body": more_body}
+        )
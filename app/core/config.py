@@ -20,6 +20,92 @@ class Settings(BaseSettings):
     ASYNC_DB_URL: str
     API_DB_PASSWORD: str
 
+    # DB connection pool
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 5
+    DB_POOL_TIMEOUT: float = 10.0
+    # connections opened at startup, capped at DB_POOL_SIZE
+    DB_POOL_WARMUP: int = 5
+
+    # python -m app.serve, workers default to the cpu count and the database
+    # connections (pool and overflow) are split between the workers. Without
+    # a total every worker gets DB_POOL_SIZE and DB_MAX_OVERFLOW
+    SERVE_WORKERS: int | None = None
+    SERVE_DB_CONNECTIONS: int | None = None
+    SERVE_GRACEFUL_TIMEOUT: float = 30.0
+
+    # json and text responses of at least the minimum size (bytes) are sent
+    # brotli (when installed) or gzip compressed, complete bodies are
+    # compressed once and kept in an LRU of at most CACHE_SIZE entries
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_CACHE_SIZE: int = 256
+    COMPRESSION_CACHE_MAX_BYTES: int = 16_000_000
+
+    # default time budget (seconds) for requests whose route declares none
+    REQUEST_DEADLINE: float = 10.0
+
+    # report db, auth and serialize timings of each request in a
+    # Server-Timing header
+    SERVER_TIMING_ENABLED: bool = False
+
+    # queries slower than the threshold (ms) are written with their plan to a
+    # rotating log file, no threshold disables the log
+    SLOW_QUERY_THRESHOLD_MS: float | None = 200.0
+    SLOW_QUERY_LOG_FILE: str = "logs/slow_queries.log"
+    SLOW_QUERY_LOG_MAX_BYTES: int = 10_000_000
+    SLOW_QUERY_LOG_BACKUPS: int = 3
+    SLOW_QUERY_EXPLAIN: bool = True
+    # distinct statements remembered as explained, least recently seen go first
+    SLOW_QUERY_EXPLAINED_MAX: int = 1000
+    # records waiting for the writer thread, more are dropped
+    SLOW_QUERY_QUEUE_SIZE: int = 10_000
+
+    # counts the objects every request session loads per model, reported by
+    # the memory sessions diagnostics endpoint
+    SESSION_STATS_ENABLED: bool = False
+
+    # request profiling, admins ask for a profile with the header set to
+    # "sample" or "cprofile" and a fraction of all requests is sampled
+    PROFILING_ENABLED: bool = False
+    PROFILING_HEADER: str = "X-Profile"
+    PROFILING_SAMPLE_RATE: float = 0.0
+    # seconds between stack samples
+    PROFILING_INTERVAL: float = 0.005
+    PROFILING_DIR: str = "logs/profiles"
+
+    # faults reported to Sentry per error type in each window (seconds),
+    # expected client errors are only counted
+    ERROR_REPORTS_PER_WINDOW: int = 10
+    ERROR_REPORT_WINDOW: float = 60.0
+
+    # structured logs, written as json by a background thread to stdout or,
+    # with LOG_OUTPUT=file, to a rotating LOG_FILE. Sample rates keep a
+    # fraction of the records of a level and disabled routes log nothing
+    LOG_ENABLED: bool = True
+    LOG_LEVEL: str = "INFO"
+    LOG_OUTPUT: str = "stdout"
+    LOG_FILE: str = "logs/app.log"
+    LOG_FILE_MAX_BYTES: int = 10_000_000
+    LOG_FILE_BACKUPS: int = 5
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_SAMPLE_RATES: dict[str, float] = {}
+    LOG_DISABLED_ROUTES: list[str] = ["/api/v1/health/"]
+
+    # request and celery task traces, written as OTLP json lines to
+    # TRACING_FILE by a background thread. Incoming traceparent headers
+    # are continued, other traces are sampled at TRACING_SAMPLE_RATE
+    TRACING_ENABLED: bool = False
+    TRACING_SAMPLE_RATE: float = 1.0
+    TRACING_SERVICE_NAME: str = "enrollment-api"
+    TRACING_FILE: str = "logs/traces.jsonl"
+    TRACING_FILE_MAX_BYTES: int = 10_000_000
+    TRACING_FILE_BACKUPS: int = 3
+    TRACING_QUEUE_SIZE: int = 1000
+    TRACING_MAX_SPANS: int = 1000
+
     # Test DB
     ASYNC_TEST_DB_URL: str
 
@@ -30,8 +116,19 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_TIME: int
     REFRESH_TOKEN_EXPIRE_TIME: int
+    # daily refresh_tokens partitions created past the token lifetime
+    REFRESH_TOKEN_PARTITIONS_AHEAD: int = 3
     ACCESS_TOKEN_SECRET_KEY: str
     REFRESH_TOKEN_SECRET_KEY: str
+    # asymmetric access tokens, keys maps key ids to PEM keys and the active
+    # key must be a private key. Without an active key access tokens are
+    # signed with ACCESS_TOKEN_SECRET_KEY and JWT_ALGORITHM
+    ACCESS_TOKEN_ALGORITHM: str = "RS256"
+    ACCESS_TOKEN_KEYS: dict[str, str] = {}
+    ACCESS_TOKEN_ACTIVE_KID: str | None = None
+    # decoded tokens kept in memory, a size of 0 disables the cache
+    TOKEN_CACHE_SIZE: int = 10000
+    TOKEN_CACHE_NEGATIVE_TTL: float = 30.0
 
     # Sentry
     SENTRY_SDK_DSN: str
@@ -45,5 +142,52 @@ class Settings(BaseSettings):
     # Task Broker
     BROKER_URL: str
 
+    # Purge jobs
+    # rows deleted per transaction, batches per run (the next run resumes),
+    # minimum pause between batches in seconds and the share of time spent
+    # deleting, a slow batch is followed by a proportionally longer pause
+    PURGE_BATCH_SIZE: int = 500
+    PURGE_MAX_BATCHES: int = 1000
+    PURGE_BATCH_SLEEP: float = 0.05
+    PURGE_DUTY_CYCLE: float = 0.5
+
+    # Admission control
+    # reserved slots are kept for their route class only (bulkheads) while
+    # class limits cap how many requests of a class can be in flight at once
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_MAX_IN_FLIGHT: int = 100
+    ADMISSION_MAX_POOL_WAITERS: int = 10
+    ADMISSION_RETRY_AFTER: int = 2
+    ADMISSION_RESERVED_SLOTS: dict[str, int] = {"auth": 10, "health": 2}
+    ADMISSION_CLASS_LIMITS: dict[str, int] = {"admin": 20}
+
+
+
+class LazySettings:
+    """reads the settings from the environment on first use, so modules can be
+    imported without the environment. create_app can configure an instance
+    instead"""
+
+    def __init__(self):
+        object.__setattr__(self, "_settings", None)
+
+    @property
+    def configured(self) -> bool:
+        return self._settings is not None
+
+    def configure(self, instance: Settings):
+        object.__setattr__(self, "_settings", instance)
+
+    def load(self) -> Settings:
+        if self._settings is None:
+            self.configure(Settings())
+        return self._settings
+
+    def __getattr__(self, name: str):
+        return getattr(self.load(), name)
+
+    def __setattr__(self, name: str, value):
+        setattr(self.load(), name, value)
+
 
-settings = Settings()
+settings: Settings = LazySettings()
@@ -0,0 +1,86 @@
+import time
+from sqlalchemy import event
+from contextvars import ContextVar
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+from app.core.config import settings
+from app.core.exceptions import DeadlineExceededError
+
+
+# postgres error code raised when statement_timeout cancels a query
+QUERY_CANCELED: str = "57014"
+
+
+class Deadline:
+    def __init__(self, budget: float):
+        self.budget: float = budget
+        self.expires_at: float = time.monotonic() + budget
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+request_deadline: ContextVar[Deadline | None] = ContextVar(
+    "request_deadline", default=None
+)
+
+
+def deadline(budget: float):
+    """route dependency declaring the time budget (in seconds) of a request"""
+
+    async def set_deadline():
+        request_deadline.set(Deadline(budget))
+
+    return set_deadline
+
+
+def current_deadline() -> Deadline:
+    """the deadline of the request, a route without a deadline() dependency
+    gets REQUEST_DEADLINE counted from the first call, which get_db makes
+    before checking out a connection"""
+    curr_deadline: Deadline | None = request_deadline.get()
+
+    if curr_deadline is None:
+        curr_deadline = Deadline(settings.REQUEST_DEADLINE)
+        request_deadline.set(curr_deadline)
+
+    return curr_deadline
+
+
+def apply_deadline(session: AsyncSession):
+    """applies the remaining request budget as statement_timeout on every
+    transaction the session begins so a slow query cannot hold a connection"""
+
+    @event.listens_for(session.sync_session, "after_begin")
+    def set_statement_timeout(sync_session, transaction, connection):
+        curr_deadline: Deadline = current_deadline()
+
+        if curr_deadline.expired:
+            raise DeadlineExceededError()
+
+        timeout_ms: int = max(int(curr_deadline.remaining() * 1000), 1)
+        # SET LOCAL only lasts until the transaction ends, so the timeout
+        # never leaks to the next request using the pooled connection
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {timeout_ms}")
+
+
+def is_deadline_error(exc: BaseException | None) -> bool:
+    """checks the exception chain since services wrap db errors in ServerError"""
+    while exc is not None:
+        if isinstance(exc, DeadlineExceededError):
+            return True
+
+        if isinstance(exc, DBAPIError):
+            sqlstate: str | None = getattr(exc.orig, "sqlstate", None)
+            if sqlstate == QUERY_CANCELED:
+                return True
+
+        exc = exc.__cause__ or exc.__context__
+
+    return False
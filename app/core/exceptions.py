@@ -1,18 +1,40 @@
 # lazy evaluation of annotations
 from __future__ import annotations
+import time
+import sentry_sdk
+from collections import Counter
 from fastapi.requests import Request
 from datetime import datetime, timezone
 from fastapi.responses import JSONResponse
 
 
+from app.core.config import settings
+
+
 class AppException(Exception):
     """Base class for app exception"""
 
+    # expected errors are client mistakes (bad input, missing rows, invalid
+    # credentials), they are only counted. Faults are reported to Sentry
+    expected: bool = True
+
 
 class ServerError(AppException):
     """Internal server error"""
 
-    pass
+    expected = False
+
+
+class ServiceUnavailableError(AppException):
+    """Database pool exhausted"""
+
+    expected = False
+
+
+class DeadlineExceededError(AppException):
+    """Request exceeded its time budget"""
+
+    expected = False
 
 
 class AuthenticationError(AppException):
@@ -111,12 +133,86 @@ class CredentialError(AppException):
     pass
 
 
+class MemoryTracingError(AppException):
+    """Memory tracing not started"""
+
+    pass
+
+
+class InvalidFieldsError(AppException):
+    """Unknown field requested with fields="""
+
+    pass
+
+
+class ErrorReporter:
+    """counts every handled error by type and reports faults to Sentry, at
+    most max_reports per error type in each window (seconds)"""
+
+    def __init__(self, max_reports: int, window: float):
+        self.max_reports = max_reports
+        self.window = window
+
+        self.handled: Counter[str] = Counter()
+        self.reported: Counter[str] = Counter()
+        self.suppressed: Counter[str] = Counter()
+        # error type -> (window start, reports sent in the window)
+        self._windows: dict[str, tuple[float, int]] = {}
+
+    def handle(self, exc: AppException):
+        self.handled[type(exc).__name__] += 1
+
+        # a fault raised from an error already captured where it was caught is
+        # not reported twice, one raised from an uncaptured error is
+        if not exc.expected and not getattr(exc.__cause__, "_captured", False):
+            self.capture(exc)
+
+    def capture(self, exc: BaseException) -> bool:
+        name: str = type(exc).__name__
+        now: float = time.monotonic()
+        # seen by the reporter, even when the report is suppressed
+        exc._captured = True
+        start, reports = self._windows.get(name, (now, 0))
+
+        if now - start >= self.window:
+            start, reports = now, 0
+
+        if reports >= self.max_reports:
+            self.suppressed[name] += 1
+            return False
+
+        self._windows[name] = (start, reports + 1)
+        self.reported[name] += 1
+        sentry_sdk.capture_exception(exc)
+        return True
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        return {
+            "handled": dict(self.handled),
+            "reported": dict(self.reported),
+            "suppressed": dict(self.suppressed),
+        }
+
+
+def load_error_reporter() -> ErrorReporter:
+    return ErrorReporter(
+        max_reports=settings.ERROR_REPORTS_PER_WINDOW,
+        window=settings.ERROR_REPORT_WINDOW,
+    )
+
+
+error_reporter: ErrorReporter = load_error_reporter()
+
+
 def create_handler(
-    status_code: int, initial_detail: dict
+    status_code: int, initial_detail: dict, headers: dict | None = None
 ) -> callable[[Request, AppException], JSONResponse]:
     async def exception_handler(req: Request, exc: AppException):
+        error_reporter.handle(exc)
         error_time: str = datetime.now(timezone.utc).isoformat()
         initial_detail["timestamp"] = error_time
-        return JSONResponse(content=initial_detail, status_code=status_code)
+        return JSONResponse(
+            content=initial_detail, status_code=status_code, headers=headers
+        )
 
     return exception_handler
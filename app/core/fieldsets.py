@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+
+
+from app.core.exceptions import InvalidFieldsError
+
+
+def parse_fields(fields: str | None, schema: type[BaseModel]) -> list[str] | None:
+    """the fields asked for with fields=id,title,code in the order of the
+    schema, None when every field is wanted
+
+    raises InvalidFieldsError for a field the schema does not have"""
+    if fields is None:
+        return None
+
+    requested: set[str] = {field.strip() for field in fields.split(",")}
+    requested.discard("")
+
+    if not requested:
+        return None
+
+    if requested - schema.model_fields.keys():
+        raise InvalidFieldsError()
+
+    return [field for field in schema.model_fields if field in requested]
+
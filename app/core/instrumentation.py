@@ -0,0 +1,163 @@
+import time
+import functools
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from fastapi.routing import APIRoute
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from starlette.datastructures import MutableHeaders
+from contextlib import contextmanager
+from typing import Callable, Iterator
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+from app.core.config import settings
+from app.core.tracing import start_span
+
+
+@dataclass
+class RequestMetrics:
+    """queries and time (in seconds) spent per phase of the current request"""
+
+    queries: int = 0
+    db_time: float = 0.0
+    phases: dict[str, float] = field(default_factory=dict)
+    # set once the endpoint returns, the rest is response serialization
+    endpoint_done_at: float | None = None
+
+    def add_phase(self, name: str, elapsed: float):
+        self.phases[name] = self.phases.get(name, 0.0) + elapsed
+
+    def server_timing(self, total: float) -> str:
+        metrics: list[str] = [
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.queries} queries"'
+        ]
+        metrics.extend(
+            f"{name};dur={elapsed * 1000:.2f}" for name, elapsed in self.phases.items()
+        )
+        metrics.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(metrics)
+
+
+request_metrics: ContextVar[RequestMetrics | None] = ContextVar(
+    "request_metrics", default=None
+)
+
+
+@contextmanager
+def track_queries() -> Iterator[RequestMetrics]:
+    """collects the metrics of the queries run inside the block, nested blocks
+    add what they collected to the enclosing one"""
+    parent: RequestMetrics | None = request_metrics.get()
+    metrics: RequestMetrics = RequestMetrics()
+    token = request_metrics.set(metrics)
+
+    try:
+        yield metrics
+    finally:
+        request_metrics.reset(token)
+
+        if parent is not None:
+            parent.queries += metrics.queries
+            parent.db_time += metrics.db_time
+            for name, elapsed in metrics.phases.items():
+                parent.add_phase(name, elapsed)
+
+
+@contextmanager
+def timed_phase(name: str) -> Iterator[None]:
+    start: float = time.perf_counter()
+    try:
+        with start_span(name):
+            yield
+    finally:
+        metrics: RequestMetrics | None = request_metrics.get()
+        if metrics is not None:
+            metrics.add_phase(name, time.perf_counter() - start)
+
+
+def instrument_engine(engine: Engine):
+    """counts the queries and db time of every cursor execution on the engine
+    towards the metrics of the current request"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        if request_metrics.get() is not None:
+            conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        metrics: RequestMetrics | None = request_metrics.get()
+        starts: list[float] = conn.info.get("query_start")
+
+        if metrics is not None and starts:
+            metrics.queries += 1
+            metrics.db_time += time.perf_counter() - starts.pop()
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        # failed statements never reach after_cursor_execute
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start"):
+            conn.info["query_start"].pop()
+
+
+def mark_endpoint_done(endpoint: Callable) -> Callable:
+    # including a router copies its routes, their endpoints are wrapped already
+    if getattr(endpoint, "instrumented", False):
+        return endpoint
+
+    # the signature is read from __wrapped__ so the dependencies are unchanged
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        with start_span("endpoint", **{"code.function": endpoint.__qualname__}):
+            result = await endpoint(*args, **kwargs)
+
+        metrics: RequestMetrics | None = request_metrics.get()
+        if metrics is not None:
+            metrics.endpoint_done_at = time.perf_counter()
+        return result
+
+    wrapper.instrumented = True
+    return wrapper
+
+
+class InstrumentedRoute(APIRoute):
+    """route marking when its endpoint returns so response model validation
+    and rendering can be timed as the serialize phase"""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, mark_endpoint_done(endpoint), **kwargs)
+
+
+class ServerTimingMiddleware:
+    """tracks the metrics of every request and, when enabled, reports them in
+    a Server-Timing header (db, auth, serialize and total)"""
+
+    def __init__(self, app: ASGIApp, enabled: bool | None = None):
+        self.app = app
+        self.enabled = enabled
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        enabled: bool = (
+            settings.SERVER_TIMING_ENABLED if self.enabled is None else self.enabled
+        )
+        start: float = time.perf_counter()
+
+        with track_queries() as metrics:
+
+            async def send_with_timing(message: Message):
+                if message["type"] == "http.response.start" and enabled:
+                    now: float = time.perf_counter()
+                    if metrics.endpoint_done_at is not None:
+                        metrics.add_phase("serialize", now - metrics.endpoint_done_at)
+
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", metrics.server_timing(now - start))
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)
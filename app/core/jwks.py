@@ -0,0 +1,101 @@
+from jose import jwk, jwt
+from typing import Mapping
+from jose.backends.base import Key
+from types import MappingProxyType
+from jose.exceptions import JWTError, JWKError
+
+
+from app.core.config import settings
+
+
+ASYMMETRIC_ALGORITHMS: tuple[str, ...] = (
+    "RS256",
+    "RS384",
+    "RS512",
+    "ES256",
+    "ES384",
+    "ES512",
+)
+
+
+class KeyRing:
+    """asymmetric access token keys indexed by key id
+
+    keys are PEM strings, private keys can sign and are published through their
+    public part, public keys only verify so tokens signed by a retired key stay
+    valid until they expire. The public keys are parsed once so decoding a token
+    is a dict lookup on its kid header"""
+
+    def __init__(self, keys: Mapping[str, str], active_kid: str | None, algorithm: str):
+        self.algorithm: str = algorithm
+        self.active_kid: str | None = active_kid
+        self._signing_key: Key | None = None
+        self._public_keys: Mapping[str, Key] = MappingProxyType({})
+
+        if not active_kid:
+            return
+
+        if algorithm not in ASYMMETRIC_ALGORITHMS:
+            raise ValueError(f"Unsupported access token algorithm {algorithm}")
+
+        if active_kid not in keys:
+            raise ValueError(f"Active key {active_kid} is missing from the key ring")
+
+        public_keys: dict[str, Key] = {}
+        for kid, pem in keys.items():
+            key: Key = jwk.construct(pem, algorithm)
+            public_keys[kid] = key if key.is_public() else key.public_key()
+
+            if kid == active_kid:
+                if key.is_public():
+                    raise ValueError(f"Active key {active_kid} is not a private key")
+                self._signing_key = key
+
+        self._public_keys = MappingProxyType(public_keys)
+
+    @property
+    def enabled(self) -> bool:
+        return self._signing_key is not None
+
+    def sign(self, claims: dict) -> str:
+        return jwt.encode(
+            claims=claims,
+            key=self._signing_key,
+            algorithm=self.algorithm,
+            headers={"kid": self.active_kid},
+        )
+
+    def get_public_key(self, token: str) -> tuple[str, Key] | None:
+        """resolves the verification key of a token from its (unverified) kid"""
+        try:
+            kid: str | None = jwt.get_unverified_header(token).get("kid")
+        except JWTError:
+            return None
+
+        key: Key | None = self._public_keys.get(kid)
+        if key is None:
+            return None
+
+        return kid, key
+
+    def jwks(self) -> dict:
+        keys: list[dict] = []
+
+        for kid, key in self._public_keys.items():
+            keys.append({**key.to_dict(), "kid": kid, "use": "sig"})
+
+        return {"keys": keys}
+
+
+def load_key_ring() -> KeyRing:
+    try:
+        return KeyRing(
+            settings.ACCESS_TOKEN_KEYS,
+            settings.ACCESS_TOKEN_ACTIVE_KID,
+            settings.ACCESS_TOKEN_ALGORITHM,
+        )
+    except JWKError as e:
+        raise ValueError("Access token key ring contains an invalid key") from e
+
+
+key_ring = load_key_ring()
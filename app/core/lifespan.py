@@ -0,0 +1,93 @@
+import asyncio
+import logging
+import sentry_sdk
+from uuid import uuid4
+from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+
+from app.core.config import settings
+from app.core.logger import log_pipeline
+from app.core.tracing import span_exporter
+from app.api.v1.repositories.auth_repo import auth_repo_v1
+from app.api.v1.repositories.user_repo import user_repo_v1
+from app.api.v1.repositories.admin_repo import admin_repo_v1
+from app.api.v1.repositories.course_repo import course_repo_v1
+from app.api.v1.services.role_registry import role_registry_v1
+from app.database.session import database
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+async def warm_pool(size: int):
+    """opens connections up front so the first requests don't pay for the connect"""
+    size = min(size, settings.DB_POOL_SIZE)
+    if size < 1:
+        return
+
+    connections: list[AsyncConnection] = await asyncio.gather(
+        *(database.async_engine.connect() for _ in range(size))
+    )
+
+    # closing returns the connections to the pool instead of discarding them
+    for conn in connections:
+        await conn.close()
+
+
+async def warm_statement_cache():
+    """runs the hot repository queries once so their compiled forms are cached
+
+    the queries use ids that match nothing, the cache key only depends on the
+    shape of the statement and not on the bound values"""
+    session: AsyncSession = database.async_session()
+
+    try:
+        await auth_repo_v1.get_refresh_token(uuid4(), session)
+        await user_repo_v1.get_user_by_id(uuid4(), session)
+        await user_repo_v1.get_user_by_email("", session)
+        await course_repo_v1.get_course_by_id(uuid4(), session)
+        await course_repo_v1.get_courses(session, None, None, None, None, 0, 1)
+        await admin_repo_v1.get_all_students(
+            session, uuid4(), None, None, None, 0, 1
+        )
+    finally:
+        await session.rollback()
+        await session.close()
+
+
+async def preload_roles():
+    session: AsyncSession = database.async_session()
+
+    try:
+        await role_registry_v1.load(session)
+    finally:
+        await session.close()
+
+
+async def warm_up():
+    try:
+        await warm_pool(settings.DB_POOL_WARMUP)
+        await warm_statement_cache()
+        await preload_roles()
+        logger.info("Application warm up completed")
+    except Exception as e:
+        # a failed warm up only costs latency, the app can still serve requests
+        sentry_sdk.capture_exception(e)
+        logger.error("Error occured while warming up the application")
+
+
+async def dispose_engines():
+    await database.dispose()
+    logger.info("Database engines disposed")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    log_pipeline.start()
+    await warm_up()
+    yield
+    await dispose_engines()
+    span_exporter.stop()
+    log_pipeline.stop()
@@ -0,0 +1,214 @@
+import sys
+import json
+import time
+import queue
+import random
+import logging
+import sentry_sdk
+from uuid import uuid4
+from pathlib import Path
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from starlette.datastructures import Headers, MutableHeaders
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from sentry_sdk.integrations.logging import SentryLogsHandler, ignore_logger
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+from app.core.config import settings
+
+
+# attributes every LogRecord has, anything else was passed through extra=
+RECORD_ATTRIBUTES: frozenset[str] = frozenset(
+    logging.makeLogRecord({}).__dict__
+) | {"message", "asctime", "request_id", "trace_id", "user_id", "route"}
+
+logger: logging.Logger = logging.getLogger("app")
+access_logger: logging.Logger = logging.getLogger("app.access")
+
+# one access record per request, kept out of Sentry breadcrumbs and logs
+ignore_logger(access_logger.name)
+
+request_context: ContextVar[dict | None] = ContextVar(
+    "request_context", default=None
+)
+
+
+def bind_user(user_id):
+    """adds the authenticated user to the records of the current request"""
+    context: dict | None = request_context.get()
+    if context is not None:
+        context["user_id"] = str(user_id)
+
+
+class ContextFilter(logging.Filter):
+    """copies the request context into the record while still on the caller,
+    the listener thread has no access to the request's contextvars"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context: dict | None = request_context.get()
+        if context is None:
+            return True
+
+        if context["disabled"]:
+            return False
+
+        route = context["scope"].get("route")
+        record.request_id = context["request_id"]
+        record.trace_id = context.get("trace_id")
+        record.user_id = context.get("user_id")
+        record.route = route.path if route else context["scope"]["path"]
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """keeps a fraction of the records per level, 1.0 keeps every record"""
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        self.rates = {level.upper(): rate for level, rate in rates.items()}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate: float = self.rates.get(record.levelname, 1.0)
+        return rate >= 1.0 or random.random() < rate
+
+
+class DroppingQueueHandler(QueueHandler):
+    """drops records when the queue is full instead of blocking the caller"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped: int = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        data: dict = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "trace_id": getattr(record, "trace_id", None),
+            "user_id": getattr(record, "user_id", None),
+            "route": getattr(record, "route", None),
+        }
+        data.update(
+            (k, v) for k, v in record.__dict__.items() if k not in RECORD_ATTRIBUTES
+        )
+        return json.dumps(data, default=str)
+
+
+class LogPipeline:
+    """records are filtered and enqueued on the caller, formatted and written
+    by a background listener thread"""
+
+    def __init__(self):
+        self.handler: DroppingQueueHandler | None = None
+        self.listener: QueueListener | None = None
+
+    def output_handlers(self) -> list[logging.Handler]:
+        if settings.LOG_OUTPUT == "file":
+            Path(settings.LOG_FILE).parent.mkdir(parents=True, exist_ok=True)
+            handler: logging.Handler = RotatingFileHandler(
+                settings.LOG_FILE,
+                maxBytes=settings.LOG_FILE_MAX_BYTES,
+                backupCount=settings.LOG_FILE_BACKUPS,
+            )
+        else:
+            handler: logging.Handler = logging.StreamHandler(sys.stdout)
+
+        handlers: list[logging.Handler] = [handler]
+        if sentry_sdk.get_client().is_active():
+            # sent from the listener thread, after the context and sampling
+            # filters, the logging integration's own forwarding is turned off
+            handlers.append(SentryLogsHandler(level=logging.INFO))
+
+        return handlers
+
+    def start(self, handlers: list[logging.Handler] | None = None):
+        if self.listener is not None or not settings.LOG_ENABLED:
+            return
+
+        handlers = handlers or self.output_handlers()
+        for handler in handlers:
+            # sentry builds its entries from the record's message and args
+            if not isinstance(handler, SentryLogsHandler):
+                handler.setFormatter(JsonFormatter())
+
+        self.handler = DroppingQueueHandler(queue.Queue(settings.LOG_QUEUE_SIZE))
+        self.handler.addFilter(ContextFilter())
+        self.handler.addFilter(SamplingFilter(settings.LOG_SAMPLE_RATES))
+
+        logger.handlers = [self.handler]
+        logger.setLevel(settings.LOG_LEVEL)
+        logger.propagate = False
+
+        self.listener = QueueListener(
+            self.handler.queue, *handlers, respect_handler_level=True
+        )
+        self.listener.start()
+
+    def stop(self):
+        if self.listener is None:
+            return
+
+        # the listener drains the queue before its thread exits
+        self.listener.stop()
+        logger.removeHandler(self.handler)
+        self.listener = None
+
+
+log_pipeline: LogPipeline = LogPipeline()
+
+
+class RequestContextMiddleware:
+    """binds a request id (taken from X-Request-ID or generated) to the logs
+    of the request, echoes it back and writes one access record"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id: str = Headers(scope=scope).get("x-request-id") or uuid4().hex
+        context: dict = {
+            "request_id": request_id,
+            "scope": scope,
+            "disabled": scope["path"] in settings.LOG_DISABLED_ROUTES,
+        }
+        token = request_context.set(context)
+
+        start: float = time.perf_counter()
+        status: int = 500
+
+        async def send_with_request_id(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message).append("X-Request-ID", request_id)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            access_logger.info(
+                "%s %s %s",
+                scope["method"],
+                scope["path"],
+                status,
+                extra={
+                    "status": status,
+                    "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+                },
+            )
+            request_context.reset(token)
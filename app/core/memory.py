@@ -0,0 +1,150 @@
+import threading
+import tracemalloc
+from sqlalchemy import event
+from collections import Counter
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+# allocations of the tracer itself are left out of the reports
+IGNORED_FILES: tuple[tracemalloc.Filter, ...] = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def allocation_site(stat) -> str:
+    frame: tracemalloc.Frame = stat.traceback[0]
+    return f"{frame.filename}:{frame.lineno}"
+
+
+class MemoryTracker:
+    """tracemalloc snapshots taken on demand, a baseline snapshot is diffed
+    against the current allocations to find what keeps growing"""
+
+    def __init__(self):
+        self.baseline: tracemalloc.Snapshot | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int):
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+            self.baseline = self.take_snapshot()
+
+    def stop(self):
+        with self._lock:
+            tracemalloc.stop()
+            self.baseline = None
+
+    def take_snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(IGNORED_FILES)
+
+    def usage(self) -> dict:
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "tracing": self.tracing,
+            "frames": tracemalloc.get_traceback_limit(),
+            "current_kib": round(current / 1024, 1),
+            "peak_kib": round(peak / 1024, 1),
+        }
+
+    def top(self, limit: int) -> list[dict]:
+        stats = self.take_snapshot().statistics("lineno")
+        return [
+            {
+                "location": allocation_site(stat),
+                "size_kib": round(stat.size / 1024, 1),
+                "count": stat.count,
+            }
+            for stat in stats[:limit]
+        ]
+
+    def diff(self, limit: int, reset: bool = False) -> list[dict]:
+        """allocation sites that grew the most since the baseline, the
+        current snapshot becomes the baseline when reset is set"""
+        with self._lock:
+            snapshot: tracemalloc.Snapshot = self.take_snapshot()
+            stats = snapshot.compare_to(self.baseline, "lineno")
+            if reset:
+                self.baseline = snapshot
+
+        return [
+            {
+                "location": allocation_site(stat),
+                "size_kib": round(stat.size / 1024, 1),
+                "count": stat.count,
+                "size_diff_kib": round(stat.size_diff / 1024, 1),
+                "count_diff": stat.count_diff,
+            }
+            for stat in stats[:limit]
+        ]
+
+
+def count_loaded(session: Session, instance):
+    # the identity map only holds weak references, so its size is sampled as
+    # objects load rather than once the objects are gone at the end
+    loaded: Counter[str] = session.info.setdefault("loaded_objects", Counter())
+    loaded[type(instance).__name__] += 1
+    session.info["identity_map_peak"] = max(
+        session.info.get("identity_map_peak", 0), len(session.identity_map)
+    )
+
+
+def track_session(session: AsyncSession):
+    """counts the objects loaded by the session, only request sessions are
+    tracked and only with SESSION_STATS_ENABLED since the listener runs for
+    every loaded row"""
+    event.listen(session.sync_session, "loaded_as_persistent", count_loaded)
+
+
+class IdentityMapStats:
+    """peak size of the session identity map and the objects loaded per model
+    in each request, per route"""
+
+    def __init__(self):
+        self.routes: dict[str, dict] = {}
+
+    def record(self, route: str, session: AsyncSession):
+        info: dict = session.sync_session.info
+        size: int = info.get("identity_map_peak", 0)
+
+        stats: dict = self.routes.setdefault(
+            route, {"requests": 0, "total_objects": 0, "max_objects": 0, "models": {}}
+        )
+        stats["requests"] += 1
+        stats["total_objects"] += size
+        stats["max_objects"] = max(stats["max_objects"], size)
+
+        for model, count in info.get("loaded_objects", {}).items():
+            stats["models"][model] = max(stats["models"].get(model, 0), count)
+
+    def summarize(self) -> list[dict]:
+        return sorted(
+            (
+                {
+                    "route": route,
+                    "requests": stats["requests"],
+                    "mean_objects": round(
+                        stats["total_objects"] / stats["requests"], 1
+                    ),
+                    "max_objects": stats["max_objects"],
+                    "models": stats["models"],
+                }
+                for route, stats in self.routes.items()
+            ),
+            key=lambda route: route["max_objects"],
+            reverse=True,
+        )
+
+    def clear(self):
+        self.routes.clear()
+
+
+memory_tracker: MemoryTracker = MemoryTracker()
+identity_map_stats: IdentityMapStats = IdentityMapStats()
@@ -0,0 +1,145 @@
+import sys
+import random
+import asyncio
+import cProfile
+import threading
+from pathlib import Path
+from types import FrameType
+from typing import Callable
+from collections import Counter
+from datetime import datetime, timezone
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+from app.core.config import settings
+from app.api.v1.schemas.users import UserRole
+from app.core.security import decode_access_token
+
+
+SAMPLE: str = "sample"
+CPROFILE: str = "cprofile"
+
+
+def fold_stack(frame: FrameType | None) -> str:
+    """root to leaf frames joined by ";", the folded format of flame graphs"""
+    names: list[str] = []
+
+    while frame is not None:
+        module: str = frame.f_globals.get("__name__", "?")
+        names.append(f"{module}:{frame.f_code.co_qualname}")
+        frame = frame.f_back
+
+    return ";".join(reversed(names))
+
+
+class StackSampler:
+    """samples the stack of the event loop thread from a background thread,
+    concurrent requests on the loop show up in the samples too"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        self.thread_id: int = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame: FrameType | None = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.samples[fold_stack(frame)] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path: Path):
+        path.write_text(
+            "".join(f"{stack} {count}\n" for stack, count in self.samples.items())
+        )
+
+
+class ProfilingMiddleware:
+    """profiles requests of admins sending the profile header (sample or
+    cprofile) and a sampled fraction of all requests, writing the profile to
+    PROFILING_DIR. Sampled stacks are written in the folded format of flame
+    graphs, cProfile output as pstats. One request is profiled at a time, the
+    profilers see every request running on the loop meanwhile"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.active: bool = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not settings.PROFILING_ENABLED or self.active:
+            await self.app(scope, receive, send)
+            return
+
+        mode: str | None = await self.profile_mode(scope)
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+
+        self.active = True
+        try:
+            await self.profile(scope, receive, send, mode)
+        finally:
+            self.active = False
+
+    async def profile_mode(self, scope: Scope) -> str | None:
+        headers: Headers = Headers(scope=scope)
+        requested: str | None = headers.get(settings.PROFILING_HEADER)
+
+        if requested in (SAMPLE, CPROFILE):
+            # the access token is only decoded for requests asking for a profile
+            scheme, _, token = headers.get("authorization", "").partition(" ")
+            payload: dict | None = (
+                await decode_access_token(token) if scheme.lower() == "bearer" else None
+            )
+            if payload and payload.get("role") == UserRole.ADMIN.value:
+                return requested
+
+        if random.random() < settings.PROFILING_SAMPLE_RATE:
+            return SAMPLE
+        return None
+
+    async def profile(self, scope: Scope, receive: Receive, send: Send, mode: str):
+        path: Path = profile_path(scope, mode)
+
+        async def send_with_profile(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Profile-File", path.name)
+            await send(message)
+
+        if mode == CPROFILE:
+            profiler: cProfile.Profile = cProfile.Profile()
+            profiler.enable()
+            try:
+                await self.app(scope, receive, send_with_profile)
+            finally:
+                profiler.disable()
+                await asyncio.to_thread(write_profile, path, profiler.dump_stats)
+        else:
+            sampler: StackSampler = StackSampler(settings.PROFILING_INTERVAL)
+            sampler.start()
+            try:
+                await self.app(scope, receive, send_with_profile)
+            finally:
+                sampler.stop()
+                await asyncio.to_thread(write_profile, path, sampler.write)
+
+
+def profile_path(scope: Scope, mode: str) -> Path:
+    now: str = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+    route: str = scope["path"].strip("/").replace("/", "_") or "root"
+    suffix: str = "folded" if mode == SAMPLE else "prof"
+    return Path(settings.PROFILING_DIR) / f"{now}-{scope['method']}-{route}.{suffix}"
+
+
+def write_profile(path: Path, dump: Callable[[Path], None]):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    dump(path)
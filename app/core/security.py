@@ -1,38 +1,45 @@
 import hashlib
-import sentry_sdk
+import logging
 from typing import Optional
 from uuid import uuid4, UUID
 from jose import jwt, JWTError
+from jose.backends.base import Key
 from pwdlib import PasswordHash
-import sentry_sdk.logger as sentry_logger
 from pwdlib.hashers.argon2 import Argon2Hasher
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta, datetime, timezone
 
 
+from app.core.jwks import key_ring
+from app.core.tracing import start_span
 from app.core.config import settings
 from app.models.auth import RefreshToken
+from app.core.token_cache import token_cache
 from app.core.exceptions import AuthenticationError
 from app.api.v1.repositories.auth_repo import auth_repo_v1
 from app.api.v1.schemas.auth import TokenDataV1, TokenStatus
 
 
+logger: logging.Logger = logging.getLogger(__name__)
+
 pws = PasswordHash(hashers=[Argon2Hasher()])
 
 
 async def hash_password(password: str):
     password: str = password + settings.ARGON2_PEPPER
-    return pws.hash(password)
+    with start_span("hash_password"):
+        return pws.hash(password)
 
 
-async def hash_token(token: str):
+async def hash_token(token: str) -> bytes:
     token_bytes: bytes = token.encode(encoding="utf-8")
-    return hashlib.sha256(token_bytes).hexdigest()
+    return hashlib.sha256(token_bytes).digest()
 
 
 async def verify_password(plain_password: str, hashed_password: str):
     plain_password: str = plain_password + settings.ARGON2_PEPPER
-    return pws.verify(plain_password, hashed_password)
+    with start_span("verify_password"):
+        return pws.verify(plain_password, hashed_password)
 
 
 async def create_access_token(
@@ -49,8 +56,17 @@ async def create_access_token(
         "sub": str(token_data.id),
         "exp": expire_time,
         "iat": datetime.now(timezone.utc),
+        "ver": token_data.version,
     }
 
+    # role claim allows authorization without loading the user
+    if token_data.role:
+        payload["role"] = token_data.role.value
+
+    # other services verify asymmetric tokens locally with the published keys
+    if key_ring.enabled:
+        return key_ring.sign(payload)
+
     token: str = jwt.encode(
         claims=payload,
         key=settings.ACCESS_TOKEN_SECRET_KEY,
@@ -70,6 +86,10 @@ async def create_refresh_token(
     else:
         expire_time: datetime = expire_time + datetime.now(timezone.utc)
 
+    # the exp claim only has second precision, truncating keeps the stored
+    # expiry equal to it so lookups can name the partition of the token
+    expire_time = expire_time.replace(microsecond=0)
+
     payload: dict = {
         "sub": str(token_data.id),
         "exp": expire_time,
@@ -86,27 +106,54 @@ async def create_refresh_token(
     return token, payload["jti"], expire_time
 
 
-async def decode_token(token: str, key: str):
-    try:
-        payload: dict = jwt.decode(
-            token=token, key=key, algorithms=[settings.JWT_ALGORITHM]
-        )
+async def verify_token(token: str, key: str | Key, algorithm: str, cache_key: str):
+    digest: bytes = token_cache.digest(token, cache_key)
+    found, payload = token_cache.get(digest)
+
+    if found:
         return payload
-    except JWTError as e:
-        sentry_logger.error("User provided an invalid token")
-        sentry_sdk.capture_exception(e)
+
+    try:
+        payload: dict = jwt.decode(token=token, key=key, algorithms=[algorithm])
+        token_cache.set(digest, payload)
+        return dict(payload)
+    except JWTError:
+        # invalid tokens are expected, the rejection is counted by the
+        # exception handlers rather than reported
+        token_cache.set_invalid(digest)
+        return None
+
+
+async def decode_token(token: str, key: str):
+    return await verify_token(token, key, settings.JWT_ALGORITHM, key)
+
+
+async def decode_access_token(token: str):
+    if not key_ring.enabled:
+        return await decode_token(token, settings.ACCESS_TOKEN_SECRET_KEY)
+
+    found_key: tuple[str, Key] | None = key_ring.get_public_key(token)
+
+    if found_key is None:
         return None
 
+    kid, key = found_key
+    # the kid names the key in the cache, a PEM would be hashed on every lookup
+    cache_key: str = f"{key_ring.algorithm}.{kid}"
+    return await verify_token(token, key, key_ring.algorithm, cache_key)
+
 
 async def prepare_tokens(user_id: UUID, token_data: TokenDataV1) -> dict:
     access_token: str = await create_access_token(token_data)
 
     refresh_token, token_id, token_exp = await create_refresh_token(token_data)
 
+    # a sign in starts a new token family named after its first token
     refresh_token_db: RefreshToken = RefreshToken(
         id=token_id,
         token=await hash_token(refresh_token),
         user_id=user_id,
+        family_id=token_id,
         expires_at=token_exp,
     )
 
@@ -121,28 +168,36 @@ async def prepare_tokens(user_id: UUID, token_data: TokenDataV1) -> dict:
 
 async def validate_refresh_token(refresh_token: str, db: AsyncSession) -> RefreshToken:
     if refresh_token is None:
-        sentry_logger.error("User not authenticated")
         raise AuthenticationError()
-    
+
     payload: dict | None = await decode_token(
         refresh_token, settings.REFRESH_TOKEN_SECRET_KEY
     )
 
     if payload is None:
-        sentry_logger.error("User not authenticated")
         raise AuthenticationError()
 
     token_id: UUID = payload.get("jti")
+    expires_at: datetime = datetime.fromtimestamp(payload.get("exp"), timezone.utc)
 
     refresh_token: RefreshToken | None = await auth_repo_v1.get_refresh_token(
-        token_id, db
+        token_id, db, expires_at
     )
 
-    if (
-        refresh_token.status == TokenStatus.REVOKED
-        or refresh_token.status == TokenStatus.USED
-    ):
-        sentry_logger.error("User not authenticated")
+    if refresh_token is None or refresh_token.status == TokenStatus.REVOKED:
+        raise AuthenticationError()
+
+    if refresh_token.status == TokenStatus.USED:
+        # a rotated token was presented again, either the client or an attacker
+        # holds a stolen copy so every token of the session is revoked
+        await auth_repo_v1.revoke_token_family(refresh_token.family_id, db)
+        await db.commit()
+
+        # a replayed token is a possible theft rather than a routine rejection
+        logger.warning(
+            "Refresh token reuse detected for user %s, token family revoked",
+            refresh_token.user_id,
+        )
         raise AuthenticationError()
 
     return refresh_token
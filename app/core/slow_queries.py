@@ -0,0 +1,303 @@
+import re
+import sys
+import json
+import time
+import queue
+import atexit
+import asyncio
+import logging
+import greenlet
+import contextvars
+from pathlib import Path
+from sqlalchemy import event
+from types import FrameType
+from collections import OrderedDict
+from datetime import datetime, timezone
+from sqlalchemy.pool import NullPool
+from logging.handlers import QueueListener, RotatingFileHandler
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+
+from app.core.config import settings
+from app.core.logger import DroppingQueueHandler
+
+
+# modules whose functions count as the origin of a query
+ORIGIN_MODULE: str = "app.api.v1.repositories."
+
+# runs of bind parameters ($1, $2, ...), so IN lists of any size group together
+BIND_PARAMS = re.compile(r"\$\d+(?:\s*,\s*\$\d+)*")
+
+
+def find_origin() -> str | None:
+    """qualified name of the repository method that ran the query
+
+    queries run inside greenlets spawned by the async engine, the frames of
+    the awaiting coroutines live in the parent greenlet"""
+    frame: FrameType | None = sys._getframe(1)
+    current: greenlet.greenlet | None = greenlet.getcurrent()
+
+    while current is not None:
+        while frame is not None:
+            if frame.f_globals.get("__name__", "").startswith(ORIGIN_MODULE):
+                return frame.f_code.co_qualname
+            frame = frame.f_back
+
+        current = current.parent
+        frame = current.gr_frame if current is not None else None
+
+    return None
+
+
+def parameter_shape(parameters, executemany: bool) -> list[str] | dict:
+    """types of the bound parameters, never their values"""
+    if executemany:
+        rows: list = list(parameters)
+        return {
+            "rows": len(rows),
+            "params": parameter_shape(rows[0], False) if rows else [],
+        }
+
+    if isinstance(parameters, dict):
+        return [f"{k}:{type(v).__name__}" for k, v in parameters.items()]
+    return [type(v).__name__ for v in parameters or ()]
+
+
+class SlowQueryLog:
+    """writes queries slower than the threshold as json lines to a rotating
+    file, with the EXPLAIN plan of each distinct statement captured once in
+    the background
+
+    records are enqueued by the query listeners and written by a background
+    thread, plans are captured on connections of their own so a pool already
+    under pressure is not asked for more"""
+
+    def __init__(
+        self,
+        threshold_ms: float | None,
+        path: str,
+        max_bytes: int,
+        backups: int,
+        explain: bool = True,
+        queue_size: int = 10_000,
+        max_explained: int = 1000,
+    ):
+        self.threshold_ms = threshold_ms
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.explain = explain
+        self.queue_size = queue_size
+        self.max_explained = max_explained
+
+        # LRU of the statements explained (or being explained) by this process,
+        # statements with literals inlined keep producing new fingerprints
+        self.explained: OrderedDict[str, None] = OrderedDict()
+        self.pending: set[asyncio.Task] = set()
+        self.handler: DroppingQueueHandler | None = None
+        self.listener: QueueListener | None = None
+        # unpooled engines running the EXPLAIN queries, one per database
+        self.explain_engines: dict[str, AsyncEngine] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_ms is not None
+
+    def start(self):
+        # the file and the writer thread only exist once a slow query shows up
+        if self.listener is not None:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        handler = RotatingFileHandler(
+            self.path, maxBytes=self.max_bytes, backupCount=self.backups
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+
+        self.handler = DroppingQueueHandler(queue.Queue(self.queue_size))
+        self.listener = QueueListener(self.handler.queue, handler)
+        self.listener.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        if self.listener is None:
+            return
+
+        self.listener.stop()
+        self.listener = None
+        atexit.unregister(self.stop)
+
+    def flush(self):
+        """waits until the writer thread wrote every queued record"""
+        if self.handler is not None and self.listener is not None:
+            self.handler.queue.join()
+
+    def write(self, record: dict):
+        if self.listener is None:
+            self.start()
+        # serialized on the caller, the writer thread only does the file io
+        self.handler.handle(
+            logging.makeLogRecord({"msg": json.dumps(record, default=str)})
+        )
+
+    def record(
+        self,
+        engine: AsyncEngine,
+        statement: str,
+        parameters,
+        executemany: bool,
+        elapsed_ms: float,
+    ):
+        fingerprint: str = BIND_PARAMS.sub("?", " ".join(statement.split()))
+
+        self.write(
+            {
+                "type": "query",
+                "at": datetime.now(timezone.utc).isoformat(),
+                "fingerprint": fingerprint,
+                "origin": find_origin(),
+                "duration_ms": round(elapsed_ms, 2),
+                "params": parameter_shape(parameters, executemany),
+            }
+        )
+
+        if not self.explain or executemany:
+            return
+
+        if fingerprint in self.explained:
+            self.explained.move_to_end(fingerprint)
+        else:
+            self.schedule_explain(engine, fingerprint, statement, parameters)
+
+    def schedule_explain(
+        self, engine: AsyncEngine, fingerprint: str, statement: str, parameters
+    ):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # sync engine outside of the event loop (celery tasks)
+            return
+
+        self.explained[fingerprint] = None
+        if len(self.explained) > self.max_explained:
+            self.explained.popitem(last=False)
+        # a fresh context keeps the plan query out of the request metrics
+        task: asyncio.Task = loop.create_task(
+            self.capture_plan(engine, fingerprint, statement, parameters),
+            context=contextvars.Context(),
+        )
+        self.pending.add(task)
+        task.add_done_callback(self.pending.discard)
+
+    async def capture_plan(
+        self, engine: AsyncEngine, fingerprint: str, statement: str, parameters
+    ):
+        try:
+            async with self.explain_engine(engine).connect() as conn:
+                result = await conn.exec_driver_sql(
+                    f"EXPLAIN (ANALYZE off) {statement}", parameters
+                )
+                plan: list[str] = [row[0] for row in result]
+        except Exception as e:
+            # the query ran fine, only its plan is missing from the log
+            self.write({"type": "plan", "fingerprint": fingerprint, "error": str(e)})
+            return
+
+        self.write({"type": "plan", "fingerprint": fingerprint, "plan": plan})
+
+    def explain_engine(self, engine: AsyncEngine) -> AsyncEngine:
+        key: str = engine.url.render_as_string(hide_password=False)
+        if key not in self.explain_engines:
+            self.explain_engines[key] = create_async_engine(
+                engine.url, poolclass=NullPool
+            )
+        return self.explain_engines[key]
+
+    def read_records(self) -> list[dict]:
+        files: list[Path] = [
+            Path(f"{self.path}.{i}") for i in range(self.backups, 0, -1)
+        ] + [self.path]
+        records: list[dict] = []
+
+        for file in files:
+            if not file.exists():
+                continue
+            with file.open() as f:
+                records.extend(json.loads(line) for line in f if line.strip())
+
+        return records
+
+    def summarize(self, limit: int) -> list[dict]:
+        """statements ordered by the total time spent running them"""
+        self.flush()
+        queries: dict[str, dict] = {}
+        plans: dict[str, list[str]] = {}
+
+        for record in self.read_records():
+            fingerprint: str = record["fingerprint"]
+
+            if record["type"] == "plan":
+                if "plan" in record:
+                    plans[fingerprint] = record["plan"]
+                continue
+
+            query: dict = queries.setdefault(
+                fingerprint,
+                {
+                    "statement": fingerprint,
+                    "origin": record["origin"],
+                    "params": record["params"],
+                    "calls": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "last_seen": record["at"],
+                },
+            )
+            query["calls"] += 1
+            query["total_ms"] += record["duration_ms"]
+            query["max_ms"] = max(query["max_ms"], record["duration_ms"])
+            query["last_seen"] = record["at"]
+
+        top: list[dict] = sorted(
+            queries.values(), key=lambda q: q["total_ms"], reverse=True
+        )[:limit]
+
+        for query in top:
+            query["total_ms"] = round(query["total_ms"], 2)
+            query["mean_ms"] = round(query["total_ms"] / query["calls"], 2)
+            query["plan"] = plans.get(query["statement"])
+
+        return top
+
+
+def instrument_slow_queries(engine: AsyncEngine):
+    """times every statement on the engine, slow ones go to the slow query log"""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        if slow_query_log.enabled:
+            conn.info["slow_query_start"] = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        start: float | None = conn.info.pop("slow_query_start", None)
+        if start is None or not slow_query_log.enabled:
+            return
+
+        elapsed_ms: float = (time.perf_counter() - start) * 1000
+        # the plan queries themselves are never logged
+        if elapsed_ms >= slow_query_log.threshold_ms and not statement.startswith(
+            "EXPLAIN"
+        ):
+            slow_query_log.record(engine, statement, parameters, many, elapsed_ms)
+
+
+slow_query_log: SlowQueryLog = SlowQueryLog(
+    threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+    path=settings.SLOW_QUERY_LOG_FILE,
+    max_bytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+    backups=settings.SLOW_QUERY_LOG_BACKUPS,
+    explain=settings.SLOW_QUERY_EXPLAIN,
+    queue_size=settings.SLOW_QUERY_QUEUE_SIZE,
+    max_explained=settings.SLOW_QUERY_EXPLAINED_MAX,
+)
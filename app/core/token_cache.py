@@ -0,0 +1,81 @@
+import time
+import hashlib
+from collections import OrderedDict
+
+
+from app.core.config import settings
+
+
+class TokenCache:
+    """bounded LRU of decoded tokens keyed by a digest of the signing key and token
+
+    verified payloads are kept until the token's exp claim, invalid tokens are
+    kept for a short window so a client retrying a bad token is not verified
+    again on every request"""
+
+    def __init__(self, max_size: int, negative_ttl: float):
+        self.max_size: int = max_size
+        self.negative_ttl: float = negative_ttl
+        # digest -> (payload or None when invalid, wall clock expiry)
+        self._entries: OrderedDict[bytes, tuple[dict | None, float]] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @staticmethod
+    def digest(token: str, key: str) -> bytes:
+        # the key is part of the digest so a token verified with one secret is
+        # never served to a lookup made with another one
+        return hashlib.sha256(f"{key}.{token}".encode(encoding="utf-8")).digest()
+
+    def get(self, digest: bytes) -> tuple[bool, dict | None]:
+        """returns whether the digest was found and the cached payload"""
+        entry: tuple[dict | None, float] | None = self._entries.get(digest)
+
+        if entry is None:
+            self.misses += 1
+            return False, None
+
+        payload, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[digest]
+            self.misses += 1
+            return False, None
+
+        self._entries.move_to_end(digest)
+        self.hits += 1
+        # callers get a copy so they cannot change the cached payload
+        return True, dict(payload) if payload is not None else None
+
+    def set(self, digest: bytes, payload: dict):
+        exp: int | None = payload.get("exp")
+        if exp is None:
+            return
+        self._store(digest, payload, float(exp))
+
+    def set_invalid(self, digest: bytes):
+        self._store(digest, None, time.time() + self.negative_ttl)
+
+    def _store(self, digest: bytes, payload: dict | None, expires_at: float):
+        if self.max_size < 1:
+            return
+
+        self._entries[digest] = (payload, expires_at)
+        self._entries.move_to_end(digest)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def load_token_cache() -> TokenCache:
+    return TokenCache(settings.TOKEN_CACHE_SIZE, settings.TOKEN_CACHE_NEGATIVE_TTL)
+
+
+token_cache = load_token_cache()
@@ -0,0 +1,393 @@
+import re
+import json
+import time
+import queue
+import random
+import atexit
+import logging
+from pathlib import Path
+from celery import signals
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from contextlib import contextmanager
+from typing import Iterator
+from logging.handlers import QueueListener, RotatingFileHandler
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+from app.core.config import settings
+from app.core.slow_queries import find_origin
+from app.core.logger import DroppingQueueHandler, request_context
+
+
+# span kinds of the OTLP protocol
+INTERNAL: int = 1
+SERVER: int = 2
+CLIENT: int = 3
+PRODUCER: int = 4
+CONSUMER: int = 5
+
+TRACEPARENT: str = "traceparent"
+TRACEPARENT_FORMAT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+def new_id(size: int) -> str:
+    return f"{random.getrandbits(size * 8):0{size * 2}x}"
+
+
+def parse_traceparent(value: str | None) -> tuple[str, str, bool] | None:
+    """trace id, parent span id and sampled flag of a w3c traceparent"""
+    match = TRACEPARENT_FORMAT.match(value or "")
+    if match is None:
+        return None
+    trace_id, parent_id, flags = match.groups()
+    return trace_id, parent_id, bool(int(flags, 16) & 1)
+
+
+@dataclass(eq=False)
+class Span:
+    """a timed operation, spans of one trace started in this process are
+    collected on their root and exported together once the root ends"""
+
+    name: str
+    trace_id: str
+    parent_id: str | None = None
+    kind: int = INTERNAL
+    attributes: dict = field(default_factory=dict)
+    span_id: str = field(default_factory=lambda: new_id(8))
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int | None = None
+    error: str | None = None
+    root: "Span | None" = None
+    spans: list["Span"] = field(default_factory=list)
+    dropped: int = 0
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def child(self, name: str, kind: int = INTERNAL, **attributes) -> "Span":
+        return Span(
+            name,
+            self.trace_id,
+            self.span_id,
+            kind,
+            attributes,
+            root=self.root or self,
+        )
+
+    def end(self, end_ns: int | None = None):
+        self.end_ns = end_ns or time.time_ns()
+        root: Span = self.root or self
+
+        if root is self:
+            # always exported, the root carries the request attributes
+            if self.dropped:
+                self.attributes["dropped_spans"] = self.dropped
+            self.spans.append(self)
+            span_exporter.export(self.spans)
+        elif len(root.spans) < settings.TRACING_MAX_SPANS - 1:
+            # one slot is kept for the root
+            root.spans.append(self)
+        else:
+            root.dropped += 1
+
+
+current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+def start_root(
+    name: str, kind: int, traceparent: str | None = None, **attributes
+) -> Span | None:
+    """root span of this process, continuing the trace of the traceparent if
+    one is given. None when tracing is off or the trace is not sampled"""
+    if not settings.TRACING_ENABLED:
+        return None
+
+    parent: tuple[str, str, bool] | None = parse_traceparent(traceparent)
+    if parent is not None:
+        trace_id, parent_id, sampled = parent
+    else:
+        trace_id, parent_id = new_id(16), None
+        sampled = random.random() < settings.TRACING_SAMPLE_RATE
+
+    if not sampled:
+        return None
+    return Span(name, trace_id, parent_id, kind, attributes)
+
+
+@contextmanager
+def start_span(name: str, **attributes) -> Iterator[Span | None]:
+    """child of the current span, nothing is recorded outside of a trace"""
+    parent: Span | None = current_span.get()
+    if parent is None:
+        yield None
+        return
+
+    span: Span = parent.child(name, **attributes)
+    token: Token = current_span.set(span)
+    try:
+        yield span
+    except Exception as e:
+        span.error = type(e).__name__
+        raise
+    finally:
+        current_span.reset(token)
+        span.end()
+
+
+def otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def otlp_span(span: Span) -> dict:
+    data: dict = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": span.kind,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [
+            {"key": key, "value": otlp_value(value)}
+            for key, value in span.attributes.items()
+            if value is not None
+        ],
+        # 1 ok, 2 error
+        "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+    }
+    if span.parent_id:
+        data["parentSpanId"] = span.parent_id
+    return data
+
+
+class OtlpFormatter(logging.Formatter):
+    """one OTLP/JSON ExportTraceServiceRequest per line, the format of the
+    collector's file exporter and otlpjsonfile receiver"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(
+            {
+                "resourceSpans": [
+                    {
+                        "resource": {
+                            "attributes": [
+                                {
+                                    "key": "service.name",
+                                    "value": otlp_value(settings.TRACING_SERVICE_NAME),
+                                }
+                            ]
+                        },
+                        "scopeSpans": [
+                            {
+                                "scope": {"name": __name__},
+                                "spans": [otlp_span(span) for span in record.spans],
+                            }
+                        ],
+                    }
+                ]
+            }
+        )
+
+
+class SpanExporter:
+    """finished traces are enqueued on the caller, converted and written to
+    TRACING_FILE by a background listener thread"""
+
+    def __init__(self):
+        self.handler: DroppingQueueHandler | None = None
+        self.listener: QueueListener | None = None
+
+    def start(self, handlers: list[logging.Handler] | None = None):
+        if self.listener is not None:
+            return
+
+        if handlers is None:
+            Path(settings.TRACING_FILE).parent.mkdir(parents=True, exist_ok=True)
+            handlers = [
+                RotatingFileHandler(
+                    settings.TRACING_FILE,
+                    maxBytes=settings.TRACING_FILE_MAX_BYTES,
+                    backupCount=settings.TRACING_FILE_BACKUPS,
+                )
+            ]
+        for handler in handlers:
+            handler.setFormatter(OtlpFormatter())
+
+        self.handler = DroppingQueueHandler(queue.Queue(settings.TRACING_QUEUE_SIZE))
+        self.listener = QueueListener(self.handler.queue, *handlers)
+        self.listener.start()
+        # celery workers have no lifespan to stop the exporter
+        atexit.register(self.stop)
+
+    def stop(self):
+        if self.listener is None:
+            return
+
+        self.listener.stop()
+        self.listener = None
+        atexit.unregister(self.stop)
+
+    def export(self, spans: list[Span]):
+        # started on the first trace so processes that never trace have no thread
+        if self.listener is None:
+            self.start()
+        self.handler.handle(logging.makeLogRecord({"msg": "", "spans": spans}))
+
+
+span_exporter: SpanExporter = SpanExporter()
+
+
+def trace_queries(engine: Engine):
+    """records a client span for every statement run inside a trace"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        parent: Span | None = current_span.get()
+        if parent is not None:
+            span: Span = parent.child(
+                "db.query",
+                CLIENT,
+                **{
+                    "db.system": "postgresql",
+                    # the statement only, bound values are never recorded
+                    "db.query.text": " ".join(statement.split()),
+                    "code.function": find_origin(),
+                },
+            )
+            conn.info.setdefault("query_spans", []).append(span)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        spans: list[Span] = conn.info.get("query_spans")
+        if current_span.get() is not None and spans:
+            spans.pop().end()
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_spans"):
+            span: Span = conn.info["query_spans"].pop()
+            span.error = type(exception_context.original_exception).__name__
+            span.end()
+
+
+class TracingMiddleware:
+    """starts a server span per request, continuing the trace of an incoming
+    traceparent header, and links it to the request id of the logs"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not settings.TRACING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        span: Span | None = start_root(
+            scope["method"],
+            SERVER,
+            Headers(scope=scope).get(TRACEPARENT),
+            **{"http.request.method": scope["method"], "url.path": scope["path"]},
+        )
+        if span is None:
+            await self.app(scope, receive, send)
+            return
+
+        context: dict | None = request_context.get()
+        if context is not None:
+            span.attributes["request_id"] = context["request_id"]
+            context["trace_id"] = span.trace_id
+
+        async def send_with_status(message: Message):
+            if message["type"] == "http.response.start":
+                span.attributes["http.response.status_code"] = message["status"]
+                if message["status"] >= 500:
+                    span.error = str(message["status"])
+                self.serialize_span(span)
+            await send(message)
+
+        token: Token = current_span.set(span)
+        try:
+            await self.app(scope, receive, send_with_status)
+        except Exception as e:
+            span.error = type(e).__name__
+            raise
+        finally:
+            current_span.reset(token)
+
+            route = scope.get("route")
+            if route is not None:
+                span.name = f"{scope['method']} {route.path}"
+                span.attributes["http.route"] = route.path
+            span.end()
+
+    def serialize_span(self, span: Span):
+        # response validation and rendering, from the endpoint returning to
+        # the response starting. The endpoint span ended just before
+        endpoint: Span | None = next(
+            (child for child in reversed(span.spans) if child.name == "endpoint"),
+            None,
+        )
+        if endpoint is not None:
+            serialize: Span = span.child("serialize")
+            serialize.start_ns = endpoint.end_ns
+            serialize.end()
+
+
+# running tasks by id, a task's span is started and ended in separate signals
+task_spans: dict[str, tuple[Span, Token]] = {}
+
+
+def inject_traceparent(headers: dict | None = None, **kwargs):
+    """tasks published inside a trace continue it in the worker"""
+    span: Span | None = current_span.get()
+    if span is not None and headers is not None:
+        headers[TRACEPARENT] = span.traceparent
+
+    context: dict | None = request_context.get()
+    if context is not None and headers is not None:
+        headers["request_id"] = context["request_id"]
+
+
+def start_task_span(task_id: str, task, **kwargs):
+    request = task.request
+    span: Span | None = start_root(
+        task.name,
+        CONSUMER,
+        getattr(request, TRACEPARENT, None),
+        **{
+            "celery.task_id": task_id,
+            "request_id": getattr(request, "request_id", None),
+        },
+    )
+    if span is not None:
+        task_spans[task_id] = (span, current_span.set(span))
+
+
+def end_task_span(task_id: str, state: str | None = None, **kwargs):
+    started: tuple[Span, Token] | None = task_spans.pop(task_id, None)
+    if started is None:
+        return
+
+    span, token = started
+    current_span.reset(token)
+    span.attributes["celery.state"] = state
+    if state == "FAILURE":
+        span.error = state
+    span.end()
+
+
+def instrument_celery():
+    signals.before_task_publish.connect(inject_traceparent, weak=False)
+    signals.task_prerun.connect(start_task_span, weak=False)
+    signals.task_postrun.connect(end_task_span, weak=False)
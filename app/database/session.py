@@ -1,3 +1,4 @@
+import os
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -8,35 +9,98 @@ from sqlalchemy import create_engine, Engine
 from sqlalchemy.orm import sessionmaker, Session
 
 from app.core.config import settings
+from app.core.tracing import trace_queries
+from app.core.instrumentation import instrument_engine
+from app.core.slow_queries import instrument_slow_queries
 
-# async connection for api
-# a connection pool is used to ensure connections are made available
-async_engine: AsyncEngine = create_async_engine(
-    url=settings.ASYNC_DB_URL,
-    connect_args={"server_settings": {"timezone": "utc"}},
-    pool_size=10,
-    pool_timeout=10.0,
-    pool_pre_ping=True,
-    max_overflow=5,
-)
 
-async_db_session: AsyncSession = async_sessionmaker(
-    bind=async_engine, class_=AsyncSession, autocommit=False, autoflush=False
-)
+class Database:
+    """engines and session factories of the api, created on first use so
+    importing the app neither connects nor needs the database settings"""
 
+    def __init__(self):
+        self._async_engine: AsyncEngine | None = None
+        self._async_session: async_sessionmaker[AsyncSession] | None = None
+        self._sync_engine: Engine | None = None
+        self._sync_session: sessionmaker[Session] | None = None
 
-# sync connection for api
-# a connection pool is used to ensure connections are made available
-sync_engine: Engine = create_engine(
-    url=settings.SYNC_DB_URL,
-    connect_args={"options": "-c timezone=utc"},
-    pool_size=10,
-    pool_timeout=10.0,
-    pool_pre_ping=True,
-    max_overflow=5,
-)
+    # async connection for api
+    # a connection pool is used to ensure connections are made available
+    @property
+    def async_engine(self) -> AsyncEngine:
+        if self._async_engine is None:
+            engine: AsyncEngine = create_async_engine(
+                url=settings.ASYNC_DB_URL,
+                connect_args={"server_settings": {"timezone": "utc"}},
+                pool_size=settings.DB_POOL_SIZE,
+                pool_timeout=settings.DB_POOL_TIMEOUT,
+                pool_pre_ping=True,
+                max_overflow=settings.DB_MAX_OVERFLOW,
+            )
 
+            instrument_engine(engine.sync_engine)
+            trace_queries(engine.sync_engine)
+            instrument_slow_queries(engine)
+            self._async_engine = engine
 
-sync_db_session: Session = sessionmaker(
-    bind=sync_engine, autocommit=False, autoflush=False
-)
+        return self._async_engine
+
+    @property
+    def async_session(self) -> async_sessionmaker[AsyncSession]:
+        if self._async_session is None:
+            self._async_session = async_sessionmaker(
+                bind=self.async_engine,
+                class_=AsyncSession,
+                autocommit=False,
+                autoflush=False,
+            )
+        return self._async_session
+
+    # sync connection for api
+    # a connection pool is used to ensure connections are made available
+    @property
+    def sync_engine(self) -> Engine:
+        if self._sync_engine is None:
+            self._sync_engine = create_engine(
+                url=settings.SYNC_DB_URL,
+                connect_args={"options": "-c timezone=utc"},
+                pool_size=settings.DB_POOL_SIZE,
+                pool_timeout=settings.DB_POOL_TIMEOUT,
+                pool_pre_ping=True,
+                max_overflow=settings.DB_MAX_OVERFLOW,
+            )
+        return self._sync_engine
+
+    @property
+    def sync_session(self) -> sessionmaker[Session]:
+        if self._sync_session is None:
+            self._sync_session = sessionmaker(
+                bind=self.sync_engine, autocommit=False, autoflush=False
+            )
+        return self._sync_session
+
+    def after_fork(self):
+        """a forked process must not share the connections of its parent, the
+        inherited pools are dropped without closing their connections and the
+        engines are built again, with the settings of the child, on first use"""
+        if self._async_engine is not None:
+            self._async_engine.sync_engine.dispose(close=False)
+        if self._sync_engine is not None:
+            self._sync_engine.dispose(close=False)
+
+        self._async_engine = None
+        self._async_session = None
+        self._sync_engine = None
+        self._sync_session = None
+
+    async def dispose(self):
+        """closes the pools of the engines created so far"""
+        if self._async_engine is not None:
+            await self._async_engine.dispose()
+        if self._sync_engine is not None:
+            self._sync_engine.dispose()
+
+
+database: Database = Database()
+
+os.register_at_fork(after_in_child=database.after_fork)
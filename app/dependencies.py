@@ -1,55 +1,130 @@
-from uuid import UUID
+import logging
 from fastapi import Depends
-import sentry_sdk.logger as sentry_logger
+from fastapi.requests import Request
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 
 
 from app.models.users import User
 from app.core.config import settings
-from app.core.security import decode_token
+from app.core.security import decode_access_token
+from app.core.logger import bind_user
+from app.core.instrumentation import timed_phase
+from app.core.memory import identity_map_stats, track_session
+from app.core.admission import admission_controller
+from app.core.deadlines import apply_deadline, current_deadline, is_deadline_error
 from app.api.v1.schemas.users import UserRole
-from app.database.session import async_db_session
+from app.api.v1.schemas.auth import PrincipalV1
+from app.database.session import database
 from app.api.v1.services.user_service import user_service_v1
 from app.core.exceptions import (
     AuthenticationError,
     AuthorizationError,
+    DeadlineExceededError,
+    ServiceUnavailableError,
 )
 
 
+logger: logging.Logger = logging.getLogger(__name__)
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/sign-in/")
 
 
-async def get_db():
+async def get_db(request: Request):
+    # routes without a deadline() dependency get the default budget from
+    # here, so the wait for a pooled connection counts against it too
+    current_deadline()
+    session: AsyncSession = database.async_session()
+    apply_deadline(session)
+    if settings.SESSION_STATS_ENABLED:
+        track_session(session)
+
+    try:
+        # the connection is checked out here so requests queued on an
+        # exhausted pool are counted by the admission controller
+        async with admission_controller.pool_wait():
+            await session.connection()
+    except PoolTimeoutError as e:
+        await session.close()
+        logger.error("Database connection pool exhausted")
+        raise ServiceUnavailableError() from e
+    except Exception:
+        # a deadline already spent fails in after_begin, with the connection
+        # checked out
+        await session.close()
+        raise
+
     try:
-        session: AsyncSession = async_db_session()
         yield session
+    except Exception as e:
+        if is_deadline_error(e):
+            logger.error("Request exceeded its deadline")
+            raise DeadlineExceededError() from e
+        raise
     finally:
+        if settings.SESSION_STATS_ENABLED:
+            route = request.scope.get("route")
+            identity_map_stats.record(
+                f"{request.method} {route.path if route else request.url.path}",
+                session,
+            )
         await session.close()
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
-):
-    key: str = settings.ACCESS_TOKEN_SECRET_KEY
-    payload: dict = await decode_token(token, key)
+async def get_current_principal(token: str = Depends(oauth2_scheme)) -> PrincipalV1:
+    """authenticates from the access token claims alone, no db round trip"""
+    with timed_phase("auth"):
+        payload: dict = await decode_access_token(token)
 
     if not payload:
-        sentry_logger.error("User not authenticated")
         raise AuthenticationError()
 
-    user_id: UUID = payload.get("sub")
+    try:
+        principal: PrincipalV1 = PrincipalV1(
+            id=payload.get("sub"), role=payload.get("role"), version=payload.get("ver")
+        )
+    except ValidationError as e:
+        # tokens issued before role claims existed must be renewed
+        logger.error("User provided a token without valid claims")
+        raise AuthenticationError() from e
+
+    bind_user(principal.id)
+    return principal
+
 
-    user: User = await user_service_v1.get_user_by_id(user_id, db)
+async def load_user(principal: PrincipalV1, db: AsyncSession) -> User:
+    with timed_phase("auth"):
+        user: User = await user_service_v1.get_user_by_id(principal.id, db)
+
+    # role changes bump the version, so the claims of this token are outdated
+    if user.token_version != principal.version:
+        raise AuthenticationError()
 
     return user
 
 
-def required_roles(roles: list[UserRole]):
-    async def role_checker(curr_user: User = Depends(get_current_user)):
-        if curr_user.role.name not in roles:
-            sentry_logger.error("User {id} is not authorized", id=curr_user.id)
+async def get_current_user(
+    principal: PrincipalV1 = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    """loads the user, only needed by routes that read or change the user row"""
+    return await load_user(principal, db)
+
+
+def required_roles(roles: list[UserRole], with_user: bool = False):
+    async def role_checker(
+        principal: PrincipalV1 = Depends(get_current_principal),
+    ) -> PrincipalV1:
+        if principal.role not in roles:
             raise AuthorizationError()
-        return curr_user
+        return principal
+
+    async def user_role_checker(
+        principal: PrincipalV1 = Depends(role_checker),
+        db: AsyncSession = Depends(get_db),
+    ) -> User:
+        return await load_user(principal, db)
 
-    return role_checker
+    return user_role_checker if with_user else role_checker
@@ -1,66 +1,148 @@
-import sentry_sdk
 from fastapi import FastAPI
-from fastapi.requests import Request
-from datetime import datetime, timezone
-import sentry_sdk.logger as sentry_logger
-from slowapi.errors import RateLimitExceeded
-from slowapi import _rate_limit_exceeded_handler
-from slowapi.middleware import SlowAPIMiddleware
 
 
-from app.limiter import limiter
-from app.core.config import settings
-from app.api.v1.routers.auth import auth_router_v1
-from app.api.v1.routers.users import user_router_v1
-from app.api.v1.routers.admin import admin_router_v1
-from app.api.v1.routers.courses import course_router_v1
-from app.api.v1.routers.instructors import instructor_router_v1
-from app.api.v1.routers.enrollments import enrollments_router_v1
-
-
-sentry_sdk.init(
-    dsn=settings.SENTRY_SDK_DSN,
-    enable_logs=True,
-    send_default_pii=True,
-    traces_sample_rate=1.0,
-    profiles_sample_rate=1.0,
-    profile_lifecycle="trace"
-)
-
-
-app = FastAPI(
-    title=settings.API_NAME,
-    description=settings.API_DESCRIPTION,
-    version=settings.API_VERSION
-)
-
-
-app.state.limiter = limiter
-app.add_middleware(SlowAPIMiddleware)
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-
-
-from app.core import exception_handlers
-
-
-app.include_router(auth_router_v1, prefix=settings.API_PREFIX, tags=["Auth"])
-app.include_router(user_router_v1, prefix=settings.API_PREFIX, tags=["Users"])
-app.include_router(admin_router_v1, prefix=settings.API_PREFIX, tags=["Admin"])
-app.include_router(course_router_v1, prefix=settings.API_PREFIX, tags=["Courses"])
-app.include_router(instructor_router_v1, prefix=settings.API_PREFIX, tags=["Instructors"])
-app.include_router(enrollments_router_v1, prefix=settings.API_PREFIX, tags=["Enrollments"])
-
-
-@app.middleware("http")
-async def request_middleware(request: Request, call_next):
-    req: str = f"{request.method} {request.url} {datetime.now(timezone.utc)}"
-    sentry_logger.info(req)
-    response = await call_next(request)
-    response.headers['X-App-Name'] = 'Enrollment API'
-    return response
-
-
-@app.get("/api/v1/health/", status_code=200, description="Check api health")
-@limiter.exempt
-async def health_check(request: Request):
-    return {"message": "OK"}
+from app.core.config import Settings, settings
+
+
+def init_sentry():
+    import sentry_sdk
+    from sentry_sdk.integrations.logging import LoggingIntegration
+
+    sentry_sdk.init(
+        dsn=settings.SENTRY_SDK_DSN,
+        enable_logs=True,
+        # app logs reach sentry through the log pipeline, errors are captured
+        # by the error reporter, records only become breadcrumbs here
+        integrations=[LoggingIntegration(event_level=None, sentry_logs_level=None)],
+        send_default_pii=True,
+        traces_sample_rate=1.0,
+        profiles_sample_rate=1.0,
+        profile_lifecycle="trace"
+    )
+
+
+def reload_singletons():
+    """rebuilds the singletons that read the settings when their module was
+    imported, in place since other modules hold references to them"""
+    from app.core import jwks, admission, exceptions, compression, token_cache
+
+    for instance, load in (
+        (jwks.key_ring, jwks.load_key_ring),
+        (token_cache.token_cache, token_cache.load_token_cache),
+        (exceptions.error_reporter, exceptions.load_error_reporter),
+        (admission.admission_controller, admission.load_admission_controller),
+        (compression.compressed_body_cache, compression.load_compressed_body_cache),
+    ):
+        vars(instance).clear()
+        vars(instance).update(vars(load()))
+
+
+def create_app(app_settings: Settings | None = None) -> FastAPI:
+    """builds the api, settings passed in replace the ones read from the
+    environment, also for the singletons already built with the old ones
+
+    the routers, services, models and engines are imported (and built) here
+    rather than when this module is imported, so celery workers, scripts and
+    test collection importing the package don't pay for them"""
+    if app_settings is not None:
+        settings.configure(app_settings)
+        reload_singletons()
+
+    init_sentry()
+
+    from fastapi.requests import Request
+    from fastapi.responses import JSONResponse
+    from slowapi.errors import RateLimitExceeded
+    from slowapi import _rate_limit_exceeded_handler
+    from slowapi.middleware import SlowAPIMiddleware
+
+    from app.limiter import limiter
+    from app.core import jwks as signing_keys
+    from app.core.lifespan import lifespan
+    from app.core.admission import AdmissionMiddleware
+    from app.core.profiling import ProfilingMiddleware
+    from app.core.compression import CompressionMiddleware
+    from app.core.tracing import TracingMiddleware
+    from app.core.logger import RequestContextMiddleware
+    from app.core.instrumentation import ServerTimingMiddleware
+    from app.core.exception_handlers import register_exception_handlers
+    from app.api.v1.routers.auth import auth_router_v1
+    from app.api.v1.routers.users import user_router_v1
+    from app.api.v1.routers.admin import admin_router_v1
+    from app.api.v1.routers.courses import course_router_v1
+    from app.api.v1.routers.instructors import instructor_router_v1
+    from app.api.v1.routers.diagnostics import diagnostics_router_v1
+    from app.api.v1.routers.enrollments import enrollments_router_v1
+
+    app = FastAPI(
+        title=settings.API_NAME,
+        description=settings.API_DESCRIPTION,
+        version=settings.API_VERSION,
+        lifespan=lifespan,
+    )
+
+    app.state.limiter = limiter
+    app.add_middleware(SlowAPIMiddleware)
+    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+
+    register_exception_handlers(app)
+
+    app.include_router(auth_router_v1, prefix=settings.API_PREFIX, tags=["Auth"])
+    app.include_router(user_router_v1, prefix=settings.API_PREFIX, tags=["Users"])
+    app.include_router(admin_router_v1, prefix=settings.API_PREFIX, tags=["Admin"])
+    app.include_router(course_router_v1, prefix=settings.API_PREFIX, tags=["Courses"])
+    app.include_router(
+        instructor_router_v1, prefix=settings.API_PREFIX, tags=["Instructors"]
+    )
+    app.include_router(
+        enrollments_router_v1, prefix=settings.API_PREFIX, tags=["Enrollments"]
+    )
+    app.include_router(
+        diagnostics_router_v1, prefix=settings.API_PREFIX, tags=["Diagnostics"]
+    )
+
+    @app.middleware("http")
+    async def request_middleware(request: Request, call_next):
+        response = await call_next(request)
+        response.headers['X-App-Name'] = 'Enrollment API'
+        return response
+
+    # innermost, the headers of the compressed body are final for the others
+    app.add_middleware(CompressionMiddleware)
+    app.add_middleware(ProfilingMiddleware)
+    app.add_middleware(ServerTimingMiddleware)
+    app.add_middleware(TracingMiddleware)
+    app.add_middleware(RequestContextMiddleware)
+
+    # added last so it wraps every other middleware and sheds load first
+    app.add_middleware(AdmissionMiddleware)
+
+    @app.get("/api/v1/health/", status_code=200, description="Check api health")
+    @limiter.exempt
+    async def health_check(request: Request):
+        return {"message": "OK"}
+
+    @app.get(
+        "/.well-known/jwks.json",
+        status_code=200,
+        description="Public keys other services use to verify access tokens",
+    )
+    @limiter.exempt
+    async def jwks(request: Request):
+        # verifiers cache the key set, a rotated key is published before it signs
+        return JSONResponse(
+            content=signing_keys.key_ring.jwks(),
+            headers={"Cache-Control": "public, max-age=300"},
+        )
+
+    return app
+
+
+def __getattr__(name: str):
+    # `uvicorn app.main:app` and `from app.main import app` get an app built
+    # on first access, `uvicorn app.main:create_app --factory` builds its own
+    if name == "app":
+        app: FastAPI = create_app()
+        globals()["app"] = app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
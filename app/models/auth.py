@@ -1,10 +1,12 @@
 from datetime import datetime, timezone
 from sqlalchemy import (
+    DDL,
+    event,
     Column,
     UUID,
-    Text,
     Enum,
     DateTime,
+    LargeBinary,
     PrimaryKeyConstraint,
     Index,
     ForeignKey,
@@ -18,12 +20,16 @@ class RefreshToken(Base):
     __tablename__ = "refresh_tokens"
 
     id = Column(UUID)
-    token = Column(Text, nullable=False)
+    # raw sha256 digest of the token (32 bytes instead of 64 hex characters)
+    token = Column(LargeBinary, nullable=False)
     user_id = Column(
         UUID,
         ForeignKey("users.id", name="tokens_user_id_fk", ondelete="CASCADE"),
         nullable=False,
     )
+    # tokens rotated from the same sign in share a family, revoking it ends
+    # the session on every token it produced
+    family_id = Column(UUID, nullable=False)
     status = Column(Enum(TokenStatus), default=TokenStatus.VALID, nullable=False)
     created_at = Column(
         DateTime(timezone=True), default=datetime.now(timezone.utc), nullable=False
@@ -32,7 +38,24 @@ class RefreshToken(Base):
     used_at = Column(DateTime(timezone=True))
     revoked_at = Column(DateTime(timezone=True))
 
+    # the table is range partitioned by expiry into daily partitions so
+    # expired tokens are removed by dropping a partition instead of a DELETE,
+    # the partition key has to be part of the primary key
     __table_args__ = (
-        PrimaryKeyConstraint("id", name="refresh_tokens_pk"),
+        PrimaryKeyConstraint("id", "expires_at", name="refresh_tokens_pk"),
         Index("idx_auth_user_id", user_id),
+        Index("idx_auth_family_id", family_id),
+        {"postgresql_partition_by": "RANGE (expires_at)"},
     )
+
+
+# catches rows outside the daily partitions, e.g. when the maintenance task
+# did not run, the daily partitions are created by that task
+event.listen(
+    RefreshToken.__table__,
+    "after_create",
+    DDL(
+        "CREATE TABLE IF NOT EXISTS refresh_tokens_default "
+        "PARTITION OF refresh_tokens DEFAULT"
+    ).execute_if(dialect="postgresql"),
+)
@@ -0,0 +1,27 @@
+from sqlalchemy import (
+    Column,
+    Integer,
+    VARCHAR,
+    DateTime,
+    PrimaryKeyConstraint,
+)
+
+from app.database.base import Base
+
+
+class PurgeJob(Base):
+    """checkpoint of a batched purge, a run that stops before finishing is
+    resumed by the next one with the same cutoff"""
+
+    __tablename__ = "purge_jobs"
+
+    name = Column(VARCHAR(50))
+    # rows older than the cutoff are purged, fixed when the job starts
+    cutoff = Column(DateTime(timezone=True), nullable=False)
+    deleted_rows = Column(Integer, default=0, nullable=False)
+    batches = Column(Integer, default=0, nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+    finished_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (PrimaryKeyConstraint("name", name="purge_jobs_pk"),)
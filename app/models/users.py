@@ -9,6 +9,7 @@ from sqlalchemy import (
     Column,
     Boolean,
     VARCHAR,
+    Integer,
     DateTime,
     ForeignKey,
     UniqueConstraint,
@@ -38,10 +39,17 @@ class User(Base):
         DateTime(timezone=True), default=datetime.now(tz=timezone.utc), nullable=False
     )
     delete_at = Column(DateTime(timezone=True))
+    # bumped whenever the role changes so access tokens issued before are stale
+    token_version = Column(Integer, default=0, server_default=text("0"), nullable=False)
 
     __table_args__ = (
         Index("idx_users_email", email),
         Index("idx_users_role_id", role_id),
+        Index(
+            "idx_users_delete_at",
+            delete_at,
+            postgresql_where=delete_at.isnot(None),
+        ),
         Index(
             "idx_users_name",
             name,
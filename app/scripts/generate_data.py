@@ -0,0 +1,384 @@
+"""Generate production scale data with realistic skew
+
+Rows are streamed into Postgres with COPY (asyncpg copy_records_to_table) in
+batches, every user shares one precomputed Argon2 hash of --password:
+
+    python -m app.scripts.generate_data --users 1000000 --courses 50000 \\
+        --enrollments 10000000 --refresh-tokens 5000000
+
+Course popularity and user activity follow a Zipf distribution (--skew), the
+enrollment counts of the courses are recomputed once the enrollments are in.
+"""
+import os
+import time
+import random
+import asyncio
+import asyncpg
+import argparse
+from uuid import UUID, uuid4
+from itertools import accumulate
+from sqlalchemy.engine import make_url
+from typing import Iterable, Iterator
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+from app.core.config import settings
+from app.scripts.seed_data import seed_db
+from app.core.security import hash_password
+from app.database.session import database
+from app.api.v1.schemas.users import UserRole
+from app.api.v1.schemas.auth import TokenStatus
+from app.api.v1.services.auth_service import auth_service_v1
+
+
+NATIONALITIES: tuple[str, ...] = (
+    "Nigerian",
+    "Ghanaian",
+    "Kenyan",
+    "South African",
+    "Egyptian",
+    "British",
+    "American",
+    "Indian",
+    "Brazilian",
+    "German",
+)
+
+SUBJECTS: tuple[str, ...] = (
+    "Algebra",
+    "Biology",
+    "Chemistry",
+    "Databases",
+    "Economics",
+    "French",
+    "Geography",
+    "History",
+    "Literature",
+    "Physics",
+    "Statistics",
+    "Programming",
+)
+
+USER_COLUMNS: tuple[str, ...] = (
+    "id",
+    "name",
+    "email",
+    "nationality",
+    "hashed_password",
+    "role_id",
+    "is_active",
+    "created_at",
+    "token_version",
+)
+
+COURSE_COLUMNS: tuple[str, ...] = (
+    "id",
+    "title",
+    "description",
+    "code",
+    "capacity",
+    "duration",
+    "instructor_id",
+    "total_students",
+    "is_active",
+    "created_at",
+)
+
+ENROLLMENT_COLUMNS: tuple[str, ...] = ("user_id", "course_id", "created_at")
+
+TOKEN_COLUMNS: tuple[str, ...] = (
+    "id",
+    "token",
+    "user_id",
+    "family_id",
+    "status",
+    "created_at",
+    "expires_at",
+    "used_at",
+    "revoked_at",
+)
+
+# share of generated refresh tokens per status
+TOKEN_STATUSES: tuple[TokenStatus, ...] = (
+    TokenStatus.VALID,
+    TokenStatus.USED,
+    TokenStatus.REVOKED,
+)
+TOKEN_STATUS_WEIGHTS: tuple[float, ...] = (0.7, 0.25, 0.05)
+
+
+def zipf_weights(total: int, skew: float) -> list[float]:
+    """cumulative weights of a Zipf distribution, rank 0 is the most popular"""
+    return list(accumulate(1 / (rank**skew) for rank in range(1, total + 1)))
+
+
+def batched(records: Iterable[tuple], size: int) -> Iterator[list[tuple]]:
+    batch: list[tuple] = []
+
+    for record in records:
+        batch.append(record)
+        if len(batch) == size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+
+def random_past(rng: random.Random, now: datetime, days: int) -> datetime:
+    return now - timedelta(seconds=rng.randrange(days * 86400))
+
+
+class DataGenerator:
+    def __init__(self, args: argparse.Namespace, role_ids: dict[str, UUID]):
+        self.args = args
+        self.role_ids = role_ids
+        self.rng = random.Random(args.seed)
+        self.now: datetime = datetime.now(timezone.utc)
+        # generated emails and course codes are unique per run
+        self.run_id: str = os.urandom(3).hex()
+
+        self.student_ids: list[UUID] = []
+        self.instructor_ids: list[UUID] = []
+        self.course_ids: list[UUID] = []
+
+    def users(self, hashed_password: str) -> Iterator[tuple]:
+        instructors: int = min(self.args.instructors, self.args.users)
+
+        for i in range(self.args.users):
+            user_id: UUID = uuid4()
+            is_instructor: bool = i < instructors
+
+            if is_instructor:
+                role_id: UUID = self.role_ids[UserRole.INSTRUCTOR.name]
+                self.instructor_ids.append(user_id)
+            else:
+                role_id: UUID = self.role_ids[UserRole.STUDENT.name]
+                self.student_ids.append(user_id)
+
+            yield (
+                user_id,
+                f"generated user {i}",
+                f"gen{self.run_id}.{i}@example.com",
+                self.rng.choice(NATIONALITIES),
+                hashed_password,
+                role_id,
+                True,
+                random_past(self.rng, self.now, 730),
+                0,
+            )
+
+    def courses(self) -> Iterator[tuple]:
+        for i in range(self.args.courses):
+            course_id: UUID = uuid4()
+            self.course_ids.append(course_id)
+            subject: str = SUBJECTS[i % len(SUBJECTS)]
+
+            yield (
+                course_id,
+                f"{subject} {i}",
+                f"Generated {subject.lower()} course",
+                f"G{self.run_id}{i}",
+                self.rng.randrange(10, 500),
+                self.rng.randrange(1, 13),
+                self.rng.choice(self.instructor_ids),
+                0,
+                True,
+                random_past(self.rng, self.now, 730),
+            )
+
+    def enrollments(self) -> Iterator[tuple]:
+        """a pareto number of courses per student (power users take many) and
+        zipf distributed courses (a few courses take most enrollments)"""
+        if not self.student_ids or not self.course_ids:
+            return
+
+        course_weights: list[float] = zipf_weights(len(self.course_ids), self.args.skew)
+        mean: float = self.args.enrollments / len(self.student_ids)
+        alpha: float = 2.5
+        remaining: int = self.args.enrollments
+
+        for user_id in self.student_ids:
+            if remaining <= 0:
+                return
+
+            # scaled so the pareto draws average out to the requested mean
+            draw: float = self.rng.paretovariate(alpha) * (alpha - 1) / alpha
+            count: int = min(round(mean * draw), len(self.course_ids), remaining)
+
+            chosen: set[UUID] = set()
+            # popular courses are drawn repeatedly, the attempts are bounded
+            for _ in range(count * 4):
+                if len(chosen) == count:
+                    break
+                chosen.add(
+                    self.rng.choices(self.course_ids, cum_weights=course_weights)[0]
+                )
+
+            for course_id in chosen:
+                yield user_id, course_id, random_past(self.rng, self.now, 365)
+
+            remaining -= len(chosen)
+
+    def refresh_tokens(self) -> Iterator[tuple]:
+        user_ids: list[UUID] = self.student_ids + self.instructor_ids
+        if not user_ids:
+            return
+
+        user_weights: list[float] = zipf_weights(len(user_ids), self.args.skew)
+        lifetime: int = settings.REFRESH_TOKEN_EXPIRE_TIME * 86400
+
+        for _ in range(self.args.refresh_tokens):
+            token_id: UUID = uuid4()
+            user_id: UUID = self.rng.choices(user_ids, cum_weights=user_weights)[0]
+            status: TokenStatus = self.rng.choices(
+                TOKEN_STATUSES, weights=TOKEN_STATUS_WEIGHTS
+            )[0]
+
+            created_at: datetime = self.now - timedelta(
+                seconds=self.rng.randrange(lifetime)
+            )
+            # the stored expiry has the second precision of the exp claim
+            expires_at: datetime = (created_at + timedelta(seconds=lifetime)).replace(
+                microsecond=0
+            )
+            changed_at: datetime = created_at + (self.now - created_at) / 2
+
+            yield (
+                token_id,
+                os.urandom(32),
+                user_id,
+                token_id,
+                status.name,
+                created_at,
+                expires_at,
+                changed_at if status == TokenStatus.USED else None,
+                changed_at if status == TokenStatus.REVOKED else None,
+            )
+
+
+async def copy_rows(
+    conn: asyncpg.Connection,
+    table: str,
+    columns: tuple[str, ...],
+    records: Iterable[tuple],
+    batch_size: int,
+) -> int:
+    total: int = 0
+    start: float = time.perf_counter()
+
+    for batch in batched(records, batch_size):
+        await conn.copy_records_to_table(table, records=batch, columns=columns)
+        total += len(batch)
+
+        elapsed: float = time.perf_counter() - start
+        print(f"{table}: {total} rows ({round(total / elapsed)} rows/s)", flush=True)
+
+    return total
+
+
+async def fix_course_counters(conn: asyncpg.Connection):
+    # capacity is raised for courses the skew pushed past it
+    await conn.execute(
+        """
+        UPDATE courses
+        SET total_students = counts.total,
+            capacity = GREATEST(courses.capacity, counts.total)
+        FROM (
+            SELECT course_id, count(*) AS total
+            FROM enrollments
+            GROUP BY course_id
+        ) AS counts
+        WHERE courses.id = counts.course_id
+        """
+    )
+
+
+async def create_token_partitions():
+    session: AsyncSession = database.async_session()
+
+    try:
+        await session.run_sync(auth_service_v1.manage_token_partitions)
+    finally:
+        await session.close()
+
+
+async def generate(args: argparse.Namespace):
+    # roles and the admin are created the same way as a fresh install
+    await seed_db()
+    await create_token_partitions()
+
+    url = make_url(settings.ASYNC_DB_URL).set(drivername="postgresql")
+    conn: asyncpg.Connection = await asyncpg.connect(
+        url.render_as_string(hide_password=False)
+    )
+
+    try:
+        role_ids: dict[str, UUID] = {
+            row["name"]: row["id"]
+            for row in await conn.fetch("SELECT id, name::text FROM roles")
+        }
+
+        generator: DataGenerator = DataGenerator(args, role_ids)
+        # one hash for every user, hashing a million passwords would take hours
+        hashed_password: str = await hash_password(args.password)
+
+        start: float = time.perf_counter()
+        totals: dict[str, int] = {
+            "users": await copy_rows(
+                conn,
+                "users",
+                USER_COLUMNS,
+                generator.users(hashed_password),
+                args.batch_size,
+            ),
+            "courses": await copy_rows(
+                conn, "courses", COURSE_COLUMNS, generator.courses(), args.batch_size
+            ),
+            "enrollments": await copy_rows(
+                conn,
+                "enrollments",
+                ENROLLMENT_COLUMNS,
+                generator.enrollments(),
+                args.batch_size,
+            ),
+            "refresh_tokens": await copy_rows(
+                conn,
+                "refresh_tokens",
+                TOKEN_COLUMNS,
+                generator.refresh_tokens(),
+                args.batch_size,
+            ),
+        }
+
+        await fix_course_counters(conn)
+        await conn.execute("ANALYZE")
+
+        elapsed: float = time.perf_counter() - start
+        print(f"generated {totals} in {round(elapsed, 1)}s", flush=True)
+    finally:
+        await conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--instructors", type=int, default=2_000)
+    parser.add_argument("--courses", type=int, default=5_000)
+    parser.add_argument("--enrollments", type=int, default=1_000_000)
+    parser.add_argument("--refresh-tokens", type=int, default=500_000)
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent")
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument("--password", default="generated-password")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.courses and not args.instructors:
+        parser.error("courses need at least one instructor")
+
+    asyncio.run(generate(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,19 @@
 """Initialize database with roles and default admin"""
 import asyncio
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession
 
 
 from app.core.config import settings
-from app.database.session import async_engine
+from app.database.session import database
 from app.api.v1.schemas.users import UserRole, UserCreateV1
 from app.api.v1.services.auth_service import auth_service_v1
 
 
-async_db_session: AsyncSession = async_sessionmaker(
-    bind=async_engine, class_=AsyncSession, autocommit=False, autoflush=False
-)
-
-
 async def seed_db():
     async def create_roles():
         roles: list[UserRole] = [UserRole.ADMIN, UserRole.STUDENT, UserRole.INSTRUCTOR]
 
-        async_session: AsyncSession = async_db_session()
+        async_session: AsyncSession = database.async_session()
 
         try:
             await auth_service_v1.create_roles(roles, async_session)
@@ -34,7 +29,7 @@ async def seed_db():
             password=settings.ADMIN_PASSWORD
         )
 
-        async_session: AsyncSession = async_db_session()
+        async_session: AsyncSession = database.async_session()
 
         try:
             await auth_service_v1.create_admin(admin_create, async_session)
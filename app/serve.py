@@ -0,0 +1,213 @@
+"""Production server, a master process forking uvicorn workers
+
+The app is built once in the master before forking so the workers share its
+imported modules, each worker then creates its own database engines sized to
+its share of the connections:
+
+    python -m app.serve --workers 4 --db-connections 40
+
+SIGHUP restarts the workers one at a time, SIGTERM or SIGINT stops them
+gracefully, a worker that dies is replaced.
+"""
+import os
+import sys
+import time
+import errno
+import signal
+import socket
+import argparse
+import traceback
+import uvicorn
+from fastapi import FastAPI
+
+
+from app.main import create_app
+from app.core.config import settings
+
+
+def worker_pool_size(connections: int, workers: int) -> tuple[int, int]:
+    """pool size and overflow of each worker, the split of DB_POOL_SIZE and
+    DB_MAX_OVERFLOW is kept"""
+    per_worker: int = max(1, connections // workers)
+    share: float = settings.DB_POOL_SIZE / (
+        settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+    )
+    pool_size: int = max(1, round(per_worker * share))
+    return pool_size, max(0, per_worker - pool_size)
+
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    sock: socket.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class PreforkServer:
+    """forks the workers, replaces the ones that die and restarts them on
+    SIGHUP. Workers share the listening socket of the master"""
+
+    def __init__(self, app: FastAPI, sock: socket.socket, args: argparse.Namespace):
+        self.app = app
+        self.sock = sock
+        self.args = args
+        self.workers: set[int] = set()
+        self.signals: list[int] = []
+        self.stopping: bool = False
+
+    def handle_signal(self, signum: int, frame):
+        self.signals.append(signum)
+
+    def spawn(self) -> int:
+        pid: int = os.fork()
+        if pid:
+            self.workers.add(pid)
+            return pid
+
+        # worker, the signal handlers of the master must not run here
+        for signum in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, signal.SIG_DFL)
+        try:
+            self.run_worker()
+        except BaseException:
+            traceback.print_exc()
+            os._exit(1)
+        os._exit(0)
+
+    def run_worker(self):
+        pool_size, max_overflow = worker_pool_size(
+            self.args.db_connections, self.args.workers
+        )
+        settings.DB_POOL_SIZE = pool_size
+        settings.DB_MAX_OVERFLOW = max_overflow
+
+        config: uvicorn.Config = uvicorn.Config(
+            self.app,
+            lifespan="on",
+            log_level=self.args.log_level,
+            # requests are logged by app.core.logger
+            access_log=False,
+            timeout_graceful_shutdown=self.args.graceful_timeout,
+        )
+        uvicorn.Server(config).run(sockets=[self.sock])
+
+    def reap(self) -> list[int]:
+        exited: list[int] = []
+        while True:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            self.workers.discard(pid)
+            exited.append(pid)
+        return exited
+
+    def wait_for(self, pid: int, timeout: float) -> bool:
+        deadline: float = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            self.reap()
+            if pid not in self.workers:
+                return True
+            time.sleep(0.1)
+        return False
+
+    def restart_workers(self):
+        """a replacement is started before each worker is stopped so the
+        socket always has workers accepting on it"""
+        for pid in list(self.workers):
+            self.spawn()
+            os.kill(pid, signal.SIGTERM)
+            if not self.wait_for(pid, self.args.graceful_timeout):
+                os.kill(pid, signal.SIGKILL)
+                self.wait_for(pid, self.args.graceful_timeout)
+
+    def stop(self):
+        self.stopping = True
+        for pid in self.workers:
+            os.kill(pid, signal.SIGTERM)
+
+        deadline: float = time.monotonic() + self.args.graceful_timeout
+        while self.workers and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+
+        for pid in self.workers:
+            os.kill(pid, signal.SIGKILL)
+        while self.workers:
+            self.reap()
+            time.sleep(0.1)
+
+    def run(self):
+        for signum in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, self.handle_signal)
+
+        for _ in range(self.args.workers):
+            self.spawn()
+
+        while not self.stopping:
+            while self.signals:
+                signum: int = self.signals.pop(0)
+                if signum == signal.SIGHUP:
+                    self.restart_workers()
+                else:
+                    self.stop()
+                    return
+
+            # workers that died on their own are replaced
+            for _ in self.reap():
+                self.spawn()
+
+            time.sleep(0.5)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.SERVE_WORKERS or os.cpu_count() or 1,
+    )
+    parser.add_argument(
+        "--db-connections",
+        type=int,
+        default=settings.SERVE_DB_CONNECTIONS,
+        help="database connections shared by all workers (pool and overflow)",
+    )
+    parser.add_argument(
+        "--graceful-timeout", type=float, default=settings.SERVE_GRACEFUL_TIMEOUT
+    )
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args(argv)
+
+    if args.db_connections is None:
+        # every worker gets the pool of a single process server
+        args.db_connections = (
+            settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+        ) * args.workers
+    return args
+
+
+def main(argv: list[str] | None = None):
+    args: argparse.Namespace = parse_args(argv)
+
+    try:
+        sock: socket.socket = bind_socket(args.host, args.port, args.backlog)
+    except OSError as e:
+        if e.errno == errno.EADDRINUSE:
+            sys.exit(f"port {args.port} is already in use")
+        raise
+
+    # imported and built before forking, the engines are created per worker
+    app: FastAPI = create_app()
+    PreforkServer(app, sock, args).run()
+
+
+if __name__ == "__main__":
+    main()
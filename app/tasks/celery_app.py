@@ -2,6 +2,7 @@ from celery.app import Celery
 
 
 from app.core.config import settings
+from app.core.tracing import instrument_celery
 
 
 celery_app = Celery(
@@ -11,5 +12,8 @@ celery_app = Celery(
 
 celery_app.config_from_object("app.tasks.celeryconfig")
 
+# tasks continue the trace of the request that published them
+instrument_celery()
+
 
 from app.tasks import celery_schedules
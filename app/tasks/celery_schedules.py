@@ -4,13 +4,15 @@ from app.tasks.celery_app import celery_app
 
 # schedule task to run periodically
 celery_app.conf.beat_schedule = {
-    "delete_tokens": {
-        "task": "app.tasks.celery_tasks.delete_tokens",
-        "schedule": crontab(hour=16, minute=0)
+    # runs at night (Lagos time) since partition ddl briefly locks the table
+    "manage_token_partitions": {
+        "task": "app.tasks.celery_tasks.manage_token_partitions",
+        "schedule": crontab(hour=3, minute=0)
     },
 
+    # batches are bounded per run and resumed, so it runs nightly
     "delete_users": {
         "task": "app.tasks.celery_tasks.delete_users",
-        "schedule": crontab(day_of_month=12, hour=14, minute=0)
+        "schedule": crontab(hour=2, minute=0)
     }
 }
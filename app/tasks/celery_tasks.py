@@ -1,8 +1,10 @@
+import os
 from sqlalchemy import Engine, create_engine
 from sqlalchemy.orm import Session, sessionmaker
 
 
 from app.core.config import settings
+from app.core.tracing import trace_queries
 from app.tasks.celery_app import celery_app
 from app.api.v1.services.auth_service import auth_service_v1
 from app.api.v1.services.user_service import user_service_v1
@@ -17,18 +19,26 @@ db_engine: Engine = create_engine(
     connect_args={"options": "-c timezone=utc"},
 )
 
+trace_queries(db_engine)
+
+# the prefork pool forks after this module is imported, children must not
+# reuse the connections of the parent
+os.register_at_fork(after_in_child=lambda: db_engine.dispose(close=False))
+
 
 db_session: Session = sessionmaker(bind=db_engine, autocommit=False, autoflush=False)
 
     
-# background task to delete revoked or used refresh tokens
+# background task to create upcoming refresh token partitions and drop
+# the expired ones
 @celery_app.task
-def delete_tokens():
+def manage_token_partitions():
     with db_session() as db:
-        auth_service_v1.delete_refresh_tokens(db)
+        auth_service_v1.manage_token_partitions(db)
 
 
-# background task to delete users permanently
+# background task to delete users permanently, batches skip rows locked by
+# other workers so it can run on several workers at once
 @celery_app.task
 def delete_users():
     with db_session() as db:
@@ -0,0 +1,92 @@
+"""Payload size and encode time of a user list page, default json against the
+columnar formats
+
+The default response builds a UserReadV1 per row and serializes the response
+model, the columnar formats encode the row tuples as they come from the
+database. No database is needed, the rows are generated:
+
+    python -m bench.columnar --rows 500
+"""
+import json
+import time
+import uuid
+import argparse
+from datetime import datetime, timezone
+
+
+from app.api.v1.schemas.users import UserRole, UserReadV1, UserResponseV1
+from app.core.columnar import (
+    COLUMNAR_JSON,
+    COLUMNAR_MSGPACK,
+    FORMATS,
+    ColumnarResponse,
+)
+
+
+COLUMNS: list[str] = [
+    "id",
+    "name",
+    "email",
+    "nationality",
+    "is_active",
+    "created_at",
+    "role",
+]
+
+
+def make_rows(count: int) -> list[tuple]:
+    created_at: datetime = datetime.now(timezone.utc)
+    return [
+        (
+            uuid.uuid4(),
+            f"student {i:06d}",
+            f"student{i}@example.com",
+            "nigerian",
+            True,
+            created_at,
+            UserRole.STUDENT,
+        )
+        for i in range(count)
+    ]
+
+
+def default_json(rows: list[tuple]) -> bytes:
+    # what the route and fastapi do: a model per row, then the response model
+    users: list[UserReadV1] = [UserReadV1(**dict(zip(COLUMNS, row))) for row in rows]
+    response = UserResponseV1(message="Students retrieved successfully", data=users)
+    validated = UserResponseV1.model_validate(response.model_dump())
+    return json.dumps(validated.model_dump(mode="json")).encode()
+
+
+def timed(encode, rows: list[tuple], repeat: int) -> dict:
+    start: float = time.perf_counter()
+    for _ in range(repeat):
+        body: bytes = encode(rows)
+    elapsed: float = (time.perf_counter() - start) / repeat
+
+    return {"bytes": len(body), "encode_ms": round(elapsed * 1000, 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    rows: list[tuple] = make_rows(args.rows)
+    results: dict = {"default_json": timed(default_json, rows, args.repeat)}
+
+    for media_type in (COLUMNAR_JSON, COLUMNAR_MSGPACK):
+        if media_type not in FORMATS:
+            continue
+        results[media_type] = timed(
+            lambda rows: ColumnarResponse(COLUMNS, rows, media_type=media_type).body,
+            rows,
+            args.repeat,
+        )
+
+    print(json.dumps({"rows": args.rows, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
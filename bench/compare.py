@@ -0,0 +1,67 @@
+"""Compare two bench.load result files route by route
+
+    python -m bench.compare bench/results/<base>.json bench/results/<head>.json
+
+Latencies and queries going up, or throughput going down, by more than
+--threshold percent are flagged with a "!".
+"""
+import json
+import argparse
+from pathlib import Path
+
+
+# metrics where a lower value is better
+LOWER_IS_BETTER: tuple[str, ...] = (
+    "p50_ms",
+    "p95_ms",
+    "p99_ms",
+    "queries_per_request",
+    "alloc_peak_kib",
+)
+HIGHER_IS_BETTER: tuple[str, ...] = ("throughput_rps",)
+
+
+def change(base: float, head: float) -> float:
+    if not base:
+        return 0.0
+    return (head - base) / base * 100
+
+
+def compare(base: dict, head: dict, threshold: float) -> list[str]:
+    lines: list[str] = [f"{base['commit']} -> {head['commit']}"]
+
+    for route in sorted(set(base["routes"]) | set(head["routes"])):
+        base_route: dict = base["routes"].get(route, {})
+        head_route: dict = head["routes"].get(route, {})
+        lines.append(route)
+
+        for metric in HIGHER_IS_BETTER + LOWER_IS_BETTER:
+            if metric not in base_route or metric not in head_route:
+                continue
+
+            diff: float = change(base_route[metric], head_route[metric])
+            regressed: bool = (
+                diff < -threshold if metric in HIGHER_IS_BETTER else diff > threshold
+            )
+            lines.append(
+                f"  {'!' if regressed else ' '} {metric:<20} "
+                f"{base_route[metric]:>10} -> {head_route[metric]:>10} ({diff:+.1f}%)"
+            )
+
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base", type=Path)
+    parser.add_argument("head", type=Path)
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent")
+    args = parser.parse_args()
+
+    base: dict = json.loads(args.base.read_text())
+    head: dict = json.loads(args.head.read_text())
+    print("\n".join(compare(base, head, args.threshold)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Throughput of rejected requests (401 and 404), the paths scanners hit
+
+Invalid tokens are random per request so the negative token cache does not
+hide the decode, 404s need a signed in student of the generated data:
+
+    python -m bench.error_paths --requests 2000 --concurrency 20
+"""
+import json
+import time
+import random
+import string
+import asyncio
+import argparse
+from uuid import uuid4
+from statistics import median, quantiles
+from httpx import AsyncClient, ASGITransport
+
+
+from app.main import app
+from app.core.lifespan import lifespan
+from app.core.exceptions import error_reporter
+from bench.load import HEADERS, Recorder, VirtualUser, load_workload
+
+
+def random_token(rng: random.Random) -> str:
+    # shaped like a jwt so it fails on the signature, not on parsing
+    payload: str = "".join(rng.choices(string.ascii_letters, k=40))
+    signature: str = "".join(rng.choices(string.ascii_letters, k=43))
+    return f"eyJhbGciOiJIUzI1NiJ9.{payload}.{signature}"
+
+
+async def invalid_token(client: AsyncClient, rng: random.Random) -> int:
+    res = await client.get(
+        "/api/v1/courses/",
+        headers={**HEADERS, "Authorization": f"Bearer {random_token(rng)}"},
+    )
+    return res.status_code
+
+
+async def course_not_found(client: AsyncClient, rng: random.Random) -> int:
+    res = await client.get(f"/api/v1/courses/{uuid4()}/", headers=HEADERS)
+    return res.status_code
+
+
+async def run_case(case, clients: list[AsyncClient], total: int) -> dict:
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    per_client: int = total // len(clients)
+
+    async def worker(client: AsyncClient, seed: int):
+        rng = random.Random(seed)
+        for _ in range(per_client):
+            start: float = time.perf_counter()
+            status: int = await case(client, rng)
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    start: float = time.perf_counter()
+    await asyncio.gather(*(worker(client, i) for i, client in enumerate(clients)))
+    elapsed: float = time.perf_counter() - start
+
+    cuts: list[float] = quantiles(latencies, n=100, method="inclusive")
+    return {
+        "case": case.__name__,
+        "requests": len(latencies),
+        "statuses": statuses,
+        "requests_per_s": round(len(latencies) / elapsed),
+        "p50_ms": round(median(latencies), 2),
+        "p99_ms": round(cuts[98], 2),
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    results: list[dict] = []
+
+    async with lifespan(app):
+        anonymous: list[AsyncClient] = [
+            AsyncClient(transport=ASGITransport(app=app), base_url="http://localhost")
+            for _ in range(args.concurrency)
+        ]
+        results.append(await run_case(invalid_token, anonymous, args.requests))
+        for client in anonymous:
+            await client.aclose()
+
+        # one signed in student is shared, the refresh cookie is checked per request
+        workload = await load_workload(1, args.password)
+        students: list[VirtualUser] = []
+        for email in workload.student_emails:
+            student: VirtualUser = VirtualUser(email, args.password, Recorder())
+            if await student.sign_in(record=False):
+                students.append(student)
+                break
+
+        if students:
+            results.append(
+                await run_case(
+                    course_not_found,
+                    [students[0].client] * args.concurrency,
+                    args.requests,
+                )
+            )
+            await students[0].close()
+
+    return {"results": results, "errors": error_reporter.stats()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--password", default="generated-password")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Latency of the first requests served after startup, with and without warm up
+
+Each mode runs in a fresh interpreter so nothing is cached between runs:
+
+    python -m bench.first_requests --requests 100
+"""
+import sys
+import json
+import time
+import asyncio
+import argparse
+import subprocess
+from statistics import median, quantiles
+from httpx import AsyncClient, ASGITransport
+
+
+def summarize(latencies: list[float]) -> dict:
+    cuts: list[float] = quantiles(latencies, n=100)
+    return {
+        "requests": len(latencies),
+        "first_ms": round(latencies[0], 2),
+        "p50_ms": round(median(latencies), 2),
+        "p95_ms": round(cuts[94], 2),
+        "p99_ms": round(cuts[98], 2),
+        "max_ms": round(max(latencies), 2),
+        "total_ms": round(sum(latencies), 2),
+    }
+
+
+async def send_requests(client: AsyncClient, total: int) -> list[float]:
+    latencies: list[float] = []
+
+    for i in range(total):
+        start: float = time.perf_counter()
+        # a failed sign in still checks out a connection and queries the users
+        # table, so it exercises the pool without needing seeded data
+        await client.post(
+            "/api/v1/auth/sign-in/",
+            data={"username": f"bench{i}@example.com", "password": "bench-password"},
+            headers={"curr_env": "test"},
+        )
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    return latencies
+
+
+async def run(warm: bool, total: int) -> dict:
+    from app.main import app
+    from app.core.lifespan import lifespan, dispose_engines
+
+    transport: ASGITransport = ASGITransport(app=app)
+
+    async with AsyncClient(transport=transport, base_url="http://localhost") as client:
+        if warm:
+            startup_start: float = time.perf_counter()
+            async with lifespan(app):
+                startup_ms: float = (time.perf_counter() - startup_start) * 1000
+                latencies: list[float] = await send_requests(client, total)
+        else:
+            startup_ms: float = 0.0
+            latencies: list[float] = await send_requests(client, total)
+            await dispose_engines()
+
+    return {"warm_up": warm, "startup_ms": round(startup_ms, 2), **summarize(latencies)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--mode", choices=["cold", "warm"], default=None)
+    args = parser.parse_args()
+
+    if args.mode:
+        result: dict = asyncio.run(run(args.mode == "warm", args.requests))
+        print(json.dumps(result))
+        return
+
+    results: list[dict] = []
+    for mode in ("cold", "warm"):
+        proc = subprocess.run(
+            [sys.executable, "-m", "bench.first_requests", "--mode", mode,
+             "--requests", str(args.requests)],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
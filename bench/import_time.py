@@ -0,0 +1,87 @@
+"""Startup cost of the api modules, measured with -X importtime
+
+Every run is a fresh interpreter so nothing is cached between runs:
+
+    python -m bench.import_time --runs 5
+"""
+import sys
+import json
+import time
+import argparse
+import subprocess
+from statistics import median
+
+
+# what a web worker, the test collection and a celery worker import at boot
+TARGETS: dict[str, str] = {
+    "import_main": "import app.main",
+    "create_app": "import app.main; app.main.create_app()",
+    "celery_worker": "import app.tasks.celery_tasks",
+}
+
+
+def parse_importtime(stderr: str) -> dict[str, int]:
+    """self time in microseconds of every module imported"""
+    modules: dict[str, int] = {}
+
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, _, name = line.removeprefix("import time:").split("|")
+        modules[name.strip()] = int(self_us)
+
+    return modules
+
+
+def run_once(code: str) -> tuple[float, dict[str, int]]:
+    start: float = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    elapsed_ms: float = (time.perf_counter() - start) * 1000
+    return elapsed_ms, parse_importtime(result.stderr)
+
+
+def measure(code: str, runs: int, top: int) -> dict:
+    wall: list[float] = []
+    imports: list[float] = []
+    modules: dict[str, list[int]] = {}
+
+    for _ in range(runs):
+        elapsed_ms, timings = run_once(code)
+        wall.append(elapsed_ms)
+        imports.append(sum(timings.values()) / 1000)
+        for name, self_us in timings.items():
+            modules.setdefault(name, []).append(self_us)
+
+    slowest: list[tuple[str, float]] = sorted(
+        ((name, median(times) / 1000) for name, times in modules.items()),
+        key=lambda module: module[1],
+        reverse=True,
+    )[:top]
+
+    return {
+        "wall_ms": round(median(wall), 1),
+        "import_ms": round(median(imports), 1),
+        "modules": len(modules),
+        "slowest": {name: round(ms, 2) for name, ms in slowest},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    results: dict = {
+        name: measure(code, args.runs, args.top) for name, code in TARGETS.items()
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,427 @@
+"""In-process load test of the api with weighted scenario mixes
+
+Virtual users drive app.main.app through ASGITransport against the database in
+ASYNC_DB_URL, populated with app.scripts.generate_data first:
+
+    python -m bench.load --users 20 --duration 30 \\
+        --mix browse=70,enroll=20,sign_in=5,admin_export=5
+
+Throughput, p50/p95/p99 latency, db queries and db time per request (from
+app.core.instrumentation) are reported per route, allocations per request
+come from a separate tracemalloc pass since tracing slows every request
+down. Results are written as json to bench/results/<commit>.json, compare
+two runs with bench.compare.
+"""
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+import subprocess
+import tracemalloc
+from pathlib import Path
+from sqlalchemy import text
+from collections import defaultdict
+from dataclasses import dataclass, field
+from statistics import median, quantiles
+from datetime import datetime, timezone
+from httpx import AsyncClient, ASGITransport, Response
+
+
+from app.main import app
+from app.core.config import settings
+from app.core.lifespan import lifespan
+from app.core.instrumentation import track_queries
+from app.database.session import database
+
+
+RESULTS_DIR: Path = Path(__file__).parent / "results"
+
+DEFAULT_MIX: str = "browse=70,enroll=20,sign_in=5,admin_export=5"
+
+# unique rate limiter key per request, see app.limiter
+HEADERS: dict[str, str] = {"curr_env": "test"}
+
+
+@dataclass
+class RouteStats:
+    latencies: list[float] = field(default_factory=list)
+    queries: list[int] = field(default_factory=list)
+    db_times: list[float] = field(default_factory=list)
+    allocations: list[float] = field(default_factory=list)
+    statuses: dict[int, int] = field(default_factory=lambda: defaultdict(int))
+
+
+class Recorder:
+    def __init__(self):
+        self.routes: dict[str, RouteStats] = defaultdict(RouteStats)
+
+    async def send(
+        self, client: AsyncClient, method: str, route: str, url: str, **kwargs
+    ) -> Response:
+        tracing: bool = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+
+        start: float = time.perf_counter()
+        with track_queries() as metrics:
+            res: Response = await client.request(
+                method, url, headers={**HEADERS, **kwargs.pop("headers", {})}, **kwargs
+            )
+        elapsed: float = (time.perf_counter() - start) * 1000
+
+        stats: RouteStats = self.routes[f"{method} {route}"]
+
+        if tracing:
+            _, peak = tracemalloc.get_traced_memory()
+            stats.allocations.append((peak - before) / 1024)
+        else:
+            stats.statuses[res.status_code] += 1
+            stats.latencies.append(elapsed)
+            stats.queries.append(metrics.queries)
+            stats.db_times.append(metrics.db_time * 1000)
+
+        return res
+
+
+@dataclass
+class Workload:
+    student_emails: list[str]
+    course_ids: list[str]
+    password: str
+    admin: "VirtualUser | None" = None
+
+
+class VirtualUser:
+    def __init__(self, email: str, password: str, recorder: Recorder):
+        self.email = email
+        self.password = password
+        self.recorder = recorder
+        self.client = AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://localhost"
+        )
+
+    async def sign_in(self, record: bool = True) -> bool:
+        form: dict[str, str] = {"username": self.email, "password": self.password}
+        route: str = "/api/v1/auth/sign-in/"
+
+        if record:
+            res: Response = await self.recorder.send(
+                self.client, "POST", route, route, data=form
+            )
+        else:
+            res: Response = await self.client.post(route, data=form, headers=HEADERS)
+
+        if res.status_code != 201:
+            return False
+
+        # the refresh token cookie is kept by the client
+        self.client.headers["Authorization"] = f"Bearer {res.json()['access_token']}"
+        return True
+
+    async def close(self):
+        await self.client.aclose()
+
+
+async def browse(user: VirtualUser, workload: Workload, rng: random.Random):
+    page: int = rng.randint(1, 20)
+    await user.recorder.send(
+        user.client,
+        "GET",
+        "/api/v1/courses/",
+        "/api/v1/courses/",
+        params={"page": page, "limit": 15},
+    )
+
+    course_id: str = rng.choice(workload.course_ids)
+    await user.recorder.send(
+        user.client,
+        "GET",
+        "/api/v1/courses/{course_id}/",
+        f"/api/v1/courses/{course_id}/",
+    )
+
+
+async def enroll(user: VirtualUser, workload: Workload, rng: random.Random):
+    course_id: str = rng.choice(workload.course_ids)
+    route: str = "/api/v1/courses/{course_id}/enrollments/"
+    url: str = f"/api/v1/courses/{course_id}/enrollments/"
+
+    res: Response = await user.recorder.send(user.client, "POST", route, url)
+
+    # unenrolling again keeps the enrollment counts stable between runs
+    if res.status_code == 201:
+        await user.recorder.send(user.client, "DELETE", route, url)
+
+
+async def sign_in(user: VirtualUser, workload: Workload, rng: random.Random):
+    await user.sign_in()
+
+
+async def admin_export(user: VirtualUser, workload: Workload, rng: random.Random):
+    route: str = rng.choice(["/api/v1/admin/students/", "/api/v1/admin/enrollments/"])
+    await user.recorder.send(
+        workload.admin.client,
+        "GET",
+        route,
+        route,
+        params={"page": rng.randint(1, 20), "limit": 100},
+    )
+
+
+SCENARIOS: dict = {
+    "browse": browse,
+    "enroll": enroll,
+    "sign_in": sign_in,
+    "admin_export": admin_export,
+}
+
+
+def parse_mix(mix: str) -> dict[str, float]:
+    weights: dict[str, float] = {}
+
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS:
+            raise ValueError(f"unknown scenario {name}, pick from {list(SCENARIOS)}")
+        weights[name] = float(weight or 1)
+
+    return weights
+
+
+async def load_workload(users: int, password: str) -> Workload:
+    async with database.async_session() as session:
+        student_emails: list[str] = list(
+            (
+                await session.execute(
+                    text(
+                        """
+                        SELECT users.email FROM users
+                        JOIN roles ON roles.id = users.role_id
+                        WHERE roles.name = 'STUDENT' AND users.is_active
+                        ORDER BY random()
+                        LIMIT :limit
+                        """
+                    ),
+                    {"limit": users * 2},
+                )
+            ).scalars()
+        )
+        course_ids: list[str] = [
+            str(course_id)
+            for course_id in (
+                await session.execute(
+                    text(
+                        """
+                        SELECT id FROM courses
+                        WHERE is_active AND total_students < capacity
+                        ORDER BY random()
+                        LIMIT 1000
+                        """
+                    )
+                )
+            ).scalars()
+        ]
+
+    if not student_emails or not course_ids:
+        raise RuntimeError(
+            "no students or courses, run app.scripts.generate_data first"
+        )
+
+    return Workload(student_emails, course_ids, password)
+
+
+async def start_users(
+    workload: Workload, total: int, recorder: Recorder
+) -> list[VirtualUser]:
+    users: list[VirtualUser] = []
+
+    # emails whose password differs (seeded users) are skipped
+    for email in workload.student_emails:
+        if len(users) == total:
+            break
+
+        user: VirtualUser = VirtualUser(email, workload.password, recorder)
+        if await user.sign_in(record=False):
+            users.append(user)
+        else:
+            await user.close()
+
+    if not users:
+        raise RuntimeError(
+            f"no student could sign in with the password {workload.password}"
+        )
+
+    return users
+
+
+async def run_user(
+    user: VirtualUser,
+    workload: Workload,
+    weights: dict[str, float],
+    seed: int,
+    deadline: float,
+    iterations: int | None,
+):
+    rng = random.Random(seed)
+    names: list[str] = list(weights)
+    done: int = 0
+
+    while time.perf_counter() < deadline and (iterations is None or done < iterations):
+        name: str = rng.choices(names, weights=[weights[n] for n in names])[0]
+        await SCENARIOS[name](user, workload, rng)
+        done += 1
+
+
+def summarize(stats: RouteStats, elapsed: float) -> dict:
+    result: dict = {
+        "requests": len(stats.latencies),
+        "statuses": dict(sorted(stats.statuses.items())),
+    }
+
+    if len(stats.latencies) > 1:
+        cuts: list[float] = quantiles(stats.latencies, n=100, method="inclusive")
+        result.update(
+            {
+                "throughput_rps": round(len(stats.latencies) / elapsed, 2),
+                "p50_ms": round(median(stats.latencies), 2),
+                "p95_ms": round(cuts[94], 2),
+                "p99_ms": round(cuts[98], 2),
+                "max_ms": round(max(stats.latencies), 2),
+                "queries_per_request": round(
+                    sum(stats.queries) / len(stats.queries), 2
+                ),
+                "max_queries": max(stats.queries),
+                "db_ms_per_request": round(
+                    sum(stats.db_times) / len(stats.db_times), 2
+                ),
+            }
+        )
+
+    if stats.allocations:
+        result["alloc_peak_kib"] = round(median(stats.allocations), 1)
+
+    return result
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def run(args: argparse.Namespace) -> dict:
+    weights: dict[str, float] = parse_mix(args.mix)
+    recorder: Recorder = Recorder()
+
+    async with lifespan(app):
+        workload: Workload = await load_workload(args.users, args.password)
+
+        workload.admin = VirtualUser(
+            settings.ADMIN_EMAIL, settings.ADMIN_PASSWORD, recorder
+        )
+        if not await workload.admin.sign_in(record=False):
+            raise RuntimeError("the admin could not sign in, check ADMIN_EMAIL")
+
+        users: list[VirtualUser] = await start_users(workload, args.users, recorder)
+
+        try:
+            start: float = time.perf_counter()
+            await asyncio.gather(
+                *(
+                    run_user(
+                        user,
+                        workload,
+                        weights,
+                        args.seed + i,
+                        start + args.duration,
+                        args.iterations,
+                    )
+                    for i, user in enumerate(users)
+                )
+            )
+            elapsed: float = time.perf_counter() - start
+
+            # one user per scenario, sequential so allocations are not mixed up
+            if args.alloc_iterations:
+                tracemalloc.start()
+                try:
+                    for name in weights:
+                        await run_user(
+                            users[0],
+                            workload,
+                            {name: 1},
+                            args.seed,
+                            float("inf"),
+                            args.alloc_iterations,
+                        )
+                finally:
+                    tracemalloc.stop()
+        finally:
+            for user in [*users, workload.admin]:
+                await user.close()
+
+    total: int = sum(len(stats.latencies) for stats in recorder.routes.values())
+
+    return {
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "config": {
+            "users": len(users),
+            "duration_s": args.duration,
+            "iterations": args.iterations,
+            "mix": weights,
+            "seed": args.seed,
+        },
+        "total": {
+            "requests": total,
+            "elapsed_s": round(elapsed, 2),
+            "throughput_rps": round(total / elapsed, 2),
+        },
+        "routes": {
+            route: summarize(stats, elapsed)
+            for route, stats in sorted(recorder.routes.items())
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20, help="virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument(
+        "--iterations", type=int, default=None, help="scenarios per user"
+    )
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--password", default="generated-password")
+    parser.add_argument("--alloc-iterations", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    try:
+        parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    result: dict = asyncio.run(run(args))
+
+    output: Path = args.output or RESULTS_DIR / f"{result['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2))
+
+    print(json.dumps(result, indent=2))
+    print(f"results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
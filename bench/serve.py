@@ -0,0 +1,151 @@
+"""Throughput of python -m app.serve with one worker against several
+
+Each server runs in a subprocess on a free port and clients send requests over
+real sockets for a fixed duration. sign_in verifies an argon2 hash per request
+(run app.scripts.generate_data first), health never touches the database:
+
+    python -m bench.serve --workers 1,4 --route sign_in --duration 20
+"""
+import os
+import sys
+import json
+import time
+import random
+import signal
+import socket
+import asyncio
+import argparse
+import subprocess
+from statistics import median, quantiles
+from httpx import AsyncClient, Limits
+
+
+from app.database.session import database
+from bench.load import HEADERS, Workload, load_workload
+
+
+async def health(client: AsyncClient, workload: Workload | None, rng: random.Random):
+    return await client.get("/api/v1/health/", headers=HEADERS)
+
+
+async def sign_in(client: AsyncClient, workload: Workload, rng: random.Random):
+    return await client.post(
+        "/api/v1/auth/sign-in/",
+        data={
+            "username": rng.choice(workload.student_emails),
+            "password": workload.password,
+        },
+        headers=HEADERS,
+    )
+
+
+ROUTES: dict = {"health": health, "sign_in": sign_in}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_ready(client: AsyncClient, timeout: float):
+    deadline: float = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/api/v1/health/", headers=HEADERS)).is_success:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+async def run_load(
+    client: AsyncClient,
+    route,
+    workload: Workload | None,
+    duration: float,
+    concurrency: int,
+) -> dict:
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    stop_at: float = time.monotonic() + duration
+
+    async def worker(seed: int):
+        rng = random.Random(seed)
+        while time.monotonic() < stop_at:
+            start: float = time.perf_counter()
+            res = await route(client, workload, rng)
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[res.status_code] = statuses.get(res.status_code, 0) + 1
+
+    start: float = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed: float = time.perf_counter() - start
+
+    cuts: list[float] = quantiles(latencies, n=100, method="inclusive")
+    return {
+        "requests": len(latencies),
+        "statuses": statuses,
+        "requests_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(median(latencies), 2),
+        "p99_ms": round(cuts[98], 2),
+    }
+
+
+async def bench_workers(workers: int, args: argparse.Namespace, workload) -> dict:
+    port: int = free_port()
+    command: list[str] = [sys.executable, "-m", "app.serve", "--host", "127.0.0.1"]
+    command += ["--port", str(port), "--workers", str(workers)]
+    server = subprocess.Popen([*command, "--log-level", "warning"])
+
+    try:
+        async with AsyncClient(
+            base_url=f"http://127.0.0.1:{port}",
+            limits=Limits(max_connections=args.concurrency),
+            timeout=30.0,
+        ) as client:
+            await wait_ready(client, timeout=60.0)
+            # the first requests of each worker pay for the warm up
+            await run_load(client, ROUTES[args.route], workload, 2.0, args.concurrency)
+            result: dict = await run_load(
+                client, ROUTES[args.route], workload, args.duration, args.concurrency
+            )
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+
+    return {"workers": workers, **result}
+
+
+async def run(args: argparse.Namespace) -> dict:
+    workload: Workload | None = None
+    if args.route == "sign_in":
+        workload = await load_workload(args.concurrency, args.password)
+        await database.dispose()
+
+    results: list[dict] = [
+        await bench_workers(workers, args, workload)
+        for workers in (int(count) for count in args.workers.split(","))
+    ]
+    baseline: float = results[0]["requests_per_s"]
+    for result in results:
+        result["speedup"] = round(result["requests_per_s"] / baseline, 2)
+
+    return {"route": args.route, "cpus": os.cpu_count(), "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", default="1,4")
+    parser.add_argument("--route", choices=list(ROUTES), default="sign_in")
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--password", default="generated-password")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
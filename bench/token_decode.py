@@ -0,0 +1,94 @@
+"""Access token decode throughput with and without the decoded token cache
+
+Every client reuses its token for all of its requests, a share of the requests
+carry a tampered token to exercise the negative cache:
+
+    python -m bench.token_decode --clients 100 --requests 20000
+"""
+import json
+import time
+import random
+import asyncio
+import argparse
+from uuid import uuid4
+
+
+from app.api.v1.schemas.users import UserRole
+from app.api.v1.schemas.auth import TokenDataV1
+from app.core.token_cache import token_cache
+from app.core.security import create_access_token, decode_access_token
+
+
+async def make_tokens(clients: int) -> list[str]:
+    return [
+        await create_access_token(TokenDataV1(id=uuid4(), role=UserRole.STUDENT))
+        for _ in range(clients)
+    ]
+
+
+async def decode_all(tokens: list[str]) -> dict:
+    invalid: int = 0
+
+    start: float = time.perf_counter()
+    for token in tokens:
+        if await decode_access_token(token) is None:
+            invalid += 1
+    elapsed: float = time.perf_counter() - start
+
+    return {
+        "decodes": len(tokens),
+        "invalid": invalid,
+        "total_ms": round(elapsed * 1000, 2),
+        "per_decode_us": round(elapsed / len(tokens) * 1_000_000, 2),
+        "decodes_per_s": round(len(tokens) / elapsed),
+    }
+
+
+async def run(clients: int, total: int, invalid_ratio: float) -> list[dict]:
+    tokens: list[str] = await make_tokens(clients)
+    # a flipped signature character keeps the token well formed but invalid
+    tampered: list[str] = [
+        token[:-2] + ("A" if token[-2] != "A" else "B") + token[-1]
+        for token in tokens
+    ]
+
+    rng = random.Random(0)
+    workload: list[str] = [
+        rng.choice(tampered) if rng.random() < invalid_ratio else rng.choice(tokens)
+        for _ in range(total)
+    ]
+
+    max_size: int = token_cache.max_size
+    results: list[dict] = []
+
+    try:
+        for cached in (False, True):
+            token_cache.clear()
+            token_cache.max_size = max_size if cached else 0
+
+            result: dict = await decode_all(workload)
+            result["cache"] = cached
+            result["cache_hits"] = token_cache.hits if cached else 0
+            results.append(result)
+    finally:
+        token_cache.max_size = max_size
+        token_cache.clear()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--invalid-ratio", type=float, default=0.01)
+    args = parser.parse_args()
+
+    results: list[dict] = asyncio.run(
+        run(args.clients, args.requests, args.invalid_ratio)
+    )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import asyncio
 import pytest
+from contextlib import contextmanager
 import pytest_asyncio
 from sqlalchemy import text
 from sqlalchemy.pool import NullPool
@@ -18,6 +19,9 @@ from app.main import app
 from app.database.base import Base
 from app.dependencies import get_db
 from app.core.config import settings
+from app.core.tracing import trace_queries
+from app.core.slow_queries import instrument_slow_queries
+from app.core.instrumentation import instrument_engine, track_queries
 from app.api.v1.schemas.users import UserRole, UserCreateV1
 from app.api.v1.services.auth_service import auth_service_v1
 from tests.fake_data import fake_student, fake_admin, fake_course, fake_instructor
@@ -48,6 +52,9 @@ async def get_async_engine():
         url=settings.ASYNC_TEST_DB_URL,
         poolclass=NullPool,  # disable database pooling for tests
     )
+    instrument_engine(async_engine.sync_engine)
+    trace_queries(async_engine.sync_engine)
+    instrument_slow_queries(async_engine)
 
     async with async_engine.connect() as conn:
         # initialise db with required extensions
@@ -103,6 +110,21 @@ async def async_client(get_async_session):
         yield asc
 
 
+@pytest.fixture
+def max_queries():
+    # with max_queries(3): fails the test when the block runs more queries
+    @contextmanager
+    def assert_max_queries(limit: int):
+        with track_queries() as metrics:
+            yield metrics
+
+        assert metrics.queries <= limit, (
+            f"{metrics.queries} queries were run, expected at most {limit}"
+        )
+
+    return assert_max_queries
+
+
 @pytest_asyncio.fixture
 async def create_role(get_async_session):
     roles: list[UserRole] = [UserRole.ADMIN, UserRole.STUDENT, UserRole.INSTRUCTOR]
@@ -241,3 +241,41 @@ async def test_user_not_found_admin(async_client, create_admin):
     print(res.json())
 
     assert res.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_role_change_invalidates_tokens(async_client, create_student, create_admin):
+    student_sign_in_res = await async_client.post(
+        "/api/v1/auth/sign-in/",
+        data={
+            "username": fake_student.get("email"),
+            "password": fake_student.get("password"),
+        },
+        headers={"curr_env": "test"},
+    )
+
+    admin_sign_in_res = await async_client.post(
+        "/api/v1/auth/sign-in/",
+        data={
+            "username": fake_admin.get("email"),
+            "password": fake_admin.get("password"),
+        },
+        headers={"curr_env": "test"},
+    )
+
+    student_id: UUID = create_student.json()["data"]["id"]
+    student_token: str = student_sign_in_res.json()["access_token"]
+    admin_token: str = admin_sign_in_res.json()["access_token"]
+
+    await async_client.patch(
+        f"/api/v1/admin/users/{student_id}/assign-instructor-role/",
+        headers={"Authorization": f"Bearer {admin_token}", "curr_env": "test"},
+    )
+
+    # the token still claims the student role issued before the change
+    res = await async_client.get(
+        "/api/v1/users/me/",
+        headers={"Authorization": f"Bearer {student_token}", "curr_env": "test"},
+    )
+
+    assert res.status_code == 401
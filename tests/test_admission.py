@@ -0,0 +1,101 @@
+import asyncio
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+
+
+from app.core.admission import AdmissionController, AdmissionMiddleware, RouteClass
+
+
+def create_controller(**kwargs) -> AdmissionController:
+    config: dict = {
+        "max_in_flight": 10,
+        "max_pool_waiters": 2,
+        "retry_after": 3,
+        "reserved_slots": {"auth": 2, "health": 1},
+        "class_limits": {"admin": 2},
+    }
+    config.update(kwargs)
+    return AdmissionController(**config)
+
+
+def create_load_app(controller: AdmissionController, delay: float) -> FastAPI:
+    load_app = FastAPI()
+    load_app.add_middleware(AdmissionMiddleware, controller=controller)
+    active: dict = {"current": 0, "peak": 0}
+
+    async def slow_handler():
+        active["current"] += 1
+        active["peak"] = max(active["peak"], active["current"])
+        await asyncio.sleep(delay)
+        active["current"] -= 1
+        return {"message": "OK"}
+
+    load_app.add_api_route("/api/v1/courses/", slow_handler)
+    load_app.add_api_route("/api/v1/auth/sign-in/", slow_handler)
+    load_app.add_api_route("/api/v1/health/", slow_handler)
+    load_app.state.active = active
+    return load_app
+
+
+def test_classify_routes():
+    controller: AdmissionController = create_controller()
+
+    assert controller.classify("/api/v1/auth/sign-in/") == RouteClass.AUTH
+    assert controller.classify("/api/v1/health/") == RouteClass.HEALTH
+    assert controller.classify("/api/v1/admin/students/") == RouteClass.ADMIN
+    assert controller.classify("/api/v1/courses/") == RouteClass.DEFAULT
+
+
+def test_reserved_slots_survive_saturation():
+    controller: AdmissionController = create_controller()
+
+    # shared slots are max_in_flight minus the reserved slots
+    for _ in range(controller.shared_slots):
+        assert controller.try_acquire(RouteClass.DEFAULT)
+
+    assert not controller.try_acquire(RouteClass.DEFAULT)
+    assert controller.try_acquire(RouteClass.AUTH)
+    assert controller.try_acquire(RouteClass.AUTH)
+    assert not controller.try_acquire(RouteClass.AUTH)
+    assert controller.try_acquire(RouteClass.HEALTH)
+
+
+def test_class_limit_and_pool_waiters():
+    controller: AdmissionController = create_controller()
+
+    assert controller.try_acquire(RouteClass.ADMIN)
+    assert controller.try_acquire(RouteClass.ADMIN)
+    assert not controller.try_acquire(RouteClass.ADMIN)
+
+    controller.pool_waiters = 2
+    assert not controller.try_acquire(RouteClass.DEFAULT)
+    assert controller.try_acquire(RouteClass.AUTH)
+    assert controller.snapshot()["rejected"]["default"] == 1
+
+
+@pytest.mark.asyncio
+async def test_load_shedding_under_burst():
+    controller: AdmissionController = create_controller()
+    load_app: FastAPI = create_load_app(controller, delay=0.2)
+
+    async with AsyncClient(
+        transport=ASGITransport(app=load_app), base_url="http://localhost"
+    ) as client:
+        course_requests = [client.get("/api/v1/courses/") for _ in range(40)]
+        auth_requests = [client.get("/api/v1/auth/sign-in/") for _ in range(2)]
+        health_requests = [client.get("/api/v1/health/")]
+
+        responses = await asyncio.gather(
+            *course_requests, *auth_requests, *health_requests
+        )
+
+    course_res = responses[:40]
+    reserved_res = responses[40:]
+    shed = [res for res in course_res if res.status_code == 503]
+
+    assert len(shed) == 40 - controller.shared_slots
+    assert all(res.headers["Retry-After"] == "3" for res in shed)
+    assert all(res.status_code == 200 for res in reserved_res)
+    assert load_app.state.active["peak"] <= controller.max_in_flight
+    assert controller.snapshot()["in_flight"] == {rc.value: 0 for rc in RouteClass}
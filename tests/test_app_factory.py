@@ -0,0 +1,66 @@
+import os
+import sys
+import pytest
+import subprocess
+from fastapi import FastAPI
+
+
+from app.core.token_cache import token_cache
+from app.core.exceptions import error_reporter
+from app.core.config import Settings, settings
+from app.core.admission import admission_controller
+from app.main import create_app, reload_singletons
+
+
+@pytest.fixture
+def restore_settings():
+    original: Settings = settings.load()
+    yield
+    settings.configure(original)
+    reload_singletons()
+
+
+def test_import_has_no_side_effects():
+    # the required settings are missing, importing must not read them
+    env: dict[str, str] = {
+        key: value for key, value in os.environ.items() if key == "PATH"
+    }
+    code: str = (
+        "import sys, app.main\n"
+        "from app.core.config import settings\n"
+        "assert not settings.configured\n"
+        "loaded = {'sentry_sdk', 'sqlalchemy', 'app.database.session',"
+        " 'app.api.v1.routers.auth'} & set(sys.modules)\n"
+        "assert not loaded, loaded\n"
+    )
+
+    result = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True
+    )
+
+    assert result.returncode == 0, result.stderr
+
+
+def test_create_app_with_settings(restore_settings):
+    custom: Settings = Settings(API_NAME="Custom API")
+
+    app: FastAPI = create_app(custom)
+
+    assert app.title == "Custom API"
+    assert settings.API_NAME == "Custom API"
+    assert any(route.path == "/api/v1/courses/" for route in app.routes)
+
+
+def test_create_app_reconfigures_singletons(restore_settings):
+    create_app(
+        Settings(
+            TOKEN_CACHE_SIZE=7,
+            ERROR_REPORTS_PER_WINDOW=1,
+            ADMISSION_MAX_IN_FLIGHT=3,
+        )
+    )
+
+    # the instances other modules imported see the new settings
+    assert token_cache.max_size == 7
+    assert error_reporter.max_reports == 1
+    assert admission_controller.max_in_flight == 3
@@ -1,5 +1,14 @@
+import asyncio
 import pytest
-
+from uuid import uuid4
+from sqlalchemy import Row, delete
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.models.users import User, Role
+from app.models.auth import RefreshToken
+from app.api.v1.schemas.users import UserRole
+from app.api.v1.repositories.auth_repo import auth_repo_v1
 from tests.fake_data import fake_student
 
 
@@ -70,6 +79,144 @@ async def test_get_access_token(async_client, create_student):
     assert "access_token" in json_res
 
 
+@pytest.mark.asyncio
+async def test_reused_refresh_token(async_client, create_student):
+    email: str = fake_student.get("email")
+    password: str = fake_student.get("password")
+
+    await async_client.post(
+        "/api/v1/auth/sign-in/",
+        data={"username": email, "password": password},
+        headers={"curr_env": "test"},
+    )
+
+    refresh_token: str = async_client.cookies.get("refresh_token")
+    res = await async_client.get(
+        "/api/v1/auth/refresh/", headers={"curr_env": "test"}
+    )
+    rotated_token: str = async_client.cookies.get("refresh_token")
+
+    assert res.status_code == 200
+
+    # the rotated token was marked used by the first refresh
+    async_client.cookies.set("refresh_token", refresh_token)
+    res = await async_client.get(
+        "/api/v1/auth/refresh/", headers={"curr_env": "test"}
+    )
+
+    assert res.status_code == 401
+
+    # reusing it revoked the whole family, including its replacement
+    async_client.cookies.set("refresh_token", rotated_token)
+    res = await async_client.get(
+        "/api/v1/auth/refresh/", headers={"curr_env": "test"}
+    )
+
+    assert res.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_logout_all_devices(async_client, create_student):
+    email: str = fake_student.get("email")
+    password: str = fake_student.get("password")
+
+    await async_client.post(
+        "/api/v1/auth/sign-in/",
+        data={"username": email, "password": password},
+        headers={"curr_env": "test"},
+    )
+    other_device_token: str = async_client.cookies.get("refresh_token")
+
+    sign_in_res = await async_client.post(
+        "/api/v1/auth/sign-in/",
+        data={"username": email, "password": password},
+        headers={"curr_env": "test"},
+    )
+    access_token: str = sign_in_res.json()["access_token"]
+
+    res = await async_client.patch(
+        "/api/v1/auth/logout-all/",
+        headers={"Authorization": f"Bearer {access_token}", "curr_env": "test"},
+    )
+
+    assert res.status_code == 200
+
+    async_client.cookies.set("refresh_token", other_device_token)
+    res = await async_client.get(
+        "/api/v1/auth/refresh/", headers={"curr_env": "test"}
+    )
+
+    assert res.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_concurrent_refresh_token_rotation(get_async_engine):
+    # rotations have to run on separate connections to contend for the row lock
+    session_maker = async_sessionmaker(get_async_engine, expire_on_commit=False)
+    expires_at: datetime = (datetime.now(timezone.utc) + timedelta(days=1)).replace(
+        microsecond=0
+    )
+
+    async with session_maker() as db:
+        role: Role = Role(id=uuid4(), name=UserRole.STUDENT)
+        user: User = User(
+            id=uuid4(),
+            name="rotation user",
+            email="rotation@example.com",
+            nationality="fakenationality",
+            hashed_password="hashed",
+            role_id=role.id,
+        )
+        token_id = uuid4()
+        token: RefreshToken = RefreshToken(
+            id=token_id,
+            token=b"old",
+            user_id=user.id,
+            family_id=token_id,
+            expires_at=expires_at,
+        )
+
+        db.add(role)
+        await db.flush()
+        db.add(user)
+        await db.flush()
+        db.add(token)
+        await db.commit()
+
+    def new_token(name: str) -> RefreshToken:
+        return RefreshToken(
+            id=uuid4(), token=name.encode(), user_id=user.id, expires_at=expires_at
+        )
+
+    try:
+        async with session_maker() as first_db, session_maker() as second_db:
+            first: Row | None = await auth_repo_v1.rotate_refresh_token(
+                token.id, expires_at, new_token("first"), first_db
+            )
+
+            second = asyncio.create_task(
+                auth_repo_v1.rotate_refresh_token(
+                    token.id, expires_at, new_token("second"), second_db
+                )
+            )
+            # the second rotation waits on the row lock held by the first one
+            await asyncio.sleep(0.2)
+            assert not second.done()
+
+            await first_db.commit()
+            second_claims: Row | None = await second
+            await second_db.commit()
+
+        assert first is not None
+        assert first.token_version == 0
+        assert second_claims is None
+    finally:
+        async with session_maker() as db:
+            await db.execute(delete(User).where(User.id == user.id))
+            await db.execute(delete(Role).where(Role.id == role.id))
+            await db.commit()
+
+
 @pytest.mark.asyncio
 async def test_update_password(async_client, create_student):
     email: str = fake_student.get("email")
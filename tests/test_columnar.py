@@ -0,0 +1,122 @@
+import pytest
+from uuid import UUID
+
+
+from app.core.columnar import COLUMNAR_JSON, COLUMNAR_MSGPACK, choose_format
+from tests.fake_data import fake_student, fake_admin, fake_course
+
+
+HEADERS: dict[str, str] = {"curr_env": "test"}
+
+
+async def sign_in(async_client, user: dict) -> dict[str, str]:
+    res = await async_client.post(
+        "/api/v1/auth/sign-in/",
+        data={"username": user.get("email"), "password": user.get("password")},
+        headers=HEADERS,
+    )
+    return {"Authorization": f"Bearer {res.json()['access_token']}", **HEADERS}
+
+
+def test_choose_format():
+    assert choose_format(COLUMNAR_JSON) == COLUMNAR_JSON
+    assert choose_format(f"application/json;q=0.5, {COLUMNAR_JSON}") == COLUMNAR_JSON
+    # the default json response is kept when the client prefers it
+    assert choose_format(f"application/json, {COLUMNAR_JSON};q=0.5") is None
+    assert choose_format(f"{COLUMNAR_JSON};q=0") is None
+    assert choose_format("*/*") is None
+    assert choose_format("") is None
+
+
+@pytest.mark.asyncio
+async def test_columnar_users(async_client, create_admin, create_student):
+    admin_headers: dict[str, str] = await sign_in(async_client, fake_admin)
+
+    res = await async_client.get(
+        "/api/v1/admin/students/",
+        headers={"Accept": COLUMNAR_JSON, **admin_headers},
+    )
+
+    json_res = res.json()
+
+    assert res.status_code == 200
+    assert res.headers["Content-Type"] == COLUMNAR_JSON
+    assert json_res["columns"] == [
+        "id",
+        "name",
+        "email",
+        "nationality",
+        "is_active",
+        "created_at",
+        "role",
+    ]
+    assert len(json_res["rows"]) == 1
+    assert json_res["rows"][0][1:5] == [
+        fake_student.get("name"),
+        fake_student.get("email"),
+        fake_student.get("nationality"),
+        True,
+    ]
+    assert json_res["rows"][0][6] == "student"
+    assert json_res["rows"][0][5].endswith("Z")
+
+    res = await async_client.get(
+        "/api/v1/admin/students/",
+        params={"fields": "role,name"},
+        headers={"Accept": COLUMNAR_JSON, **admin_headers},
+    )
+
+    assert res.json() == {
+        "columns": ["name", "role"],
+        "rows": [[fake_student.get("name"), "student"]],
+    }
+
+
+@pytest.mark.asyncio
+async def test_columnar_not_found(async_client, create_admin):
+    admin_headers: dict[str, str] = await sign_in(async_client, fake_admin)
+
+    res = await async_client.get(
+        "/api/v1/admin/instructors/",
+        headers={"Accept": COLUMNAR_JSON, **admin_headers},
+    )
+
+    assert res.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_msgpack_enrollments(async_client, create_student, create_course):
+    msgpack = pytest.importorskip("msgpack")
+
+    course, _ = create_course
+    course_id: UUID = course.json()["data"]["id"]
+
+    student_headers: dict[str, str] = await sign_in(async_client, fake_student)
+    admin_headers: dict[str, str] = await sign_in(async_client, fake_admin)
+
+    await async_client.post(
+        f"/api/v1/courses/{course_id}/enrollments/", headers=student_headers
+    )
+
+    res = await async_client.get(
+        f"/api/v1/admin/courses/{course_id}/enrollments/",
+        headers={"Accept": COLUMNAR_MSGPACK, **admin_headers},
+    )
+
+    body: dict = msgpack.unpackb(res.content)
+
+    assert res.status_code == 200
+    assert res.headers["Content-Type"] == COLUMNAR_MSGPACK
+    assert body["columns"] == [
+        "course_title",
+        "course_code",
+        "course_duration",
+        "created_at",
+    ]
+    assert body["rows"][0][:3] == [
+        fake_course.get("title"),
+        fake_course.get("code"),
+        fake_course.get("duration"),
+    ]
+    # the same form as the columnar json and default responses
+    assert body["rows"][0][3].endswith("Z")
@@ -0,0 +1,107 @@
+import gzip
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from httpx import AsyncClient, ASGITransport
+
+
+from app.core.compression import (
+    CompressionMiddleware,
+    choose_encoding,
+    compressed_body_cache,
+)
+
+
+ROWS: list[dict] = [
+    {"id": i, "title": f"course {i}", "description": "an introduction " * 5}
+    for i in range(50)
+]
+
+
+def create_compressed_app() -> FastAPI:
+    compressed_app = FastAPI()
+    compressed_app.add_middleware(CompressionMiddleware)
+
+    async def courses():
+        return ROWS
+
+    async def health():
+        return {"message": "OK"}
+
+    async def export():
+        async def rows():
+            for row in ROWS:
+                yield f"{row['id']},{row['title']}\n"
+
+        return StreamingResponse(rows(), media_type="text/csv")
+
+    compressed_app.add_api_route("/courses/", courses)
+    compressed_app.add_api_route("/health/", health)
+    compressed_app.add_api_route("/export/", export)
+    return compressed_app
+
+
+@pytest_asyncio.fixture
+async def compressed_client():
+    compressed_body_cache.clear()
+    async with AsyncClient(
+        transport=ASGITransport(app=create_compressed_app()),
+        base_url="http://localhost",
+    ) as client:
+        yield client
+    compressed_body_cache.clear()
+
+
+def test_choose_encoding():
+    assert choose_encoding("gzip, deflate") == "gzip"
+    assert choose_encoding("gzip;q=0.5, identity") == "gzip"
+    assert choose_encoding("gzip;q=0") is None
+    assert choose_encoding("identity") is None
+    assert choose_encoding("") is None
+    assert choose_encoding("*") is not None
+
+
+@pytest.mark.asyncio
+async def test_large_body_compressed_once(compressed_client):
+    for _ in range(3):
+        res = await compressed_client.get(
+            "/courses/", headers={"Accept-Encoding": "gzip"}
+        )
+
+        assert res.headers["Content-Encoding"] == "gzip"
+        assert res.headers["Vary"] == "Accept-Encoding"
+        assert int(res.headers["Content-Length"]) < len(res.content)
+        # httpx decodes the body
+        assert res.json() == ROWS
+
+    assert (compressed_body_cache.misses, compressed_body_cache.hits) == (1, 2)
+
+
+@pytest.mark.asyncio
+async def test_small_body_and_identity_not_compressed(compressed_client):
+    res = await compressed_client.get("/health/", headers={"Accept-Encoding": "gzip"})
+
+    assert "Content-Encoding" not in res.headers
+    assert res.headers["Vary"] == "Accept-Encoding"
+
+    res = await compressed_client.get(
+        "/courses/", headers={"Accept-Encoding": "identity"}
+    )
+
+    assert "Content-Encoding" not in res.headers
+    assert res.json() == ROWS
+
+
+@pytest.mark.asyncio
+async def test_streamed_body_compressed(compressed_client):
+    async with compressed_client.stream(
+        "GET", "/export/", headers={"Accept-Encoding": "gzip"}
+    ) as res:
+        raw: bytes = b"".join([chunk async for chunk in res.aiter_raw()])
+
+    assert res.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in res.headers
+    assert gzip.decompress(raw).decode() == "".join(
+        f"{row['id']},{row['title']}\n" for row in ROWS
+    )
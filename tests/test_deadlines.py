@@ -0,0 +1,119 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from fastapi import APIRouter, Depends, FastAPI
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+
+from app.dependencies import get_db
+from app.database.session import database
+from app.core.exception_handlers import register_exception_handlers
+from app.core.exceptions import ServerError, DeadlineExceededError
+from app.core.deadlines import (
+    Deadline,
+    deadline,
+    apply_deadline,
+    request_deadline,
+    is_deadline_error,
+)
+
+
+@pytest.mark.asyncio
+async def test_statement_timeout_cancels_query(get_async_session):
+    token = request_deadline.set(Deadline(0.2))
+    apply_deadline(get_async_session)
+
+    try:
+        with pytest.raises(DBAPIError) as exc_info:
+            await get_async_session.execute(text("SELECT pg_sleep(2)"))
+    finally:
+        request_deadline.reset(token)
+
+    # services wrap db errors in ServerError, the deadline must still be found
+    try:
+        raise ServerError() from exc_info.value
+    except ServerError as e:
+        assert is_deadline_error(e)
+
+
+@pytest.mark.asyncio
+async def test_expired_deadline_skips_query(get_async_session):
+    token = request_deadline.set(Deadline(0))
+    apply_deadline(get_async_session)
+
+    try:
+        with pytest.raises(DeadlineExceededError):
+            await get_async_session.execute(text("SELECT 1"))
+    finally:
+        request_deadline.reset(token)
+
+
+@pytest.mark.asyncio
+async def test_route_deadline_applied(get_async_session):
+    token = request_deadline.set(Deadline(5.0))
+    apply_deadline(get_async_session)
+
+    try:
+        res = await get_async_session.execute(text("SHOW statement_timeout"))
+        timeout: str = res.scalar()
+    finally:
+        request_deadline.reset(token)
+
+    # the remaining budget is always slightly below the declared 5 seconds
+    assert timeout.endswith("ms")
+    assert 0 < int(timeout.removesuffix("ms")) < 5000
+
+
+def create_deadline_app() -> FastAPI:
+    deadline_app = FastAPI()
+    register_exception_handlers(deadline_app)
+    router = APIRouter()
+
+    @router.get("/slow/", dependencies=[Depends(deadline(0.2))])
+    async def slow(db: AsyncSession = Depends(get_db)):
+        try:
+            await db.execute(text("SELECT pg_sleep(2)"))
+        except Exception as e:
+            # services wrap db errors in ServerError
+            raise ServerError() from e
+
+    @router.get("/expired/", dependencies=[Depends(deadline(0))])
+    async def expired(db: AsyncSession = Depends(get_db)):
+        await db.execute(text("SELECT 1"))
+
+    deadline_app.include_router(router)
+    return deadline_app
+
+
+@pytest_asyncio.fixture
+async def deadline_client(get_async_engine, monkeypatch):
+    # the real get_db, with sessions bound to the test database
+    monkeypatch.setattr(
+        database,
+        "_async_session",
+        async_sessionmaker(bind=get_async_engine, class_=AsyncSession),
+    )
+
+    async with AsyncClient(
+        transport=ASGITransport(app=create_deadline_app()),
+        base_url="http://localhost",
+    ) as client:
+        yield client
+
+
+@pytest.mark.asyncio
+async def test_route_query_canceled_returns_504(deadline_client):
+    res = await deadline_client.get("/slow/")
+
+    # statement_timeout cancels the query (57014) and get_db maps it to 504
+    assert res.status_code == 504
+
+
+@pytest.mark.asyncio
+async def test_route_deadline_checked_before_connection(deadline_client):
+    # deadline() runs before get_db, which fails before running a query
+    res = await deadline_client.get("/expired/")
+
+    assert res.status_code == 504
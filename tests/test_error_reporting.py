@@ -0,0 +1,75 @@
+import pytest
+
+
+from app.core import exceptions
+from app.core.exceptions import (
+    ServerError,
+    ErrorReporter,
+    error_reporter,
+    CourseNotFoundError,
+    ServiceUnavailableError,
+)
+
+
+@pytest.fixture
+def captured(monkeypatch) -> list[BaseException]:
+    captured: list[BaseException] = []
+    monkeypatch.setattr(exceptions.sentry_sdk, "capture_exception", captured.append)
+    return captured
+
+
+def test_fault_reports_are_rate_limited(captured):
+    reporter: ErrorReporter = ErrorReporter(max_reports=2, window=60.0)
+
+    for _ in range(5):
+        reporter.capture(ValueError("db down"))
+
+    assert len(captured) == 2
+    assert reporter.stats()["suppressed"] == {"ValueError": 3}
+
+
+def test_expected_errors_are_only_counted(captured):
+    reporter: ErrorReporter = ErrorReporter(max_reports=2, window=60.0)
+
+    reporter.handle(CourseNotFoundError())
+    reporter.handle(ServerError())
+
+    assert reporter.stats()["handled"] == {"CourseNotFoundError": 1, "ServerError": 1}
+    # only the fault raised without a cause is reported by the handler
+    assert [type(exc) for exc in captured] == [ServerError]
+
+
+def test_chained_faults(captured):
+    reporter: ErrorReporter = ErrorReporter(max_reports=2, window=60.0)
+
+    # raised from an error nobody captured, like pool exhaustion in get_db
+    try:
+        raise ServiceUnavailableError() from TimeoutError("pool exhausted")
+    except ServiceUnavailableError as e:
+        reporter.handle(e)
+
+    # raised from an error the service captured before raising
+    try:
+        try:
+            raise ValueError("db down")
+        except ValueError as e:
+            reporter.capture(e)
+            raise ServerError() from e
+    except ServerError as e:
+        reporter.handle(e)
+
+    assert [type(exc) for exc in captured] == [ServiceUnavailableError, ValueError]
+
+
+@pytest.mark.asyncio
+async def test_invalid_token_not_reported(async_client, captured):
+    rejected: int = error_reporter.handled["AuthenticationError"]
+
+    res = await async_client.get(
+        "/api/v1/courses/",
+        headers={"Authorization": "Bearer not-a-token", "curr_env": "test"},
+    )
+
+    assert res.status_code == 401
+    assert error_reporter.handled["AuthenticationError"] == rejected + 1
+    assert captured == []
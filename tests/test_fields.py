@@ -0,0 +1,122 @@
+import pytest
+from uuid import UUID
+
+
+from app.core.fieldsets import parse_fields
+from app.core.exceptions import InvalidFieldsError
+from app.api.v1.schemas.courses import CoursePartialV1
+from tests.fake_data import fake_student, fake_admin, fake_course
+
+
+HEADERS: dict[str, str] = {"curr_env": "test"}
+
+
+async def sign_in(async_client, user: dict) -> dict[str, str]:
+    res = await async_client.post(
+        "/api/v1/auth/sign-in/",
+        data={"username": user.get("email"), "password": user.get("password")},
+        headers=HEADERS,
+    )
+    return {"Authorization": f"Bearer {res.json()['access_token']}", **HEADERS}
+
+
+def test_parse_fields():
+    assert parse_fields(None, CoursePartialV1) is None
+    assert parse_fields(" , ", CoursePartialV1) is None
+    # kept in the order of the schema
+    assert parse_fields("code, title,id", CoursePartialV1) == ["id", "title", "code"]
+
+    with pytest.raises(InvalidFieldsError):
+        parse_fields("title,hashed_password", CoursePartialV1)
+
+
+@pytest.mark.asyncio
+async def test_course_fields(async_client, create_student, create_course, max_queries):
+    student_headers: dict[str, str] = await sign_in(async_client, fake_student)
+
+    with max_queries(4) as full:
+        await async_client.get("/api/v1/courses/", headers=student_headers)
+
+    with max_queries(4) as trimmed:
+        res = await async_client.get(
+            "/api/v1/courses/",
+            params={"fields": "id,title,code"},
+            headers=student_headers,
+        )
+
+    assert res.status_code == 200
+    assert res.json()["data"] == [
+        {
+            "id": res.json()["data"][0]["id"],
+            "title": fake_course.get("title"),
+            "code": fake_course.get("code"),
+        }
+    ]
+    # the instructor, its role and its courses are not loaded
+    assert trimmed.queries == full.queries - 2
+
+    with max_queries(4) as with_instructor:
+        res = await async_client.get(
+            "/api/v1/courses/",
+            params={"fields": "code,instructor"},
+            headers=student_headers,
+        )
+
+    # only the instructor name is loaded
+    assert with_instructor.queries == trimmed.queries + 1
+
+    assert res.json()["data"] == [
+        {"code": fake_course.get("code"), "instructor": fake_course.get("instructor")}
+    ]
+
+
+@pytest.mark.asyncio
+async def test_invalid_fields(async_client, create_student):
+    student_headers: dict[str, str] = await sign_in(async_client, fake_student)
+
+    res = await async_client.get(
+        "/api/v1/courses/", params={"fields": "title,secret"}, headers=student_headers
+    )
+
+    assert res.status_code == 400
+    assert res.json()["error"] == "Invalid fields"
+
+
+@pytest.mark.asyncio
+async def test_user_and_enrollment_fields(
+    async_client, create_admin, create_student, create_course
+):
+    course, _ = create_course
+    course_id: UUID = course.json()["data"]["id"]
+
+    student_headers: dict[str, str] = await sign_in(async_client, fake_student)
+    admin_headers: dict[str, str] = await sign_in(async_client, fake_admin)
+
+    await async_client.post(
+        f"/api/v1/courses/{course_id}/enrollments/", headers=student_headers
+    )
+
+    res = await async_client.get(
+        "/api/v1/admin/students/", params={"fields": "name,role"}, headers=admin_headers
+    )
+
+    assert res.status_code == 200
+    assert res.json()["data"] == [{"name": fake_student.get("name"), "role": "student"}]
+
+    res = await async_client.get(
+        "/api/v1/admin/enrollments/",
+        params={"fields": "course_code"},
+        headers=admin_headers,
+    )
+
+    assert res.status_code == 200
+    assert res.json()["data"] == [{"course_code": fake_course.get("code")}]
+
+    res = await async_client.get(
+        f"/api/v1/admin/courses/{course_id}/enrollments/",
+        params={"fields": "created_at"},
+        headers=admin_headers,
+    )
+
+    assert res.status_code == 200
+    assert list(res.json()["data"][0]) == ["created_at"]
@@ -0,0 +1,78 @@
+import pytest
+from uuid import UUID
+
+
+from app.core.config import settings
+from tests.fake_data import fake_student, fake_admin
+
+
+HEADERS: dict[str, str] = {"curr_env": "test"}
+
+
+async def sign_in(async_client, user: dict) -> dict[str, str]:
+    res = await async_client.post(
+        "/api/v1/auth/sign-in/",
+        data={"username": user.get("email"), "password": user.get("password")},
+        headers=HEADERS,
+    )
+    return {"Authorization": f"Bearer {res.json()['access_token']}", **HEADERS}
+
+
+@pytest.mark.asyncio
+async def test_route_query_counts(
+    async_client, create_student, create_course, max_queries
+):
+    course, _ = create_course
+    course_id: UUID = course.json()["data"]["id"]
+
+    with max_queries(5):
+        student_headers: dict[str, str] = await sign_in(async_client, fake_student)
+
+    with max_queries(4):
+        res = await async_client.get("/api/v1/courses/", headers=student_headers)
+    assert res.status_code == 200
+
+    with max_queries(3):
+        res = await async_client.get(
+            f"/api/v1/courses/{course_id}/", headers=student_headers
+        )
+    assert res.status_code == 200
+
+    with max_queries(13):
+        res = await async_client.post(
+            f"/api/v1/courses/{course_id}/enrollments/", headers=student_headers
+        )
+    assert res.status_code == 201
+
+    with max_queries(4):
+        res = await async_client.get("/api/v1/users/me/", headers=student_headers)
+    assert res.status_code == 200
+
+    admin_headers: dict[str, str] = await sign_in(async_client, fake_admin)
+
+    with max_queries(4):
+        res = await async_client.get("/api/v1/admin/students/", headers=admin_headers)
+    assert res.status_code == 200
+
+    with max_queries(5):
+        res = await async_client.get(
+            "/api/v1/admin/enrollments/", headers=admin_headers
+        )
+    assert res.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_server_timing_header(async_client, create_student, monkeypatch):
+    headers: dict[str, str] = await sign_in(async_client, fake_student)
+
+    res = await async_client.get("/api/v1/users/me/", headers=headers)
+    assert "server-timing" not in res.headers
+
+    monkeypatch.setattr(settings, "SERVER_TIMING_ENABLED", True)
+    res = await async_client.get("/api/v1/users/me/", headers=headers)
+
+    metrics: list[str] = [
+        metric.split(";")[0] for metric in res.headers["server-timing"].split(", ")
+    ]
+    assert res.status_code == 200
+    assert {"db", "auth", "serialize", "total"} <= set(metrics)
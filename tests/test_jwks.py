@@ -0,0 +1,69 @@
+import ecdsa
+import pytest
+from uuid import uuid4
+
+
+from app.core import security
+from app.core.jwks import KeyRing
+from app.api.v1.schemas.users import UserRole
+from app.api.v1.schemas.auth import TokenDataV1
+
+
+def generate_pem() -> str:
+    return ecdsa.SigningKey.generate(curve=ecdsa.NIST256p).to_pem().decode()
+
+
+@pytest.fixture
+def es256_key_ring(monkeypatch):
+    old_pem: str = generate_pem()
+    old_ring: KeyRing = KeyRing({"old": old_pem}, "old", "ES256")
+
+    # the retired key is kept as a public key so its tokens still verify
+    old_public_pem: str = (
+        ecdsa.SigningKey.from_pem(old_pem).get_verifying_key().to_pem().decode()
+    )
+    key_ring: KeyRing = KeyRing(
+        {"old": old_public_pem, "new": generate_pem()}, "new", "ES256"
+    )
+
+    monkeypatch.setattr(security, "key_ring", key_ring)
+    return old_ring, key_ring
+
+
+@pytest.mark.asyncio
+async def test_asymmetric_access_token(es256_key_ring):
+    old_ring, key_ring = es256_key_ring
+    user_id = uuid4()
+
+    token: str = await security.create_access_token(
+        TokenDataV1(id=user_id, role=UserRole.STUDENT)
+    )
+    payload: dict = await security.decode_access_token(token)
+
+    assert payload["sub"] == str(user_id)
+    assert payload["role"] == UserRole.STUDENT.value
+
+    old_token: str = old_ring.sign({"sub": str(user_id), "exp": payload["exp"]})
+    assert (await security.decode_access_token(old_token))["sub"] == str(user_id)
+
+
+@pytest.mark.asyncio
+async def test_unknown_key_rejected(es256_key_ring):
+    other_ring: KeyRing = KeyRing({"other": generate_pem()}, "other", "ES256")
+    token: str = other_ring.sign({"sub": str(uuid4())})
+
+    assert await security.decode_access_token(token) is None
+
+
+@pytest.mark.asyncio
+async def test_jwks_endpoint(async_client, es256_key_ring, monkeypatch):
+    _, key_ring = es256_key_ring
+    monkeypatch.setattr("app.core.jwks.key_ring", key_ring)
+
+    res = await async_client.get("/.well-known/jwks.json")
+    keys: list[dict] = res.json()["keys"]
+
+    assert res.status_code == 200
+    assert {key["kid"] for key in keys} == {"old", "new"}
+    # only the public part of the keys is published
+    assert all("d" not in key for key in keys)
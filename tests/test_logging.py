@@ -0,0 +1,130 @@
+import json
+import pytest
+import logging
+
+
+from app.core.config import settings
+from tests.fake_data import fake_student
+from app.core.logger import log_pipeline
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.lines: list[str] = []
+
+    def emit(self, record: logging.LogRecord):
+        self.lines.append(self.format(record))
+
+
+@pytest.fixture
+def captured_logs():
+    handler: ListHandler = ListHandler()
+    log_pipeline.start(handlers=[handler])
+    yield handler
+    log_pipeline.stop()
+
+
+def read_records(handler: ListHandler) -> list[dict]:
+    # stopping the listener drains the queue
+    log_pipeline.stop()
+    return [json.loads(line) for line in handler.lines]
+
+
+@pytest.mark.asyncio
+async def test_access_record(async_client, create_student, captured_logs):
+    res = await async_client.post(
+        "/api/v1/auth/sign-in/",
+        data={"username": fake_student["email"], "password": fake_student["password"]},
+        headers={"curr_env": "test"},
+    )
+    token: str = res.json()["access_token"]
+
+    res = await async_client.get(
+        "/api/v1/users/me/",
+        headers={
+            "Authorization": f"Bearer {token}",
+            "curr_env": "test",
+            "X-Request-ID": "req-123",
+        },
+    )
+
+    assert res.headers["X-Request-ID"] == "req-123"
+
+    records: list[dict] = read_records(captured_logs)
+    access: dict = next(r for r in records if r["request_id"] == "req-123")
+
+    assert access["logger"] == "app.access"
+    assert access["route"] == "/api/v1/users/me/"
+    assert access["user_id"] == res.json()["data"]["id"]
+    assert access["status"] == 200
+    assert access["duration_ms"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_request_id_generated(async_client, captured_logs):
+    res = await async_client.get("/api/v1/courses/", headers={"curr_env": "test"})
+
+    request_id: str = res.headers["X-Request-ID"]
+    records: list[dict] = read_records(captured_logs)
+
+    assert [r["request_id"] for r in records] == [request_id]
+    assert records[0]["user_id"] is None
+
+
+@pytest.mark.asyncio
+async def test_disabled_route(async_client, captured_logs):
+    res = await async_client.get("/api/v1/health/", headers={"curr_env": "test"})
+
+    assert res.status_code == 200
+    assert "X-Request-ID" in res.headers
+    assert read_records(captured_logs) == []
+
+
+@pytest.mark.asyncio
+async def test_sampled_level(async_client, monkeypatch):
+    monkeypatch.setattr(settings, "LOG_SAMPLE_RATES", {"info": 0.0})
+    handler: ListHandler = ListHandler()
+    log_pipeline.start(handlers=[handler])
+
+    try:
+        await async_client.get("/api/v1/courses/", headers={"curr_env": "test"})
+        logging.getLogger("app").warning("kept")
+    finally:
+        log_pipeline.stop()
+
+    assert [json.loads(line)["message"] for line in handler.lines] == ["kept"]
+
+
+@pytest.mark.asyncio
+async def test_service_records(async_client, create_student, captured_logs):
+    await async_client.post(
+        "/api/v1/auth/sign-in/",
+        data={"username": fake_student["email"], "password": fake_student["password"]},
+        headers={"curr_env": "test", "X-Request-ID": "req-456"},
+    )
+
+    records: list[dict] = read_records(captured_logs)
+    service: dict = next(
+        r for r in records if r["logger"] == "app.api.v1.services.auth_service"
+    )
+
+    assert service["message"].endswith("signed in")
+    assert service["request_id"] == "req-456"
+    assert service["route"] == "/api/v1/auth/sign-in/"
+
+
+@pytest.mark.asyncio
+async def test_service_records_disabled_route(
+    async_client, create_student, captured_logs, monkeypatch
+):
+    monkeypatch.setattr(settings, "LOG_DISABLED_ROUTES", ["/api/v1/auth/sign-in/"])
+
+    res = await async_client.post(
+        "/api/v1/auth/sign-in/",
+        data={"username": fake_student["email"], "password": fake_student["password"]},
+        headers={"curr_env": "test"},
+    )
+
+    assert res.status_code == 201
+    assert read_records(captured_logs) == []
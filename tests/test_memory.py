@@ -0,0 +1,112 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, update
+
+
+from app.models.users import User
+from tests.fake_data import fake_admin
+from app.core.memory import identity_map_stats, memory_tracker, track_session
+
+
+@pytest_asyncio.fixture
+async def admin_headers(async_client, create_admin) -> dict[str, str]:
+    res = await async_client.post(
+        "/api/v1/auth/sign-in/",
+        data={"username": fake_admin["email"], "password": fake_admin["password"]},
+        headers={"curr_env": "test"},
+    )
+    yield {"Authorization": f"Bearer {res.json()['access_token']}", "curr_env": "test"}
+
+    if memory_tracker.tracing:
+        memory_tracker.stop()
+
+
+@pytest.mark.asyncio
+async def test_memory_tracing(async_client, admin_headers):
+    res = await async_client.get(
+        "/api/v1/admin/diagnostics/memory/diff/", headers=admin_headers
+    )
+    assert res.status_code == 409
+
+    res = await async_client.post(
+        "/api/v1/admin/diagnostics/memory/start/?frames=5", headers=admin_headers
+    )
+    assert res.json()["data"]["usage"]["tracing"] is True
+
+    # allocations kept alive between the snapshots show up in the diff
+    retained: list[bytes] = [bytes(1024) for _ in range(1000)]
+
+    res = await async_client.get(
+        "/api/v1/admin/diagnostics/memory/diff/?limit=5", headers=admin_headers
+    )
+    allocations: list[dict] = res.json()["data"]["allocations"]
+
+    assert res.status_code == 200
+    assert any("test_memory.py" in site["location"] for site in allocations)
+    assert sum(site["size_diff_kib"] for site in allocations) >= 1000
+
+    res = await async_client.get(
+        "/api/v1/admin/diagnostics/memory/top/?limit=5", headers=admin_headers
+    )
+    assert len(res.json()["data"]["allocations"]) == 5
+
+    res = await async_client.post(
+        "/api/v1/admin/diagnostics/memory/stop/", headers=admin_headers
+    )
+    assert res.status_code == 200
+    assert not memory_tracker.tracing
+    del retained
+
+
+@pytest.mark.asyncio
+async def test_memory_params_validated(async_client, admin_headers):
+    res = await async_client.post(
+        "/api/v1/admin/diagnostics/memory/start/?frames=0", headers=admin_headers
+    )
+    assert res.status_code == 422
+    assert not memory_tracker.tracing
+
+    res = await async_client.get(
+        "/api/v1/admin/diagnostics/memory/top/?limit=-1", headers=admin_headers
+    )
+    assert res.status_code == 422
+
+
+
+@pytest.mark.asyncio
+async def test_stale_admin_token(async_client, admin_headers, get_async_session):
+    # a role change bumps the version, the old token no longer reaches diagnostics
+    await get_async_session.execute(
+        update(User)
+        .where(User.email == fake_admin["email"])
+        .values(token_version=User.token_version + 1)
+    )
+
+    res = await async_client.get(
+        "/api/v1/admin/diagnostics/errors/", headers=admin_headers
+    )
+    assert res.status_code == 401
+
+@pytest.mark.asyncio
+async def test_session_stats(async_client, admin_headers, get_async_session):
+    identity_map_stats.clear()
+    # sessions are only tracked when asked for
+    await get_async_session.execute(select(User))
+    assert "loaded_objects" not in get_async_session.sync_session.info
+
+    track_session(get_async_session)
+    get_async_session.expunge_all()
+    users: list[User] = list(
+        (await get_async_session.execute(select(User))).scalars()
+    )
+
+    identity_map_stats.record("GET /api/v1/admin/students/", get_async_session)
+
+    res = await async_client.get(
+        "/api/v1/admin/diagnostics/memory/sessions/", headers=admin_headers
+    )
+    stats: dict = res.json()["data"][0]
+
+    assert stats["route"] == "GET /api/v1/admin/students/"
+    assert stats["max_objects"] >= len(users)
+    assert stats["models"]["User"] >= len(users)
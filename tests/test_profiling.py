@@ -0,0 +1,60 @@
+import pstats
+import pytest
+from pathlib import Path
+
+
+from app.core.config import settings
+from tests.fake_data import fake_admin, fake_student
+
+
+async def sign_in(async_client, user: dict) -> dict[str, str]:
+    res = await async_client.post(
+        "/api/v1/auth/sign-in/",
+        data={"username": user["email"], "password": user["password"]},
+        headers={"curr_env": "test"},
+    )
+    return {"Authorization": f"Bearer {res.json()['access_token']}", "curr_env": "test"}
+
+
+@pytest.fixture
+def profiling(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(settings, "PROFILING_INTERVAL", 0.0005)
+    monkeypatch.setattr(settings, "PROFILING_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.mark.asyncio
+async def test_admin_request_profiles(async_client, create_admin, profiling):
+    headers: dict[str, str] = await sign_in(async_client, fake_admin)
+
+    res = await async_client.get(
+        "/api/v1/admin/students/", headers={**headers, "X-Profile": "sample"}
+    )
+    folded: Path = profiling / res.headers["X-Profile-File"]
+
+    assert folded.suffix == ".folded"
+    # every line is a stack followed by its sample count
+    assert all(
+        line.rsplit(" ", 1)[1].isdigit() for line in folded.read_text().splitlines()
+    )
+
+    res = await async_client.get(
+        "/api/v1/admin/students/", headers={**headers, "X-Profile": "cprofile"}
+    )
+    stats = pstats.Stats(str(profiling / res.headers["X-Profile-File"]))
+
+    assert stats.total_calls > 0
+
+
+@pytest.mark.asyncio
+async def test_profile_header_needs_admin(async_client, create_student, profiling):
+    headers: dict[str, str] = await sign_in(async_client, fake_student)
+
+    res = await async_client.get(
+        "/api/v1/users/me/", headers={**headers, "X-Profile": "cprofile"}
+    )
+
+    assert res.status_code == 200
+    assert "X-Profile-File" not in res.headers
+    assert not list(profiling.iterdir())
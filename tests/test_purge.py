@@ -0,0 +1,69 @@
+import pytest
+from uuid import uuid4
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta, timezone
+
+
+from app.core.config import settings
+from app.models.courses import Course
+from app.models.users import User, Role
+from app.models.purge_jobs import PurgeJob
+from app.models.enrollments import Enrollment
+from app.api.v1.schemas.users import UserRole
+from app.api.v1.services.user_service import user_service_v1
+
+
+@pytest.mark.asyncio
+async def test_batched_user_purge(get_async_session, create_course, monkeypatch):
+    monkeypatch.setattr(settings, "PURGE_BATCH_SIZE", 1)
+    monkeypatch.setattr(settings, "PURGE_BATCH_SLEEP", 0)
+    monkeypatch.setattr(settings, "PURGE_DUTY_CYCLE", 1.0)
+
+    course_res, _ = create_course
+    course_id = course_res.json()["data"]["id"]
+
+    def purge_users(db: Session) -> tuple:
+        role: Role = db.execute(
+            select(Role).where(Role.name == UserRole.STUDENT)
+        ).scalar_one()
+        course: Course = db.get(Course, course_id)
+        past: datetime = datetime.now(timezone.utc) - timedelta(days=1)
+
+        for i in range(3):
+            user: User = User(
+                id=uuid4(),
+                name=f"deleted user {i}",
+                email=f"deleted{i}@example.com",
+                nationality="fakenationality",
+                hashed_password="hashed",
+                role_id=role.id,
+                is_active=False,
+                delete_at=past,
+            )
+            db.add(user)
+            db.flush()
+            db.add(Enrollment(user_id=user.id, course_id=course.id))
+
+        # the instructor still owns the course so it has to be skipped
+        db.get(User, course.instructor_id).delete_at = past
+        course.total_students = 3
+        db.flush()
+
+        deleted_rows: int = user_service_v1.delete_user_accounts(db)
+
+        db.refresh(course)
+        job: PurgeJob = db.get(PurgeJob, "delete_users")
+        instructor: User | None = db.get(User, course.instructor_id)
+        return deleted_rows, course.total_students, job, instructor
+
+    deleted_rows, total_students, job, instructor = await get_async_session.run_sync(
+        purge_users
+    )
+
+    assert deleted_rows == 3
+    assert total_students == 0
+    assert job.batches == 3
+    assert job.deleted_rows == 3
+    assert job.finished_at is not None
+    assert instructor is not None
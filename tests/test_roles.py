@@ -0,0 +1,38 @@
+import pytest
+from uuid import uuid4
+
+
+from app.core.exceptions import ServerError
+from app.api.v1.schemas.users import UserRole
+from app.api.v1.services.user_service import user_service_v1
+from app.api.v1.services.role_registry import RoleRegistryV1
+
+
+@pytest.mark.asyncio
+async def test_registry_loads_roles(get_async_session, create_role):
+    registry: RoleRegistryV1 = RoleRegistryV1()
+    await registry.load(get_async_session)
+
+    for role in UserRole:
+        role_db = await user_service_v1.get_role(role, get_async_session)
+        assert await registry.get_role_id(role, get_async_session) == role_db.id
+        assert await registry.get_role_name(role_db.id, get_async_session) == role
+
+
+@pytest.mark.asyncio
+async def test_registry_refreshes_on_miss(get_async_session, create_role):
+    # an empty registry falls back to the roles table on its first lookup
+    registry: RoleRegistryV1 = RoleRegistryV1()
+
+    role_id = await registry.get_role_id(UserRole.STUDENT, get_async_session)
+    role_db = await user_service_v1.get_role(UserRole.STUDENT, get_async_session)
+
+    assert role_id == role_db.id
+
+
+@pytest.mark.asyncio
+async def test_registry_unknown_role(get_async_session, create_role):
+    registry: RoleRegistryV1 = RoleRegistryV1()
+
+    with pytest.raises(ServerError):
+        await registry.get_role_name(uuid4(), get_async_session)
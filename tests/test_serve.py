@@ -0,0 +1,27 @@
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+from app.core.config import settings
+from app.serve import worker_pool_size
+from app.database.session import Database
+
+
+def test_worker_pool_size(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 10)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 5)
+
+    # the 2:1 split of pool and overflow is kept per worker
+    assert worker_pool_size(60, 4) == (10, 5)
+    assert worker_pool_size(30, 4) == (5, 2)
+    # every worker gets at least one connection
+    assert worker_pool_size(2, 4) == (1, 0)
+
+
+def test_engines_rebuilt_after_fork():
+    database: Database = Database()
+    engine: AsyncEngine = database.async_engine
+
+    database.after_fork()
+
+    assert database.async_engine is not engine
+    assert database.async_session.kw["bind"] is database.async_engine
@@ -0,0 +1,104 @@
+import pytest
+import asyncio
+
+
+from app.core import slow_queries
+from tests.fake_data import fake_admin
+from app.core.slow_queries import SlowQueryLog
+from app.api.v1.services import diagnostics_service
+
+
+@pytest.fixture
+def query_log(tmp_path, monkeypatch):
+    # a threshold of 0 logs every query
+    log: SlowQueryLog = SlowQueryLog(
+        threshold_ms=0,
+        path=str(tmp_path / "slow_queries.log"),
+        max_bytes=1_000_000,
+        backups=1,
+    )
+    monkeypatch.setattr(slow_queries, "slow_query_log", log)
+    monkeypatch.setattr(diagnostics_service, "slow_query_log", log)
+    yield log
+    log.stop()
+
+
+@pytest.mark.asyncio
+async def test_slow_query_log(async_client, create_admin, query_log):
+    sign_in_res = await async_client.post(
+        "/api/v1/auth/sign-in/",
+        data={"username": fake_admin["email"], "password": fake_admin["password"]},
+        headers={"curr_env": "test"},
+    )
+    headers: dict[str, str] = {
+        "Authorization": f"Bearer {sign_in_res.json()['access_token']}",
+        "curr_env": "test",
+    }
+
+    await async_client.get("/api/v1/admin/students/", headers=headers)
+    # plans are captured in the background
+    await asyncio.gather(*query_log.pending)
+
+    res = await async_client.get(
+        "/api/v1/admin/diagnostics/slow-queries/", headers=headers
+    )
+    queries: list[dict] = res.json()["data"]
+    students_query: dict = next(
+        query for query in queries if query["origin"] == "AdminRepo.get_all_students"
+    )
+
+    assert res.status_code == 200
+    assert students_query["calls"] == 1
+    assert students_query["plan"]
+    assert all(query["total_ms"] >= 0 for query in queries)
+
+
+def test_records_written_by_background_thread(tmp_path):
+    log: SlowQueryLog = SlowQueryLog(
+        threshold_ms=0,
+        path=str(tmp_path / "slow_queries.log"),
+        max_bytes=1_000_000,
+        backups=1,
+        queue_size=1,
+    )
+    # the writer thread is not running, the second record does not fit
+    log.start()
+    log.listener.stop()
+
+    for _ in range(2):
+        log.write({"type": "plan", "fingerprint": "SELECT 1", "plan": []})
+
+    assert log.handler.dropped == 1
+
+    log.listener.start()
+    log.flush()
+    log.stop()
+
+    assert log.read_records() == [
+        {"type": "plan", "fingerprint": "SELECT 1", "plan": []}
+    ]
+
+
+@pytest.mark.asyncio
+async def test_explained_statements_bounded(tmp_path, monkeypatch):
+    log: SlowQueryLog = SlowQueryLog(
+        threshold_ms=0,
+        path=str(tmp_path / "slow_queries.log"),
+        max_bytes=1_000_000,
+        backups=1,
+        max_explained=2,
+    )
+
+    async def capture_plan(*args):
+        pass
+
+    monkeypatch.setattr(log, "capture_plan", capture_plan)
+
+    # literals make every statement a new fingerprint
+    for statement in ("SELECT 1", "SELECT 2", "SELECT 1", "SELECT 3"):
+        log.record(None, statement, None, False, 1.0)
+    await asyncio.gather(*log.pending)
+    log.stop()
+
+    # SELECT 2 was the least recently seen
+    assert list(log.explained) == ["SELECT 1", "SELECT 3"]
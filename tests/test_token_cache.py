@@ -0,0 +1,55 @@
+import time
+import pytest
+from uuid import uuid4
+
+
+from app.core.config import settings
+from app.core.token_cache import TokenCache, token_cache
+from app.api.v1.schemas.users import UserRole
+from app.api.v1.schemas.auth import TokenDataV1
+from app.core.security import create_access_token, decode_token
+
+
+def test_cache_evicts_least_recently_used():
+    cache: TokenCache = TokenCache(max_size=2, negative_ttl=30)
+    exp: float = time.time() + 60
+
+    cache.set(b"a", {"exp": exp})
+    cache.set(b"b", {"exp": exp})
+    cache.get(b"a")
+    cache.set(b"c", {"exp": exp})
+
+    assert cache.get(b"a")[0]
+    assert not cache.get(b"b")[0]
+    assert cache.get(b"c")[0]
+
+
+def test_cache_entries_expire():
+    cache: TokenCache = TokenCache(max_size=10, negative_ttl=0)
+
+    cache.set(b"expired", {"exp": time.time() - 1})
+    cache.set_invalid(b"invalid")
+
+    assert cache.get(b"expired") == (False, None)
+    assert cache.get(b"invalid") == (False, None)
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_decode_token_uses_cache():
+    token_cache.clear()
+    key: str = settings.ACCESS_TOKEN_SECRET_KEY
+    token: str = await create_access_token(
+        TokenDataV1(id=uuid4(), role=UserRole.STUDENT)
+    )
+
+    payload: dict = await decode_token(token, key)
+    cached_payload: dict = await decode_token(token, key)
+
+    assert cached_payload == payload
+    assert token_cache.hits == 1
+
+    # a token verified with one key must not be accepted with another
+    assert await decode_token(token, settings.REFRESH_TOKEN_SECRET_KEY) is None
+    assert await decode_token(token, settings.REFRESH_TOKEN_SECRET_KEY) is None
+    assert token_cache.hits == 2
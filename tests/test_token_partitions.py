@@ -0,0 +1,82 @@
+import pytest
+from uuid import uuid4
+from sqlalchemy import text, select
+from datetime import datetime, timedelta, timezone
+
+
+from app.models.users import User
+from app.models.auth import RefreshToken
+from app.core.config import settings
+from tests.fake_data import fake_student
+from app.api.v1.repositories.auth_repo import auth_repo_v1
+from app.api.v1.services.auth_service import auth_service_v1
+
+
+@pytest.mark.asyncio
+async def test_manage_token_partitions(get_async_session):
+    today: datetime = datetime.now(timezone.utc).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    expired_day: datetime = today - timedelta(days=10)
+
+    def manage_partitions(db) -> list[str]:
+        auth_repo_v1.create_token_partition(
+            f"refresh_tokens_p{expired_day:%Y%m%d}",
+            expired_day,
+            expired_day + timedelta(days=1),
+            db,
+        )
+        auth_service_v1.manage_token_partitions(db)
+        return list(auth_repo_v1.get_token_partitions(db))
+
+    partitions: list[str] = await get_async_session.run_sync(manage_partitions)
+
+    days_ahead: int = (
+        settings.REFRESH_TOKEN_EXPIRE_TIME + settings.REFRESH_TOKEN_PARTITIONS_AHEAD
+    )
+    expected: set[str] = {
+        f"refresh_tokens_p{today + timedelta(days=offset):%Y%m%d}"
+        for offset in range(days_ahead + 1)
+    }
+
+    assert f"refresh_tokens_p{expired_day:%Y%m%d}" not in partitions
+    assert expected | {"refresh_tokens_default"} == set(partitions)
+
+
+@pytest.mark.asyncio
+async def test_partition_created_over_default_rows(get_async_session, create_student):
+    today: datetime = datetime.now(timezone.utc).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    missed_day: datetime = today + timedelta(days=3)
+    name: str = f"refresh_tokens_p{missed_day:%Y%m%d}"
+
+    def manage_partitions(db) -> tuple[int, int, list[str]]:
+        # the task was down, the token of that day landed in the default
+        auth_repo_v1.drop_token_partition(name, db)
+        user_id = db.execute(
+            select(User.id).where(User.email == fake_student.get("email"))
+        ).scalar()
+        db.add(
+            RefreshToken(
+                id=uuid4(),
+                token=b"t" * 32,
+                user_id=user_id,
+                family_id=uuid4(),
+                expires_at=missed_day + timedelta(hours=12),
+            )
+        )
+        db.flush()
+
+        auth_service_v1.manage_token_partitions(db)
+
+        moved: int = db.execute(text(f"SELECT count(*) FROM {name}")).scalar()
+        left: int = db.execute(
+            text("SELECT count(*) FROM refresh_tokens_default")
+        ).scalar()
+        return moved, left, list(auth_repo_v1.get_token_partitions(db))
+
+    moved, left, partitions = await get_async_session.run_sync(manage_partitions)
+
+    assert (moved, left) == (1, 0)
+    assert {name, "refresh_tokens_default"} <= set(partitions)
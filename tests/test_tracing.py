@@ -0,0 +1,149 @@
+import json
+import pytest
+import logging
+from types import SimpleNamespace
+
+
+from app.core.config import settings
+from tests.fake_data import fake_student
+from app.core.tracing import (
+    TRACEPARENT,
+    CONSUMER,
+    SERVER,
+    current_span,
+    end_task_span,
+    inject_traceparent,
+    span_exporter,
+    start_root,
+    start_task_span,
+)
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.lines: list[str] = []
+
+    def emit(self, record: logging.LogRecord):
+        self.lines.append(self.format(record))
+
+
+@pytest.fixture
+def exported(monkeypatch):
+    monkeypatch.setattr(settings, "TRACING_ENABLED", True)
+    handler: ListHandler = ListHandler()
+    span_exporter.start(handlers=[handler])
+    yield handler
+    span_exporter.stop()
+
+
+def read_spans(handler: ListHandler) -> list[dict]:
+    # stopping the listener drains the queue
+    span_exporter.stop()
+    return [
+        span
+        for line in handler.lines
+        for resource in json.loads(line)["resourceSpans"]
+        for scope in resource["scopeSpans"]
+        for span in scope["spans"]
+    ]
+
+
+def attributes(span: dict) -> dict:
+    return {a["key"]: next(iter(a["value"].values())) for a in span["attributes"]}
+
+
+@pytest.mark.asyncio
+async def test_request_trace(async_client, create_student, exported):
+    res = await async_client.post(
+        "/api/v1/auth/sign-in/",
+        data={"username": fake_student["email"], "password": fake_student["password"]},
+        headers={"curr_env": "test", "X-Request-ID": "req-trace"},
+    )
+
+    assert res.status_code == 201
+
+    spans: list[dict] = read_spans(exported)
+    root: dict = next(span for span in spans if "parentSpanId" not in span)
+    by_name: dict[str, dict] = {span["name"]: span for span in spans}
+
+    assert root["name"] == "POST /api/v1/auth/sign-in/"
+    assert root["kind"] == SERVER
+    assert attributes(root)["request_id"] == "req-trace"
+    assert attributes(root)["http.response.status_code"] == "201"
+    assert {span["traceId"] for span in spans} == {root["traceId"]}
+
+    endpoint: dict = by_name["endpoint"]
+    assert endpoint["parentSpanId"] == root["spanId"]
+    assert by_name["verify_password"]["parentSpanId"] == endpoint["spanId"]
+    assert by_name["serialize"]["parentSpanId"] == root["spanId"]
+
+    queries: list[dict] = [span for span in spans if span["name"] == "db.query"]
+    assert queries
+    # statements are attributed to the repository method that ran them
+    assert {attributes(query)["code.function"] for query in queries} >= {
+        "UserRepoV1.get_user_by_email"
+    }
+
+
+@pytest.mark.asyncio
+async def test_incoming_traceparent(async_client, exported):
+    trace_id: str = "4bf92f3577b34da6a3ce929d0e0e4736"
+    parent_id: str = "00f067aa0ba902b7"
+
+    await async_client.get(
+        "/api/v1/health/",
+        headers={"curr_env": "test", TRACEPARENT: f"00-{trace_id}-{parent_id}-01"},
+    )
+
+    spans: list[dict] = read_spans(exported)
+    root: dict = next(span for span in spans if span["kind"] == SERVER)
+
+    assert root["traceId"] == trace_id
+    assert root["parentSpanId"] == parent_id
+
+
+@pytest.mark.asyncio
+async def test_unsampled_traceparent(async_client, exported):
+    await async_client.get(
+        "/api/v1/health/",
+        headers={"curr_env": "test", TRACEPARENT: f"00-{'1' * 32}-{'2' * 16}-00"},
+    )
+
+    assert read_spans(exported) == []
+
+
+def test_task_continues_trace(exported):
+    root = start_root("publish", SERVER)
+    token = current_span.set(root)
+    headers: dict = {}
+    inject_traceparent(headers=headers)
+    current_span.reset(token)
+    root.end()
+
+    # celery exposes the message headers on the task request
+    task = SimpleNamespace(name="delete_users", request=SimpleNamespace(**headers))
+    start_task_span("task-1", task)
+    end_task_span("task-1", state="SUCCESS")
+
+    spans: list[dict] = read_spans(exported)
+    consumer: dict = next(span for span in spans if span["kind"] == CONSUMER)
+
+    assert consumer["traceId"] == root.trace_id
+    assert consumer["parentSpanId"] == root.span_id
+    assert attributes(consumer)["celery.state"] == "SUCCESS"
+    assert current_span.get() is None
+
+
+def test_capped_trace_keeps_root(exported, monkeypatch):
+    monkeypatch.setattr(settings, "TRACING_MAX_SPANS", 3)
+
+    root = start_root("GET /api/v1/courses/", SERVER)
+    for i in range(5):
+        root.child(f"c{i}").end()
+    root.end()
+
+    spans: list[dict] = read_spans(exported)
+
+    assert [span["name"] for span in spans] == ["c0", "c1", "GET /api/v1/courses/"]
+    assert attributes(spans[-1])["dropped_spans"] == "3"